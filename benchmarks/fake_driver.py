@@ -0,0 +1,900 @@
+"""In-process stand-in for the Edge WebDriver, backed by saved HTML fixtures.
+
+Lets MicrosoftRewardsBot run end to end without a browser or network access:
+- Pages are parsed into a small DOM.
+- XPath queries go through an evaluator that covers the subset of XPath 1.0 the bot uses.
+- The bot's in-page scripts (the module-level *_JS constants) are emulated in Python.
+
+Every call goes through FakeDriver.execute, as it does in the real driver, so CommandCounter sees the same
+command names and round-trip counts.
+"""
+import html
+import json
+import os
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse, parse_qs, quote_plus
+
+from selenium.common.exceptions import (NoSuchElementException, NoSuchWindowException,
+                                        StaleElementReferenceException, WebDriverException)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+
+import ms_rewards_bot as bot_module
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+# --- Minimal DOM ---
+
+class Node:
+    """An element in a parsed fixture page. Text children are kept as plain strings."""
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.parent = parent
+        self.order = 0
+
+    def elements(self):
+        return [child for child in self.children if isinstance(child, Node)]
+
+    def descendants(self):
+        for child in self.elements():
+            yield child
+            yield from child.descendants()
+
+    def ancestors_or_self(self):
+        node = self
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def closest(self, predicate):
+        return next((node for node in self.ancestors_or_self() if predicate(node)), None)
+
+    def text(self):
+        return "".join(child if isinstance(child, str) else child.text() for child in self.children)
+
+    def own_text(self):
+        return "".join(child for child in self.children if isinstance(child, str))
+
+    def classes(self):
+        return self.attrs.get('class', '')
+
+    def is_connected(self):
+        return self.closest(lambda node: node.tag == '#document') is not None
+
+    def is_visible(self):
+        if not self.is_connected():
+            return False
+        for node in self.ancestors_or_self():
+            style = node.attrs.get('style', '').replace(' ', '').lower()
+            if 'hidden' in node.attrs or 'display:none' in style or 'visibility:hidden' in style:
+                return False
+        return not (self.tag == 'input' and self.attrs.get('type') == 'hidden')
+
+    def append(self, child):
+        child.parent = self
+        self.children.append(child)
+
+    def detach(self):
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, root):
+        super().__init__(convert_charrefs=True)
+        self.stack = [root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: (value if value is not None else '') for name, value in attrs})
+        self.stack[-1].append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].append(Node(tag, {name: (value if value is not None else '') for name, value in attrs}))
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+class Document:
+    """A parsed page. Goes 'dead' when its window navigates away, which makes its elements stale."""
+
+    def __init__(self, markup, url):
+        self.url = url
+        self.root = Node('#document')
+        _TreeBuilder(self.root).feed(markup)
+        self.alive = True
+        self.completion_observer = False # Set once COMPLETION_OBSERVER_JS has run on this page
+        self.renumber()
+
+    def renumber(self):
+        for index, node in enumerate(self.root.descendants(), start=1):
+            node.order = index
+
+    @property
+    def document_element(self):
+        return next(iter(self.root.elements()), self.root)
+
+
+# --- XPath subset evaluator ---
+
+def _split_top(expr, separator):
+    """Splits expr on separator where it is not inside quotes, brackets or parentheses."""
+    parts, depth, quote, start, i = [], 0, None, 0, 0
+    while i < len(expr):
+        char = expr[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0 and expr.startswith(separator, i):
+            # '=' must not be the tail of '!=', '<=' or '>='
+            if not (separator == '=' and i > 0 and expr[i - 1] in '!<>'):
+                parts.append(expr[start:i])
+                i += len(separator)
+                start = i
+                continue
+        i += 1
+    parts.append(expr[start:])
+    return parts
+
+
+def _strip_parens(expr):
+    expr = expr.strip()
+    while expr.startswith('(') and expr.endswith(')') and len(_split_top(expr[1:-1], ')')) == 1:
+        expr = expr[1:-1].strip()
+    return expr
+
+
+def evaluate_xpath(expr, context):
+    """Returns the nodes matched by expr (document order, no duplicates), evaluated against context."""
+    root = context.closest(lambda node: node.tag == '#document') or context
+    matches = []
+    for path in _split_top(expr, '|'):
+        matches.extend(_evaluate_path(path.strip(), context, root))
+    unique = {id(node): node for node in matches}
+    return sorted(unique.values(), key=lambda node: node.order)
+
+
+def _evaluate_path(path, context, root):
+    if path.startswith('.//'):
+        nodes, rest = [context], path[1:]
+    elif path.startswith('/'):
+        nodes, rest = [root], path
+    elif path.startswith('./'):
+        nodes, rest = [context], path[1:]
+    else:
+        nodes, rest = [context], '/' + path
+
+    steps = []
+    for index, chunk in enumerate(_split_top(rest, '/')):
+        if index == 0:
+            continue # text before the leading '/'
+        if chunk == '':
+            steps.append('descendant') # '//' leaves an empty chunk between the slashes
+        else:
+            axis = 'child'
+            if steps and steps[-1] == 'descendant':
+                steps.pop()
+                axis = 'descendant'
+            steps.append((axis, chunk))
+    for axis, step in steps:
+        nodes = _apply_step(nodes, axis, step)
+    return nodes
+
+
+def _apply_step(nodes, axis, step):
+    bracket = step.find('[')
+    name = step if bracket == -1 else step[:bracket]
+    predicates = []
+    rest = '' if bracket == -1 else step[bracket:]
+    while rest:
+        depth, quote = 0, None
+        for i, char in enumerate(rest):
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+                if depth == 0:
+                    predicates.append(rest[1:i])
+                    rest = rest[i + 1:]
+                    break
+        else:
+            raise WebDriverException(f"Unbalanced predicate in XPath step '{step}'")
+
+    out = []
+    for node in nodes:
+        bases = [node, *node.descendants()] if axis == 'descendant' else [node]
+        for base in bases:
+            if name == '.':
+                candidates = [base]
+            else:
+                candidates = [child for child in base.elements() if name in ('*', child.tag)]
+            for predicate in predicates:
+                candidates = [candidate for position, candidate in enumerate(candidates, start=1)
+                              if _truth(predicate, candidate, position)]
+            out.extend(candidates)
+    return out
+
+
+def _truth(expr, node, position):
+    expr = _strip_parens(expr)
+    parts = _split_top(expr, ' or ')
+    if len(parts) > 1:
+        return any(_truth(part, node, position) for part in parts)
+    parts = _split_top(expr, ' and ')
+    if len(parts) > 1:
+        return all(_truth(part, node, position) for part in parts)
+    if expr.isdigit():
+        return position == int(expr)
+    for operator in ('!=', '>=', '<=', '=', '>', '<'):
+        parts = _split_top(expr, operator)
+        if len(parts) == 2:
+            left, right = _value(parts[0], node), _value(parts[1], node)
+            if operator in ('=', '!='):
+                equal = str(left if left is not None else '') == str(right if right is not None else '')
+                return equal if operator == '=' else not equal
+            left, right = float(left or 0), float(right or 0)
+            return {'>': left > right, '<': left < right, '>=': left >= right, '<=': left <= right}[operator]
+    if expr.startswith('@'):
+        return expr[1:] in node.attrs
+    value = _value(expr, node)
+    return bool(value)
+
+
+def _value(expr, node):
+    expr = _strip_parens(expr)
+    if expr[:1] in ("'", '"'):
+        return expr[1:-1]
+    if re.fullmatch(r"-?\d+(\.\d+)?", expr):
+        return float(expr)
+    if expr.startswith('@'):
+        return node.attrs.get(expr[1:])
+    if expr == 'text()':
+        return node.own_text()
+    if expr == '.':
+        return node.text()
+    match = re.fullmatch(r"([a-z-]+)\((.*)\)", expr, re.S)
+    if not match:
+        raise WebDriverException(f"FakeDriver XPath subset cannot evaluate '{expr}'")
+    function, raw_args = match.group(1), match.group(2)
+    args = [_value(arg, node) for arg in _split_top(raw_args, ',')] if raw_args.strip() else []
+    as_text = lambda value: '' if value is None else str(value)
+    if function == 'contains':
+        return as_text(args[1]) in as_text(args[0])
+    if function == 'starts-with':
+        return as_text(args[0]).startswith(as_text(args[1]))
+    if function == 'normalize-space':
+        return " ".join(as_text(args[0] if args else node.text()).split())
+    if function == 'string-length':
+        return float(len(as_text(args[0] if args else node.text())))
+    if function == 'not':
+        return not _truth(raw_args, node, 0)
+    if function == 'concat':
+        return "".join(as_text(arg) for arg in args)
+    raise WebDriverException(f"FakeDriver XPath subset has no function '{function}()'")
+
+
+# --- Site state ---
+
+class FakeRewardsSite:
+    """Server-side state shared by every page load: points, completed offers and search counters."""
+
+    def __init__(self, points=12345, desktop_search_cap=90, mobile_search_cap=60, points_per_search=3):
+        self.points = points
+        self.completed_offers = set()
+        self.search_points = {'desktop': 0, 'mobile': 0}
+        self.search_caps = {'desktop': desktop_search_cap, 'mobile': mobile_search_cap}
+        self.points_per_search = points_per_search
+        self.searches = {'desktop': 0, 'mobile': 0}
+        self.fixtures = {}
+
+    def fixture(self, name):
+        if name not in self.fixtures:
+            with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+                self.fixtures[name] = f.read()
+        return self.fixtures[name]
+
+    def record_search(self, device_type):
+        self.searches[device_type] += 1
+        if self.search_points[device_type] < self.search_caps[device_type]:
+            self.search_points[device_type] += self.points_per_search
+            self.points += self.points_per_search
+
+    def complete_offer(self, href):
+        if href not in self.completed_offers:
+            self.completed_offers.add(href)
+            self.points += 10
+
+    def search_progress(self):
+        return {device_type: {'progress': self.search_points[device_type], 'max': self.search_caps[device_type]}
+                for device_type in ('desktop', 'mobile')}
+
+    def render(self, url, device_type):
+        """Builds the Document a navigation to url would load."""
+        if url in ('', 'about:blank', 'data:,'):
+            return Document("<html><head></head><body></body></html>", url or 'about:blank')
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        if 'rewards' in host:
+            markup = self.fixture('rewards_dashboard.html').replace('{{points}}', f"{self.points:,}")
+            document = Document(markup, url)
+            for anchor in evaluate_xpath("//a[@href]", document.root):
+                if urljoin(url, anchor.attrs['href']) in self.completed_offers:
+                    anchor.append(Node('span', {'class': 'mee-icon mee-icon-SkypeCircleCheck'}))
+            document.renumber()
+            return document
+        if 'bing.com' in host and parsed.path.startswith('/search'):
+            query = parse_qs(parsed.query).get('q', [''])[0]
+            form = parse_qs(parsed.query).get('form', [''])[0]
+            # Activity cards link to Bing searches with an ML* form code; those pages host the quiz
+            if form.startswith('ML'):
+                return Document(self.fixture('activity_quiz.html'), url)
+            self.record_search(device_type)
+            return Document(self.fixture('bing_results.html').replace('{{query}}', html.escape(query)), url)
+        if 'bing.com' in host:
+            return Document(self.fixture('bing_home.html'), url)
+        return Document(self.fixture('activity_quiz.html'), url)
+
+
+# --- WebDriver stand-in ---
+
+class FakeElement(WebElement):
+    """WebElement whose commands are answered by FakeDriver from the fixture DOM."""
+
+    def __init__(self, parent, node, document):
+        super().__init__(parent, f"fake-{id(node)}")
+        self.node = node
+        self.document = document
+
+    def _run(self, command, **params):
+        params['element'] = self
+        return self._parent.execute(command, params)['value']
+
+    @property
+    def tag_name(self):
+        return self._run('getElementTagName')
+
+    @property
+    def text(self):
+        return self._run('getElementText')
+
+    def get_attribute(self, name):
+        return self._run('getElementAttribute', name=name)
+
+    def is_displayed(self):
+        return self._run('isElementDisplayed')
+
+    def is_enabled(self):
+        return self._run('isElementEnabled')
+
+    def click(self):
+        self._run('clickElement')
+
+    def clear(self):
+        self._run('clearElement')
+
+    def send_keys(self, *value):
+        self._run('sendKeysToElement', text="".join(str(part) for part in value))
+
+    def find_element(self, by=By.ID, value=None):
+        return self._run('findChildElement', using=by, value=value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._run('findChildElements', using=by, value=value)
+
+
+class FakeWindow:
+    def __init__(self, handle):
+        self.handle = handle
+        self.document = None
+        self.user_agent = '' # CDP user agent overrides apply per tab
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.execute('switchToWindow', {'handle': handle})
+
+    def new_window(self, type_hint=None):
+        handle = self._driver.execute('newWindow', {'type': type_hint})['value']['handle']
+        self.window(handle)
+
+
+class FakeDriver:
+    """Answers WebDriver commands from FakeRewardsSite instead of a browser.
+
+    clock, if given (a VirtualClock), is advanced by round_trip_ms for every command and by page_load_ms for every
+    page load, tallied under the label from label_provider, so simulated time includes what a real browser would have
+    spent on them. on_command(command, seconds) is called after each command with the CPU time spent inside the fake,
+    so it can be kept apart from the bot's own.
+    """
+
+    def __init__(self, site, clock=None, round_trip_ms=0, page_load_ms=0, on_command=None, label_provider=None):
+        self.site = site
+        self.clock = clock
+        self.label_provider = label_provider or (lambda: 'webdriver')
+        self.round_trip = round_trip_ms / 1000
+        self.page_load = page_load_ms / 1000
+        self.on_command = on_command
+        self.windows = {}
+        self.window_order = []
+        self.current = None
+        self.switch_to = FakeSwitchTo(self)
+        self._next_handle = 0
+        self._open_window()
+        self.current = self.window_order[0]
+        self._load(self.windows[self.current], 'about:blank')
+        # Script handlers keyed by the bot's script constants
+        self.scripts = {
+            bot_module.PAGE_READY_JS: self._page_ready,
+            bot_module.MARK_DOCUMENT_STALE_JS: self._mark_stale,
+            bot_module.DISMISS_BANNERS_JS: self._dismiss_banners,
+            bot_module.READ_POINTS_JS: self._read_points,
+            bot_module.CLICK_ELEMENT_JS: self._click_element,
+            bot_module.FIND_INTERACTABLE_JS: self._find_interactable,
+            bot_module.SNAPSHOT_CARDS_JS: self._snapshot_cards,
+            bot_module.CARD_STATE_JS: self._card_state_script,
+            bot_module.COMPLETION_OBSERVER_JS: self._install_completion_observer,
+        }
+
+    # -- command dispatch --
+
+    def execute(self, driver_command, params=None):
+        started = time.process_time()
+        try:
+            handler = getattr(self, '_cmd_' + driver_command, None)
+            if handler is None:
+                raise WebDriverException(f"FakeDriver does not implement '{driver_command}'")
+            return {'value': handler(**(params or {}))}
+        finally:
+            if self.clock is not None and self.round_trip:
+                self.clock.advance(self.round_trip, self.label_provider())
+            if self.on_command:
+                self.on_command(driver_command, time.process_time() - started)
+
+    # -- public WebDriver API used by the bot --
+
+    @property
+    def current_url(self):
+        return self.execute('getCurrentUrl')['value']
+
+    @property
+    def current_window_handle(self):
+        return self.execute('getCurrentWindowHandle')['value']
+
+    @property
+    def window_handles(self):
+        return self.execute('getWindowHandles')['value']
+
+    def get(self, url):
+        self.execute('get', {'url': url})
+
+    def close(self):
+        self.execute('close')
+
+    def quit(self):
+        self.execute('quit')
+
+    def execute_script(self, script, *args):
+        return self.execute('w3cExecuteScript', {'script': script, 'args': list(args)})['value']
+
+    def execute_async_script(self, script, *args):
+        return self.execute('w3cExecuteScriptAsync', {'script': script, 'args': list(args)})['value']
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})['value']
+
+    def find_element(self, by=By.ID, value=None):
+        return self.execute('findElement', {'using': by, 'value': value})['value']
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.execute('findElements', {'using': by, 'value': value})['value']
+
+    def set_window_size(self, width, height, windowHandle='current'):
+        self.execute('setWindowRect', {'width': width, 'height': height})
+
+    def maximize_window(self):
+        self.execute('w3cMaximizeWindow')
+
+    def set_script_timeout(self, time_to_wait):
+        self.execute('setTimeouts', {'script': int(time_to_wait * 1000)})
+
+    def get_log(self, log_type):
+        return self.execute('getLog', {'type': log_type})['value']
+
+    # -- windows and navigation --
+
+    def _open_window(self):
+        self._next_handle += 1
+        window = FakeWindow(f"fake-window-{self._next_handle}")
+        self.windows[window.handle] = window
+        self.window_order.append(window.handle)
+        return window
+
+    def _window(self):
+        if self.current not in self.windows:
+            raise NoSuchWindowException("no such window: target window already closed")
+        return self.windows[self.current]
+
+    def _load(self, window, url):
+        if window.document is not None:
+            window.document.alive = False
+        device_type = 'mobile' if 'Mobile' in window.user_agent else 'desktop'
+        window.document = self.site.render(url, device_type)
+        if self.clock is not None and self.page_load and url != 'about:blank':
+            self.clock.advance(self.page_load, self.label_provider())
+
+    def _document(self):
+        return self._window().document
+
+    def _wrap(self, node, document=None):
+        return FakeElement(self, node, document or self._document())
+
+    def _node(self, element):
+        if not element.document.alive or not element.node.is_connected():
+            raise StaleElementReferenceException("stale element reference: element is not attached to the page document")
+        return element.node
+
+    def _find(self, using, value, context, document):
+        if using == By.XPATH:
+            nodes = evaluate_xpath(value, context)
+        elif using == By.TAG_NAME:
+            nodes = [node for node in context.descendants() if node.tag == value.lower()]
+        elif using == By.ID:
+            nodes = [node for node in context.descendants() if node.attrs.get('id') == value]
+        else:
+            raise WebDriverException(f"FakeDriver does not support locator strategy '{using}'")
+        return [FakeElement(self, node, document) for node in nodes]
+
+    def _click_node(self, node):
+        document = self._document()
+        anchor = node.closest(lambda candidate: candidate.tag == 'a' and 'href' in candidate.attrs)
+        if node.tag == 'button' and node.closest(lambda candidate: candidate.tag == 'promotional-item'
+                                                  or candidate.attrs.get('role') == 'dialog'):
+            # Banner close buttons remove their banner
+            banner = node.closest(lambda candidate: candidate.tag == 'promotional-item'
+                                  or candidate.attrs.get('role') == 'dialog')
+            banner.detach()
+        elif node.tag == 'input' and node.attrs.get('type') == 'radio':
+            node.attrs['checked'] = ''
+        elif anchor is not None and not anchor.attrs['href'].startswith('#'):
+            href = urljoin(document.url, anchor.attrs['href'])
+            if 'rewards' in urlparse(document.url).netloc:
+                # Opening an offer completes it; the live dashboard shows the checkmark right away
+                self.site.complete_offer(href)
+                anchor.append(Node('span', {'class': 'mee-icon mee-icon-SkypeCircleCheck'}))
+                document.renumber()
+            if anchor.attrs.get('target') == '_blank':
+                self._load(self._open_window(), href)
+            else:
+                self._load(self._window(), href)
+
+    # -- command handlers --
+
+    def _cmd_get(self, url):
+        self._load(self._window(), url)
+
+    def _cmd_getCurrentUrl(self):
+        return self._document().url
+
+    def _cmd_getCurrentWindowHandle(self):
+        return self._window().handle
+
+    def _cmd_getWindowHandles(self):
+        return list(self.window_order)
+
+    def _cmd_switchToWindow(self, handle):
+        if handle not in self.windows:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self.current = handle
+
+    def _cmd_newWindow(self, type=None):
+        window = self._open_window()
+        self._load(window, 'about:blank')
+        return {'handle': window.handle, 'type': type or 'tab'}
+
+    def _cmd_close(self):
+        window = self._window()
+        window.document.alive = False
+        del self.windows[window.handle]
+        self.window_order.remove(window.handle)
+
+    def _cmd_quit(self):
+        for window in self.windows.values():
+            window.document.alive = False
+        self.windows.clear()
+        self.window_order.clear()
+
+    def _cmd_setWindowRect(self, **rect):
+        return rect
+
+    def _cmd_w3cMaximizeWindow(self):
+        return None
+
+    def _cmd_setTimeouts(self, **timeouts):
+        return None
+
+    def _cmd_getLog(self, type):
+        return []
+
+    def _cmd_executeCdpCommand(self, cmd, params):
+        if cmd in ('Network.setUserAgentOverride', 'Emulation.setUserAgentOverride'):
+            self._window().user_agent = params.get('userAgent', '')
+        return {}
+
+    def _cmd_findElement(self, using, value):
+        found = self._cmd_findElements(using, value)
+        if not found:
+            raise NoSuchElementException(f"no such element: {using}={value}")
+        return found[0]
+
+    def _cmd_findElements(self, using, value):
+        document = self._document()
+        return self._find(using, value, document.root, document)
+
+    def _cmd_findChildElement(self, element, using, value):
+        found = self._cmd_findChildElements(element, using, value)
+        if not found:
+            raise NoSuchElementException(f"no such element: {using}={value}")
+        return found[0]
+
+    def _cmd_findChildElements(self, element, using, value):
+        return self._find(using, value, self._node(element), element.document)
+
+    def _cmd_getElementTagName(self, element):
+        return self._node(element).tag
+
+    def _cmd_getElementText(self, element):
+        return " ".join(self._node(element).text().split())
+
+    def _cmd_getElementAttribute(self, element, name):
+        return self._node(element).attrs.get(name)
+
+    def _cmd_isElementDisplayed(self, element):
+        return self._node(element).is_visible()
+
+    def _cmd_isElementEnabled(self, element):
+        return 'disabled' not in self._node(element).attrs
+
+    def _cmd_clickElement(self, element):
+        self._click_node(self._node(element))
+
+    def _cmd_clearElement(self, element):
+        node = self._node(element)
+        node.attrs['value'] = ''
+        node.children = []
+
+    def _cmd_sendKeysToElement(self, element, text):
+        node = self._node(element)
+        submit = Keys.RETURN in text or Keys.ENTER in text
+        typed = text.replace(Keys.RETURN, '').replace(Keys.ENTER, '')
+        node.attrs['value'] = node.attrs.get('value', '') + typed
+        if submit:
+            form = node.closest(lambda candidate: candidate.tag == 'form')
+            action = urljoin(self._document().url, form.attrs.get('action', '') if form else '/search')
+            self._load(self._window(), f"{action}?q={quote_plus(node.attrs['value'])}&form=QBLH")
+
+    def _cmd_w3cExecuteScript(self, script, args):
+        handler = self.scripts.get(script)
+        if handler is not None:
+            return handler(*args)
+        if 'window.scrollTo' in script:
+            return None
+        if script.strip() == 'arguments[0].click();':
+            self._click_node(self._node(args[0]))
+            return None
+        raise WebDriverException(f"FakeDriver cannot emulate script: {script.strip()[:80]!r}")
+
+    def _cmd_w3cExecuteScriptAsync(self, script, args):
+        if script == bot_module.SEARCH_PROGRESS_JS:
+            return self.site.search_progress()
+        if script == bot_module.WAIT_CARD_COMPLETION_JS:
+            return self._wait_card_completion(*args)
+        if script == bot_module.HEALTH_CHECK_JS:
+            return True
+        raise WebDriverException(f"FakeDriver cannot emulate async script: {script.strip()[:80]!r}")
+
+    # -- emulated in-page scripts --
+
+    def _page_ready(self, ready_xpath, require_idle=False, idle_ms=0, dom_ready_is_enough=False):
+        document = self._document()
+        if 'data-bot-stale' in document.document_element.attrs:
+            return False
+        if ready_xpath:
+            return any(node.is_visible() for node in evaluate_xpath(ready_xpath, document.root))
+        return True
+
+    def _mark_stale(self):
+        self._document().document_element.attrs['data-bot-stale'] = '1'
+
+    def _dismiss_banners(self, xpaths):
+        for xpath in xpaths:
+            for node in evaluate_xpath(xpath, self._document().root):
+                if 'disabled' in node.attrs or not node.is_visible():
+                    continue
+                self._click_node(node)
+                return xpath
+        return None
+
+    def _click_element(self, element, block='center'):
+        if not element.document.alive:
+            self._node(element) # A handle from a page we navigated away from is stale, as in the browser
+        node = element.node
+        if not node.is_connected():
+            return 'detached'
+        if not node.is_visible():
+            return 'hidden'
+        if 'disabled' in node.attrs:
+            return 'disabled'
+        self._click_node(node)
+        return 'clicked'
+
+    def _find_interactable(self, xpath):
+        document = self._document()
+        return [self._wrap(node, document) for node in evaluate_xpath(xpath, document.root)
+                if node.is_visible() and 'disabled' not in node.attrs]
+
+    def _read_points(self, xpaths):
+        document = self._document()
+        numeric = re.compile(r"^[0-9][0-9,]*$")
+        for xpath in xpaths:
+            for node in evaluate_xpath(xpath, document.root):
+                if not node.is_visible():
+                    continue
+                aria_label = node.attrs.get('aria-label', '').strip()
+                candidate = aria_label if numeric.match(aria_label) else node.text().strip()
+                if numeric.match(candidate):
+                    return {'xpath': xpath, 'points': candidate, 'element': self._wrap(node, document),
+                            'document': self._wrap(document.document_element, document)}
+        return None
+
+    def _card_state(self, node):
+        """Python port of cardState() in CARD_HELPERS_JS."""
+        def any_visible(predicate):
+            return any(predicate(candidate) and candidate.is_visible() for candidate in node.descendants())
+
+        state = node.attrs.get('state')
+        points_parent = node.closest(lambda candidate: candidate.tag == 'mee-rewards-points')
+        complete_reason = None
+        if any_visible(lambda candidate: candidate.tag == 'span' and 'mee-icon-SkypeCircleCheck' in candidate.classes()):
+            complete_reason = 'green checkmark icon'
+        elif state and state.lower() == 'complete':
+            complete_reason = 'state attribute'
+        elif points_parent is not None and points_parent.attrs.get('complete', '').lower() == 'true':
+            complete_reason = 'mee-rewards-points@complete'
+        elif any_visible(lambda candidate: 'completed' in candidate.classes()):
+            complete_reason = "'completed' class"
+
+        container = node.closest(lambda candidate: candidate.tag == 'div' and 'rewards-card-container' in candidate.classes())
+        ng_class = container.attrs.get('ng-class', '') if container is not None else ''
+        locked = node.attrs.get('aria-disabled', '').lower() == 'true' or "'locked-card'" in ng_class
+
+        title_node = next((candidate for candidate in node.descendants() if candidate.tag == 'h3'
+                           or (candidate.tag == 'div' and 'card-title' in candidate.classes())), None)
+        points_node = next((candidate for candidate in node.descendants() if 'pointLink' in candidate.classes()
+                            or 'pointsString' in candidate.classes() or candidate.tag == 'mee-rewards-points'), None)
+        points_match = re.search(r"[0-9]+", points_node.text()) if points_node is not None else None
+        title = title_node.text().strip() if title_node is not None else ''
+        return {
+            'visible': node.is_visible(),
+            'complete': complete_reason is not None,
+            'complete_reason': complete_reason,
+            'locked': locked,
+            'title': title or node.text().strip().split('\n')[0],
+            'points': int(points_match.group(0)) if points_match else None,
+        }
+
+    def _snapshot_cards(self, specs):
+        document = self._document()
+        out = {}
+        for spec in specs:
+            containers = evaluate_xpath(spec['container'], document.root)
+            container = containers[0] if containers else None
+            section = {'container_found': container is not None and container.is_visible(), 'cards': []}
+            seen_keys = set()
+            out[spec['name']] = section
+            if not section['container_found']:
+                continue
+            matches = {}
+            for xpath in spec['card_xpaths']:
+                for node in evaluate_xpath(xpath, container):
+                    matches.setdefault(id(node), (node, xpath))
+            for node, xpath in sorted(matches.values(), key=lambda match: match[0].order):
+                if not node.is_visible():
+                    continue
+                card = self._card_state(node)
+                card.update({
+                    'original_index': len(section['cards']),
+                    'element': self._wrap(node, document),
+                    'matched_xpath': xpath,
+                    'href': urljoin(document.url, node.attrs['href']) if node.attrs.get('href') else None,
+                    'data_bi_id': node.attrs.get('data-bi-id'),
+                    'data_m_attr': node.attrs.get('data-m'),
+                    'key': self._card_key(node, document),
+                })
+                if card['key'] and 'data-bot-card-key' not in node.attrs:
+                    base, suffix = card['key'], 2
+                    while card['key'] in seen_keys:
+                        card['key'], suffix = f"{base}#{suffix}", suffix + 1
+                    node.attrs['data-bot-card-key'] = card['key']
+                if card['key']:
+                    seen_keys.add(card['key'])
+                section['cards'].append(card)
+        return out
+
+    def _card_key(self, node, document):
+        """Python port of cardKey() in SNAPSHOT_CARDS_JS."""
+        if node.attrs.get('data-bot-card-key'):
+            return node.attrs['data-bot-card-key']
+        data_m = node.attrs.get('data-m')
+        if data_m:
+            try:
+                parsed = json.loads(data_m)
+                if isinstance(parsed, dict) and parsed.get('offerId'):
+                    return f"offer:{parsed['offerId']}"
+            except ValueError:
+                pass
+        if node.attrs.get('data-bi-id'):
+            return f"bi:{node.attrs['data-bi-id']}"
+        if node.attrs.get('href'):
+            return f"href:{urljoin(document.url, node.attrs['href'])}"
+        if data_m:
+            return f"m:{data_m}"
+        return None
+
+    def _install_completion_observer(self):
+        document = self._document()
+        installed = not document.completion_observer
+        document.completion_observer = True
+        return installed
+
+    def _wait_card_completion(self, key, timeout_ms):
+        """Emulates WAIT_CARD_COMPLETION_JS. Cards only change when clicked, so a pending card times out."""
+        document = self._document()
+        if not document.completion_observer:
+            return {'status': 'no_observer'}
+        node = next((node for node in document.root.descendants()
+                     if node.attrs.get('data-bot-card-key') == key), None)
+        if node is None:
+            return {'status': 'detached'}
+        state = self._card_state(node)
+        if state['complete']:
+            return {'status': 'complete', 'state': state}
+        if self.clock is not None:
+            self.clock.advance(timeout_ms / 1000, self.label_provider())
+        return {'status': 'timeout'}
+
+    def _card_state_script(self, element):
+        if not element.document.alive or not element.node.is_connected():
+            return None
+        return self._card_state(element.node)
@@ -0,0 +1,169 @@
+"""Offline end-to-end benchmark of MicrosoftRewardsBot.run_complete_workflow.
+
+Drives the real bot against FakeDriver (fixture pages, no browser, no network) on a seeded VirtualClock, so a
+full run replays in well under a second, and reports per phase:
+- WebDriver round trips
+- simulated time: the bot's sleeps and waits plus the modelled per-command and page-load latency
+- real CPU time spent in the bot's own code, with the fake driver's share shown separately
+
+Usage (from the repository root):
+    python benchmarks/run_benchmark.py
+    python benchmarks/run_benchmark.py --runs 5 --search-mode url --parallel-activities 3 --json results.json
+    python benchmarks/run_benchmark.py --budget searches:desktop=300 --budget daily_set/w3cExecuteScript=60
+
+With --budget, the script exits with status 1 if any run issues more WebDriver commands than allowed.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ms_rewards_bot # noqa: E402
+from fake_driver import FakeDriver, FakeRewardsSite # noqa: E402
+
+
+class PhaseProfiler:
+    """Buckets WebDriver calls and CPU time by the bot's current phase."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.phases = {}
+        self._last_cpu = time.process_time()
+        self._last_phase = 'other'
+
+    def _bucket(self, phase):
+        return self.phases.setdefault(phase, {'commands': 0, 'cpu': 0.0, 'fake_cpu': 0.0})
+
+    def tick(self):
+        """Charges the CPU time used since the previous event to the phase that was running then."""
+        now = time.process_time()
+        self._bucket(self._last_phase)['cpu'] += now - self._last_cpu
+        self._last_cpu = now
+        self._last_phase = self.bot.current_phase()
+
+    def on_command(self, command, fake_cpu_seconds):
+        self.tick()
+        bucket = self._bucket(self.bot.current_phase())
+        bucket['commands'] += 1
+        bucket['fake_cpu'] += fake_cpu_seconds
+
+    def report(self, simulated_by_phase):
+        self.tick()
+        for phase in simulated_by_phase:
+            self._bucket(phase)
+        return {phase: {'commands': stats['commands'],
+                        'simulated_s': simulated_by_phase.get(phase, 0.0),
+                        # CPU time of the bot itself; the fake driver's emulation cost is reported separately
+                        'bot_cpu_ms': round(max(0.0, stats['cpu'] - stats['fake_cpu']) * 1000, 2),
+                        'fake_cpu_ms': round(stats['fake_cpu'] * 1000, 2)}
+                for phase, stats in self.phases.items()}
+
+
+def parse_budget(text):
+    """Parses PHASE=N or PHASE/COMMAND=N into a CommandCounter.over_budget key and limit."""
+    key, separator, limit = text.rpartition('=')
+    if not separator or not key or not limit.isdigit():
+        raise argparse.ArgumentTypeError(f"expected PHASE=N or PHASE/COMMAND=N, got '{text}'")
+    phase, _, command = key.partition('/')
+    return ((phase, command) if command else phase), int(limit)
+
+
+def run_once(args, seed):
+    with tempfile.TemporaryDirectory(prefix="ms_rewards_bench_") as profile_dir:
+        site = FakeRewardsSite()
+        clock = ms_rewards_bot.VirtualClock(seed)
+        holder = {}
+
+        def driver_factory(options):
+            bot = holder['bot']
+            return FakeDriver(site, clock=clock, round_trip_ms=args.rtt_ms, page_load_ms=args.page_load_ms,
+                              on_command=holder['profiler'].on_command, label_provider=bot.current_phase)
+
+        bot = ms_rewards_bot.MicrosoftRewardsBot(
+            user_data_dir=os.path.join(profile_dir, "profile"),
+            max_parallel_activities=args.parallel_activities,
+            search_mode=args.search_mode,
+            interleave_searches=args.interleave_searches,
+            driver_factory=driver_factory,
+            clock=clock,
+        )
+        holder.update(bot=bot, profiler=PhaseProfiler(bot))
+
+        started = time.perf_counter()
+        success = bot.run_complete_workflow(nosearch=args.nosearch)
+        elapsed = time.perf_counter() - started
+        return {
+            'success': success,
+            'real_seconds': round(elapsed, 3),
+            'simulated_seconds': round(clock.now, 3),
+            'searches': dict(site.searches),
+            'offers_completed': len(site.completed_offers),
+            'phases': holder['profiler'].report(clock.report()['by_phase']),
+            'over_budget': {'/'.join(key) if isinstance(key, tuple) else key: {'commands': actual, 'budget': budget}
+                            for key, (actual, budget) in bot.command_counter.over_budget(args.budget).items()},
+        }
+
+
+def print_report(results):
+    phases = []
+    for result in results:
+        for phase in result['phases']:
+            if phase not in phases:
+                phases.append(phase)
+
+    def median(phase, key):
+        return statistics.median(result['phases'].get(phase, {}).get(key, 0) for result in results)
+
+    print(f"\n{'phase':<24}{'commands':>10}{'simulated s':>13}{'bot cpu ms':>12}{'fake cpu ms':>13}")
+    for phase in phases:
+        print(f"{phase:<24}{median(phase, 'commands'):>10.0f}{median(phase, 'simulated_s'):>13.1f}"
+              f"{median(phase, 'bot_cpu_ms'):>12.1f}{median(phase, 'fake_cpu_ms'):>13.1f}")
+    print(f"\nruns: {len(results)}, all succeeded: {all(result['success'] for result in results)}")
+    print(f"median real time: {statistics.median(result['real_seconds'] for result in results):.2f}s, "
+          f"median simulated time: {statistics.median(result['simulated_seconds'] for result in results):.1f}s")
+    print(f"searches: {results[0]['searches']}, offers completed: {results[0]['offers_completed']}")
+    for run, result in enumerate(results, 1):
+        for key, entry in result['over_budget'].items():
+            print(f"run {run}: {key} issued {entry['commands']} commands, budget {entry['budget']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of the rewards workflow against fixture pages.')
+    parser.add_argument('--runs', type=int, default=3, help='Number of workflow runs. Default is 3.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed of the first run (incremented per run).')
+    parser.add_argument('--search-mode', choices=['box', 'url'], default='box')
+    parser.add_argument('--parallel-activities', type=int, default=1)
+    parser.add_argument('--interleave-searches', action='store_true')
+    parser.add_argument('--nosearch', action='store_true')
+    parser.add_argument('--rtt-ms', type=float, default=2.0,
+                        help='Modelled latency of one WebDriver round trip, in ms. Default is 2.')
+    parser.add_argument('--page-load-ms', type=float, default=300.0,
+                        help='Modelled time for one page load, in ms. Default is 300.')
+    parser.add_argument('--budget', type=parse_budget, action='append', default=[], metavar='PHASE[/COMMAND]=N',
+                        help='Maximum WebDriver commands per run for a phase, optionally for one Selenium command name '
+                             '(e.g. w3cExecuteScript, findElements). Repeatable.')
+    parser.add_argument('--json', type=str, help='Also write the raw per-run results to this file.')
+    parser.add_argument('--verbose', action='store_true', help="Show the bot's own log output.")
+    args = parser.parse_args()
+    args.budget = dict(args.budget)
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    results = [run_once(args, args.seed + run) for run in range(args.runs)]
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+    if any(result['over_budget'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,30 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException, StaleElementReferenceException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException, ElementNotInteractableException, StaleElementReferenceException, ElementClickInterceptedException, JavascriptException, NoSuchFrameException
 import time
 import random
 import os
 import logging
 import schedule
+import signal
+import subprocess
+import shutil
+import re
 from datetime import datetime
 import pathlib
 import argparse
 import json # Import json for parsing data-m
+import gzip
+import hashlib
+import itertools
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from urllib.parse import quote_plus
 
 # Set up logging
 # Use 'a' mode for append to keep logs across runs
@@ -29,8 +43,1249 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
+# In-page readiness probe evaluated on every poll by wait_for_page_ready.
+# arguments: [ready_xpath or null, require network idle, idle window in ms, DOM-ready is enough]
+# document.readyState === 'complete' is the in-page equivalent of CDP Page.loadEventFired,
+# and the resource timing buffer tells us when the network has gone quiet.
+# With the eager/none page-load strategies a parsed DOM ('interactive') is enough when no element is named,
+# and a document still carrying the stale marker (see MARK_DOCUMENT_STALE_JS) is the page we navigated away from.
+PAGE_READY_JS = """
+var readyXpath = arguments[0], requireIdle = arguments[1], idleMs = arguments[2], domReadyIsEnough = arguments[3];
+if (document.documentElement && document.documentElement.hasAttribute('data-bot-stale')) return false;
+if (readyXpath) {
+    if (document.readyState === 'loading') return false;
+    var node = document.evaluate(readyXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!node || !(node.offsetWidth || node.offsetHeight || node.getClientRects().length)) return false;
+} else if (document.readyState !== 'complete' && !(domReadyIsEnough && document.readyState === 'interactive')) {
+    return false;
+}
+if (requireIdle) {
+    var entries = performance.getEntriesByType('resource');
+    var lastEnd = 0;
+    for (var i = 0; i < entries.length; i++) {
+        if (entries[i].responseEnd > lastEnd) lastEnd = entries[i].responseEnd;
+    }
+    if (performance.now() - lastEnd < idleMs) return false;
+}
+return true;
+"""
+
+# Marks the current document before navigating with the 'none' page-load strategy, where driver.get returns
+# before the old page is replaced and PAGE_READY_JS would otherwise see the previous page.
+MARK_DOCUMENT_STALE_JS = "if (document.documentElement) document.documentElement.setAttribute('data-bot-stale', '1');"
+
+# Single round-trip banner dismissal used by dismiss_banners.
+# arguments: [ordered list of close-button XPaths]
+# Clicks the first visible, enabled match and returns its XPath (or null if no banner is present).
+DISMISS_BANNERS_JS = """
+var xpaths = arguments[0];
+for (var i = 0; i < xpaths.length; i++) {
+    var result;
+    try {
+        result = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < result.snapshotLength; j++) {
+        var el = result.snapshotItem(j);
+        if (el.disabled || !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) continue;
+        var style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.pointerEvents === 'none') continue;
+        el.click();
+        return xpaths[i];
+    }
+}
+return null;
+"""
+
+# Single round-trip click used by try_click_element / click_element.
+# arguments: [element, scrollIntoView block ('center' or 'nearest')]
+# Checks the element the same way EC.element_to_be_clickable does (attached, displayed, enabled - the disabled
+# property only, so aria-disabled locked cards are still clicked), scrolls it into view and clicks it.
+# Returns 'clicked', or why it was not clicked: 'detached', 'hidden' or 'disabled'.
+CLICK_ELEMENT_JS = """
+var el = arguments[0];
+if (!el || !el.isConnected) return 'detached';
+var style = window.getComputedStyle(el);
+if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) || style.visibility === 'hidden') return 'hidden';
+if (el.disabled) return 'disabled';
+el.scrollIntoView({block: arguments[1] || 'center'});
+el.click();
+return 'clicked';
+"""
+
+# Interactive element lookup used by activity_page_steps.
+# arguments: [XPath]
+# Returns the matching elements that are displayed and not disabled (the checks CLICK_ELEMENT_JS makes), so a page
+# with hundreds of matches is filtered in one round trip instead of two per element.
+FIND_INTERACTABLE_JS = """
+var result = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var found = [];
+for (var i = 0; i < result.snapshotLength; i++) {
+    var el = result.snapshotItem(i);
+    var style = window.getComputedStyle(el);
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) || style.visibility === 'hidden') continue;
+    if (el.disabled) continue;
+    found.push(el);
+}
+return found;
+"""
+
+# Health check used by check_session_health: an async round trip through the renderer of the current tab.
+HEALTH_CHECK_JS = """
+arguments[arguments.length - 1](true);
+"""
+
+# Points balance lookup used by probe_dashboard.
+# arguments: [ordered list of points XPaths]
+# Returns the first visible element whose aria-label or text looks like a points number, or null.
+READ_POINTS_JS = """
+var xpaths = arguments[0], numeric = /^[0-9][0-9,]*$/;
+for (var i = 0; i < xpaths.length; i++) {
+    var result;
+    try {
+        result = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < result.snapshotLength; j++) {
+        var el = result.snapshotItem(j);
+        if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) continue;
+        var ariaLabel = (el.getAttribute('aria-label') || '').trim();
+        var text = (el.innerText || el.textContent || '').trim();
+        // Prioritize aria-label if it's a number, fallback to text
+        var candidate = numeric.test(ariaLabel) ? ariaLabel : text;
+        if (numeric.test(candidate)) {
+            return {xpath: xpaths[i], points: candidate, element: el, document: document.documentElement};
+        }
+    }
+}
+return null;
+"""
+
+# Shared helpers prepended to the dashboard card scripts below.
+# cardState(el) reads the completion markers (SkypeCircleCheck icon, state, mee-rewards-points@complete,
+# 'completed' class), lock flags, title and point value of one card element.
+CARD_HELPERS_JS = """
+function isVisible(el) {
+    return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+}
+function anyVisible(nodes) {
+    for (var i = 0; i < nodes.length; i++) { if (isVisible(nodes[i])) return true; }
+    return false;
+}
+function textOf(el) {
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+}
+function cardState(el) {
+    var state = el.getAttribute('state');
+    var pointsParent = el.closest('mee-rewards-points');
+    var completeReason = null;
+    if (anyVisible(el.querySelectorAll("span[class*='mee-icon-SkypeCircleCheck']"))) completeReason = 'green checkmark icon';
+    else if (state && state.toLowerCase() === 'complete') completeReason = 'state attribute';
+    else if (pointsParent && (pointsParent.getAttribute('complete') || '').toLowerCase() === 'true') completeReason = 'mee-rewards-points@complete';
+    else if (anyVisible(el.querySelectorAll("[class*='completed']"))) completeReason = "'completed' class";
+
+    var cardContainer = el.closest("div[class*='rewards-card-container']");
+    var ngClass = cardContainer ? (cardContainer.getAttribute('ng-class') || '') : '';
+    var locked = (el.getAttribute('aria-disabled') || '').toLowerCase() === 'true' || ngClass.indexOf("'locked-card'") !== -1;
+
+    var titleEl = el.querySelector("h3, div[class*='card-title']");
+    var pointsEl = el.querySelector("[class*='pointLink'], [class*='pointsString'], mee-rewards-points");
+    var pointsMatch = textOf(pointsEl).match(/[0-9]+/);
+    return {
+        visible: isVisible(el),
+        complete: completeReason !== null,
+        complete_reason: completeReason,
+        locked: locked,
+        title: textOf(titleEl) || textOf(el).split('\\n')[0],
+        points: pointsMatch ? parseInt(pointsMatch[0], 10) : null
+    };
+}
+"""
+
+# Batched card snapshot used by snapshot_dashboard_cards.
+# arguments: [[{name, container, card_xpaths}, ...]]
+# Returns {name: {container_found, cards: [...]}} with identifiers, visibility, completion markers,
+# title and point value of every visible card, so no per-card get_attribute/is_displayed round trips are needed.
+# Each card also gets a stable key (offer id from data-m, then data-bi-id, then href), unique within its section.
+# The key is tagged onto the element as data-bot-card-key, so later snapshots of the same page keep it even if
+# the dashboard rewrites the card's attributes after a click.
+SNAPSHOT_CARDS_JS = CARD_HELPERS_JS + """
+function cardKey(el) {
+    var tagged = el.getAttribute('data-bot-card-key');
+    if (tagged) return tagged;
+    var dataM = el.getAttribute('data-m');
+    if (dataM) {
+        try {
+            var parsed = JSON.parse(dataM);
+            if (parsed && parsed.offerId) return 'offer:' + parsed.offerId;
+        } catch (e) {}
+    }
+    if (el.getAttribute('data-bi-id')) return 'bi:' + el.getAttribute('data-bi-id');
+    if (el.getAttribute('href')) return 'href:' + el.href;
+    if (dataM) return 'm:' + dataM;
+    return null;
+}
+var specs = arguments[0], out = {};
+for (var s = 0; s < specs.length; s++) {
+    var spec = specs[s];
+    var container = document.evaluate(spec.container, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    var section = {container_found: isVisible(container), cards: []}, seenKeys = {};
+    out[spec.name] = section;
+    if (!section.container_found) continue;
+
+    // Union of all card XPaths, de-duplicated and kept in document order like an 'a | b' XPath query
+    var matches = [];
+    for (var x = 0; x < spec.card_xpaths.length; x++) {
+        var result;
+        try {
+            result = document.evaluate(spec.card_xpaths[x], container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        } catch (e) {
+            continue;
+        }
+        for (var j = 0; j < result.snapshotLength; j++) {
+            var node = result.snapshotItem(j), known = false;
+            for (var k = 0; k < matches.length; k++) { if (matches[k].el === node) { known = true; break; } }
+            if (!known) matches.push({el: node, xpath: spec.card_xpaths[x]});
+        }
+    }
+    matches.sort(function (a, b) {
+        return (a.el.compareDocumentPosition(b.el) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1;
+    });
+
+    for (var m = 0; m < matches.length; m++) {
+        var el = matches[m].el;
+        if (!isVisible(el)) continue;
+        var card = cardState(el);
+        card.original_index = section.cards.length;
+        card.element = el;
+        card.matched_xpath = matches[m].xpath;
+        card.href = el.getAttribute('href') ? el.href : null;
+        card.data_bi_id = el.getAttribute('data-bi-id');
+        card.data_m_attr = el.getAttribute('data-m');
+        card.key = cardKey(el);
+        if (card.key && !el.getAttribute('data-bot-card-key')) {
+            // Two cards pointing at the same offer still need distinct keys
+            var base = card.key;
+            for (var n = 2; seenKeys[card.key]; n++) card.key = base + '#' + n;
+            el.setAttribute('data-bot-card-key', card.key);
+        }
+        if (card.key) seenKeys[card.key] = true;
+        section.cards.push(card);
+    }
+}
+return out;
+"""
+
+# Incremental refresh of a single card used by refresh_card_state.
+# arguments: [card element]
+# Returns the card's current state, or null if the element has been detached from the DOM.
+CARD_STATE_JS = CARD_HELPERS_JS + """
+var el = arguments[0];
+if (!el || !el.isConnected) return null;
+return cardState(el);
+"""
+
+# Completion watcher installed on the dashboard tab by install_completion_observer.
+# A MutationObserver re-checks the tagged cards (data-bot-card-key, see SNAPSHOT_CARDS_JS) whenever the dashboard
+# changes and records the state of each card that flips to complete in window.__botCardWatch.
+# Returns true if it was installed now, false if this page already has one.
+COMPLETION_OBSERVER_JS = CARD_HELPERS_JS + """
+if (window.__botCardWatch) return false;
+var watch = window.__botCardWatch = {complete: {}, waiters: [], pending: false, cardState: cardState};
+function scan() {
+    watch.pending = false;
+    var cards = document.querySelectorAll('[data-bot-card-key]');
+    for (var i = 0; i < cards.length; i++) {
+        var key = cards[i].getAttribute('data-bot-card-key');
+        if (watch.complete[key]) continue;
+        var state = cardState(cards[i]);
+        if (state.complete) watch.complete[key] = state;
+    }
+    // Wake anyone waiting on a card; waiters that are not finished yet stay registered
+    var waiters = watch.waiters;
+    watch.waiters = [];
+    for (var w = 0; w < waiters.length; w++) { if (!waiters[w](false)) watch.waiters.push(waiters[w]); }
+}
+watch.observer = new MutationObserver(function () {
+    if (watch.pending) return;
+    watch.pending = true;
+    setTimeout(scan, 50); // Coalesce a burst of mutations into one scan
+});
+watch.observer.observe(document.body, {subtree: true, childList: true, attributes: true,
+                                       attributeFilter: ['class', 'state', 'complete', 'style', 'hidden']});
+scan();
+return true;
+"""
+
+# Completion wait used by wait_for_card_completion (run with execute_async_script on the dashboard tab).
+# arguments: [card key, timeout in ms]
+# Resolves with {status: 'complete', state} as soon as the watcher sees the card complete, {status: 'timeout'},
+# or {status: 'no_observer'} / {status: 'detached'} when this page cannot answer (reloaded, card gone).
+WAIT_CARD_COMPLETION_JS = """
+var key = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var watch = window.__botCardWatch;
+if (!watch) { done({status: 'no_observer'}); return; }
+var el = document.querySelector('[data-bot-card-key="' + CSS.escape(key) + '"]');
+if (!el) { done({status: 'detached'}); return; }
+if (!watch.complete[key]) {
+    var current = watch.cardState(el);
+    if (current.complete) watch.complete[key] = current;
+}
+var finished = false;
+function check(timedOut) {
+    if (finished) return true;
+    var state = watch.complete[key];
+    if (!state && !timedOut && el.isConnected) return false;
+    finished = true;
+    done(state ? {status: 'complete', state: state} : {status: el.isConnected ? 'timeout' : 'detached'});
+    return true;
+}
+if (!check(false)) {
+    watch.waiters.push(check);
+    setTimeout(function () { check(true); }, timeoutMs);
+}
+"""
+
+# Search progress counters used by get_search_progress (run with execute_async_script on the dashboard tab).
+# Re-fetches the dashboard data from the rewards API so the counters are current, falling back to the
+# window.dashboard object rendered into the page. Resolves with {desktop, mobile} point progress or null.
+# arguments: [fetch timeout in ms] - a fetch still pending then is aborted and the page object is used instead
+SEARCH_PROGRESS_JS = """
+var timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+function summarize(list) {
+    if (!list) return null;
+    var progress = 0, max = 0;
+    for (var i = 0; i < list.length; i++) {
+        progress += list[i].pointProgress || 0;
+        max += list[i].pointProgressMax || 0;
+    }
+    return {progress: progress, max: max};
+}
+function fromDashboard(dashboard) {
+    var counters = dashboard && dashboard.userStatus && dashboard.userStatus.counters;
+    if (!counters) return null;
+    return {desktop: summarize(counters.pcSearch), mobile: summarize(counters.mobileSearch)};
+}
+var controller = new AbortController();
+var timer = setTimeout(function () { controller.abort(); }, timeoutMs);
+fetch('/api/getuserinfo?type=1', {credentials: 'include', signal: controller.signal})
+    .then(function (response) { return response.json(); })
+    .then(function (data) { clearTimeout(timer); done(fromDashboard(data && data.dashboard) || fromDashboard(window.dashboard)); })
+    .catch(function () { clearTimeout(timer); done(fromDashboard(window.dashboard)); });
+"""
+
+# URL patterns (Network.setBlockedURLs wildcard syntax) for each resource category the bot can skip downloading.
+# The bot only reads DOM text, attributes and counters, so none of these affect what it sees.
+RESOURCE_BLOCK_PATTERNS = {
+    'image': ["*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*", "*.webp", "*.webp?*",
+              "*.ico", "*.bmp", "*/th?id=*", "*/th/id/*"], # /th endpoints serve Bing thumbnails
+    'font': ["*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.otf", "*.eot"],
+    'media': ["*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.m3u8", "*.mp3", "*.ogg", "*/videos/riverview/*"],
+    'tracking': ["*://*.clarity.ms/*", "*://bat.bing.com/*", "*://*.doubleclick.net/*", "*://*.scorecardresearch.com/*",
+                 "*://browser.events.data.microsoft.com/*", "*://*.google-analytics.com/*", "*://*.googletagmanager.com/*",
+                 "*://*.adnxs.com/*"],
+}
+
+
+def build_url_blocklist(block_resources=None, blocked_url_patterns=None, unblocked_url_patterns=None):
+    """Returns the Network.setBlockedURLs pattern list: the categories' patterns plus extra deny patterns, minus unblocked ones.
+
+    setBlockedURLs has no exceptions (a URL is blocked if any pattern matches it), so unblocking removes whole patterns.
+    Raises ValueError for an unknown category or an unblocked pattern that is not in the blocklist.
+    """
+    unknown = set(block_resources or []) - set(RESOURCE_BLOCK_PATTERNS)
+    if unknown:
+        raise ValueError(f"Unknown resource categories {sorted(unknown)}. Use {sorted(RESOURCE_BLOCK_PATTERNS)}.")
+    candidates = [pattern for category in (block_resources or []) for pattern in RESOURCE_BLOCK_PATTERNS[category]]
+    candidates += list(blocked_url_patterns or [])
+    unblocked = set(unblocked_url_patterns or [])
+    unmatched = unblocked - set(candidates)
+    if unmatched:
+        raise ValueError(f"Cannot unblock {sorted(unmatched)}: not in the blocklist. Unblocking removes an exact "
+                         f"blocklist pattern; it cannot exempt URLs from other patterns.")
+    return [pattern for pattern in candidates if pattern not in unblocked]
+
+
+class SelectorRegistry:
+    """Persists per-selector hits, misses and latency so fallback XPath lists can be tried best-first.
+
+    Stats are stored as JSON: {group: {selector: {"hits", "misses", "total_ms", "last_hit"}}}.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f)
+            logger.debug(f"Loaded selector stats from {self.path}.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read selector stats from {self.path}: {e}. Starting fresh.")
+            self.stats = {}
+
+    def ordered(self, group, selectors):
+        """Returns selectors reordered by observed success: last winner first, then by hit rate and latency."""
+        group_stats = self.stats.get(group, {})
+        if not group_stats:
+            return list(selectors)
+
+        last_winner = max(group_stats, key=lambda sel: group_stats[sel].get('last_hit', 0))
+        if not group_stats[last_winner].get('last_hit'):
+            last_winner = None
+
+        def sort_key(indexed_selector):
+            index, selector = indexed_selector
+            entry = group_stats.get(selector, {})
+            hits, misses = entry.get('hits', 0), entry.get('misses', 0)
+            # Laplace-smoothed hit rate so unseen selectors sit between winners and known-dead ones
+            hit_rate = (hits + 1) / (hits + misses + 2)
+            avg_ms = entry['total_ms'] / hits if hits and entry.get('total_ms') else float('inf')
+            return (selector != last_winner, -hit_rate, avg_ms, index)
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=sort_key)]
+
+    def record(self, group, selector, hit, latency=None):
+        """Records one lookup outcome for a selector (latency in seconds, counted for hits only)."""
+        entry = self.stats.setdefault(group, {}).setdefault(selector, {'hits': 0, 'misses': 0, 'total_ms': 0.0, 'last_hit': 0})
+        if hit:
+            entry['hits'] += 1
+            entry['last_hit'] = time.time()
+            if latency is not None:
+                entry['total_ms'] += latency * 1000
+        else:
+            entry['misses'] += 1
+        self.dirty = True
+
+    def record_first_match(self, group, ordered_selectors, matched, latency=None):
+        """Records a hit for the matched selector and a miss for every selector evaluated before it."""
+        for selector in ordered_selectors:
+            if selector == matched:
+                self.record(group, selector, True, latency)
+                break
+            self.record(group, selector, False)
+
+    def save(self):
+        """Writes the stats to disk atomically if anything changed."""
+        if not self.dirty:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, indent=1)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            logger.debug(f"Saved selector stats to {self.path}.")
+        except Exception as e:
+            logger.warning(f"Could not save selector stats to {self.path}: {e}")
+
+
+def detect_edge_version():
+    """Returns the locally installed Edge version string (e.g. '124.0.2478.80') without any network access, or None."""
+    try:
+        if os.name == 'nt':
+            import winreg
+            # Edge records its version under BLBeacon for the current user
+            for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(hive, r"Software\Microsoft\Edge\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+            return None
+        candidates = ["/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+                      "microsoft-edge", "microsoft-edge-stable", "microsoft-edge-beta", "microsoft-edge-dev"]
+        for binary in candidates:
+            if not (os.path.isfile(binary) or shutil.which(binary)):
+                continue
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+            match = re.search(r"\d+\.\d+\.\d+\.\d+", output)
+            if match:
+                return match.group(0)
+    except Exception as e:
+        logger.debug(f"Could not detect installed Edge version: {e}")
+    return None
+
+
+def process_tree_pids(root_pid):
+    """Returns root_pid and all its descendants, from /proc on Linux, Win32_Process on Windows and ps elsewhere.
+
+    Only root_pid is returned if the process list cannot be read.
+    """
+    parents = {}
+    try:
+        if os.path.isdir('/proc'):
+            for entry in os.listdir('/proc'):
+                if entry.isdigit():
+                    try:
+                        with open(f"/proc/{entry}/stat", 'rb') as f:
+                            # The command name may contain spaces, so parse after its closing parenthesis
+                            parents[int(entry)] = int(f.read().rsplit(b')', 1)[1].split()[1])
+                    except (OSError, IndexError, ValueError):
+                        continue
+        elif os.name == 'nt':
+            # msedgedriver starts msedge.exe, which starts the renderer, GPU and utility processes
+            output = subprocess.run(["powershell", "-NoProfile", "-Command",
+                                     "Get-CimInstance Win32_Process | ForEach-Object { \"$($_.ProcessId) $($_.ParentProcessId)\" }"],
+                                    capture_output=True, text=True, timeout=30).stdout
+            for line in output.splitlines():
+                fields = line.split()
+                if len(fields) == 2 and fields[0].isdigit() and fields[1].isdigit():
+                    parents[int(fields[0])] = int(fields[1])
+        else:
+            output = subprocess.run(["ps", "-A", "-o", "pid=,ppid="], capture_output=True, text=True, timeout=10).stdout
+            for line in output.splitlines():
+                pid, ppid = line.split()
+                parents[int(pid)] = int(ppid)
+    except Exception as e:
+        logger.debug(f"Could not list processes: {e}")
+    pids, frontier = {root_pid}, [root_pid]
+    while frontier:
+        parent = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent and pid not in pids:
+                pids.add(pid)
+                frontier.append(pid)
+    return pids
+
+
+def processes_rss_mb(pids):
+    """Total resident memory of the given processes in MB, or None if it cannot be read on this platform."""
+    pids = set(pids)
+    total_kb = 0
+    try:
+        if os.path.isdir('/proc'):
+            for pid in pids:
+                try:
+                    with open(f"/proc/{pid}/status", 'r') as f:
+                        for line in f:
+                            if line.startswith('VmRSS:'):
+                                total_kb += int(line.split()[1])
+                                break
+                except OSError:
+                    continue # Process exited meanwhile
+        elif os.name == 'nt':
+            output = subprocess.run(["tasklist", "/FO", "CSV", "/NH"], capture_output=True, text=True, timeout=10).stdout
+            for row in output.splitlines():
+                fields = [field.strip('"') for field in row.split('","')]
+                if len(fields) >= 5 and fields[1].isdigit() and int(fields[1]) in pids:
+                    total_kb += int(re.sub(r"[^0-9]", "", fields[4]) or 0)
+        else:
+            output = subprocess.run(["ps", "-o", "rss=", "-p", ",".join(str(pid) for pid in pids)],
+                                    capture_output=True, text=True, timeout=10).stdout
+            total_kb = sum(int(line) for line in output.split())
+    except Exception as e:
+        logger.debug(f"Could not read process memory: {e}")
+        return None
+    return total_kb / 1024 if total_kb else None
+
+
+class Clock:
+    """Real time and randomness behind every sleep, wait deadline and random delay of the bot.
+
+    Pass a VirtualClock instead to replay the workflow in virtual time.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds, label=None):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def report(self):
+        """Where virtual time was spent; None for the real clock."""
+        return None
+
+
+class VirtualClock(Clock):
+    """Deterministic clock for tests and benchmarks: sleeping advances virtual time instantly and the RNG is seeded.
+
+    Together with a fake driver a complete run_complete_workflow replays in milliseconds. Time is tallied per
+    label (the bot passes its current phase), so report() shows where the simulated duration went.
+    """
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        self.now = 0.0
+        self.spent_by_label = {}
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds, label=None):
+        self.advance(seconds, label)
+
+    def advance(self, seconds, label=None):
+        if seconds <= 0:
+            return
+        self.now += seconds
+        label = label or 'other'
+        self.spent_by_label[label] = self.spent_by_label.get(label, 0.0) + seconds
+
+    def report(self):
+        return {'simulated_seconds': round(self.now, 3),
+                'by_phase': {label: round(seconds, 3) for label, seconds in self.spent_by_label.items()}}
+
+
+class ClockedWait(WebDriverWait):
+    """WebDriverWait whose deadline and polling sleeps go through the bot's Clock (and so count as wait time)."""
+
+    def __init__(self, driver, timeout, clock, sleep, poll_frequency=0.5, ignored_exceptions=None):
+        super().__init__(driver, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
+        self._clock = clock
+        self._sleep = sleep
+
+    def until(self, method, message=""):
+        end_time = self._clock.monotonic() + self._timeout
+        while True:
+            try:
+                value = method(self._driver)
+                if value:
+                    return value
+            except self._ignored_exceptions:
+                pass
+            if self._clock.monotonic() > end_time:
+                break
+            self._sleep(self._poll)
+        raise TimeoutException(message)
+
+
+class RunMetrics:
+    """Span-based timing for one workflow run, appended to a JSONL file as a single record per run.
+
+    Each span records its duration, how much of it was spent waiting (sleeps and readiness waits) versus actively
+    driving the browser, retries and an outcome. Spans nest, and a wait counts towards every span open at the time.
+
+    Spans marked parallel=True (activity tabs run concurrently) overlap instead of nesting: each runs from its card's
+    click until its own tab is done, and includes whatever the other tabs did in between. Their durations are
+    therefore not additive; the enclosing phase span holds the batch's wall time.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or Clock()
+        self.started_at = datetime.now()
+        self.started = self.clock.monotonic()
+        self.spans = []
+        self.open_spans = []
+
+    def start(self, name, parent=None, **attrs):
+        """Opens a span and returns it; close it with finish().
+
+        The parent defaults to the innermost open span that is not a parallel one, so overlapping sibling spans
+        never become each other's parent.
+        """
+        now = self.clock.monotonic()
+        if parent is None:
+            parent = next((span for span in reversed(self.open_spans) if not span.get('parallel')), None)
+        span = {'name': name, 'parent': parent['name'] if parent else None,
+                'start': round(now - self.started, 3), 'duration': None, 'wait': 0.0, 'active': None,
+                'retries': 0, 'outcome': None}
+        span.update(attrs)
+        span['_started'] = now
+        self.spans.append(span)
+        self.open_spans.append(span)
+        return span
+
+    def finish(self, span, outcome=None, **attrs):
+        """Closes a span. The outcome defaults to whatever was set on the span, else 'ok'."""
+        if not any(open_span is span for open_span in self.open_spans):
+            return
+        self.open_spans = [open_span for open_span in self.open_spans if open_span is not span]
+        span['duration'] = round(self.clock.monotonic() - span.pop('_started'), 3)
+        span['wait'] = round(span['wait'], 3)
+        span['active'] = round(max(0.0, span['duration'] - span['wait']), 3)
+        span['outcome'] = outcome or span['outcome'] or 'ok'
+        span.update(attrs)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Context manager form of start()/finish(); an exception escaping the block marks the span as 'error'."""
+        span = self.start(name, **attrs)
+        try:
+            yield span
+        except BaseException:
+            self.finish(span, outcome='error')
+            raise
+        self.finish(span)
+
+    def add_wait(self, seconds):
+        for span in self.open_spans:
+            span['wait'] += seconds
+
+    @contextmanager
+    def waiting(self):
+        """Counts the time spent inside the block as waiting for every open span."""
+        started = self.clock.monotonic()
+        try:
+            yield
+        finally:
+            self.add_wait(self.clock.monotonic() - started)
+
+    def write(self, path, **run_attrs):
+        """Closes any spans left open (as 'interrupted') and appends the run record to the JSONL file."""
+        for span in list(self.open_spans):
+            self.finish(span, outcome='interrupted')
+        record = {'started_at': self.started_at.isoformat(timespec='seconds'),
+                  'duration': round(self.clock.monotonic() - self.started, 3)}
+        record.update(run_attrs)
+        record['wait'] = round(sum(span['wait'] for span in self.spans if span['parent'] is None), 3)
+        record['spans'] = self.spans
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not write run metrics to {path}: {e}")
+
+
+class CommandCounter:
+    """Counts and times every WebDriver command (one HTTP round trip each) by phase and command name.
+
+    attach() wraps driver.execute on the driver instance, which every WebDriver and WebElement call goes through,
+    including WebDriverWait polling. The phase is read from phase_provider at the time of each command.
+    """
+
+    def __init__(self, phase_provider=None):
+        self.phase_provider = phase_provider or (lambda: 'other')
+        self.counts = {} # {phase: {command: [count, total seconds]}}
+
+    def attach(self, driver):
+        if getattr(driver, '_command_counter', None) is self:
+            return
+        original_execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            started = time.monotonic()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                self.record(driver_command, time.monotonic() - started)
+
+        driver.execute = counted_execute
+        driver._command_counter = self
+
+    def record(self, command, seconds):
+        phase = self.phase_provider() or 'other'
+        entry = self.counts.setdefault(phase, {}).setdefault(command, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def reset(self):
+        self.counts = {}
+
+    def total(self, phase=None, command=None):
+        """Number of commands, optionally limited to one phase and/or one command name."""
+        return sum(count for p, commands in self.counts.items() if phase in (None, p)
+                   for c, (count, _) in commands.items() if command in (None, c))
+
+    def over_budget(self, budgets):
+        """Returns the budget entries that were exceeded, as {key: (actual, budget)}.
+
+        budgets maps a phase name, or a (phase, command) tuple, to the maximum number of commands allowed.
+        """
+        exceeded = {}
+        for key, budget in budgets.items():
+            phase, command = key if isinstance(key, tuple) else (key, None)
+            actual = self.total(phase, command)
+            if actual > budget:
+                exceeded[key] = (actual, budget)
+        return exceeded
+
+    def assert_budget(self, budgets):
+        exceeded = self.over_budget(budgets)
+        if exceeded:
+            raise AssertionError("WebDriver command budget exceeded: " + ", ".join(
+                f"{key}: {actual} > {budget}" for key, (actual, budget) in exceeded.items()))
+
+    def summary(self):
+        """{phase: {'commands', 'seconds', 'by_command': {command: count}}} for logging and the run metrics."""
+        return {phase: {'commands': sum(count for count, _ in commands.values()),
+                        'seconds': round(sum(seconds for _, seconds in commands.values()), 3),
+                        'by_command': {command: count for command, (count, _) in
+                                       sorted(commands.items(), key=lambda item: -item[1][0])}}
+                for phase, commands in self.counts.items()}
+
+    def log_summary(self):
+        for phase, stats in self.summary().items():
+            top = ", ".join(f"{command} {count}" for command, count in list(stats['by_command'].items())[:5])
+            logger.info(f"WebDriver commands in {phase}: {stats['commands']} round trips, {stats['seconds']:.1f}s ({top})")
+
+
+class RunCheckpoint:
+    """Crash-safe record of today's progress, so a restarted run can skip work that is already done.
+
+    Stored as JSON next to the profile and rewritten atomically after each unit of work:
+    {"date", "searches": {device_type: count}, "cards": {section: [card ids]}, "phases": {phase: status}}.
+    A checkpoint from a previous day is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.today = datetime.now().strftime("%Y-%m-%d")
+        self.data = {'date': self.today, 'searches': {}, 'cards': {}, 'phases': {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('date') == self.today:
+                self.data.update(saved)
+                logger.info(f"Resuming from today's checkpoint: searches {self.data['searches']}, "
+                            f"phases {self.data['phases']}, {sum(len(ids) for ids in self.data['cards'].values())} cards done.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read checkpoint {self.path}: {e}. Starting today's run from scratch.")
+
+    def save(self):
+        """Writes the checkpoint atomically (temp file, fsync, rename) so a crash never leaves a torn file."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not write checkpoint {self.path}: {e}")
+
+    def searches_done(self, device_type):
+        return self.data['searches'].get(device_type, 0)
+
+    def add_search(self, device_type):
+        self.data['searches'][device_type] = self.searches_done(device_type) + 1
+        self.save()
+
+    def card_done(self, section_name, card_id):
+        return card_id in self.data['cards'].get(section_name, [])
+
+    def mark_card_done(self, section_name, card_id):
+        done = self.data['cards'].setdefault(section_name, [])
+        if card_id not in done:
+            done.append(card_id)
+            self.save()
+
+    def phase_done(self, phase):
+        return self.data['phases'].get(phase) == 'done'
+
+    def mark_phase(self, phase, status='done'):
+        self.data['phases'][phase] = status
+        self.save()
+
+
+class TermSource:
+    """Search terms read from a large text file without loading it into memory.
+
+    The file holds one term per line, or comma-separated terms (detected from its first 64KB); it may be gzipped,
+    in which case it is decompressed once into a cache file. A sidecar index of (start, end) byte offsets, one pair
+    per non-empty term, is built once and memory-mapped together with the terms, so memory use does not grow with
+    the file and any term can be read in O(1). Sidecars are named after cache_path (default: the term file itself)
+    and rebuilt whenever the term file's size or modification time changes.
+    """
+
+    INDEX_MAGIC = b'MSRTIDX1'
+    INDEX_HEADER = struct.Struct('<8sQQQQ') # magic, source size, source mtime_ns, delimiter, term count
+    INDEX_ENTRY = struct.Struct('<QQ') # start, end
+
+    def __init__(self, path, cache_path=None, rng=None):
+        self.path = os.path.abspath(path)
+        self.cache_path = cache_path or self.path
+        cache_path = self.cache_path
+        self.rng = rng or random.Random()
+        self.data_path = self._decompressed(f"{cache_path}.decompressed") if self.path.endswith('.gz') else self.path
+        self.index_path = f"{cache_path}.idx"
+        self._data = self._index = None
+        self.count = 0
+        self._open()
+
+    def _decompressed(self, cache_file):
+        """Returns a plain-text copy of the gzipped term file, refreshing it unless it was made from this exact file.
+
+        A "<cache_file>.source" stamp records the resolved path, size and mtime_ns of the .gz it was made from.
+        """
+        stat = os.stat(self.path)
+        stamp = {'path': os.path.realpath(self.path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        stamp_path = f"{cache_file}.source"
+        try:
+            with open(stamp_path, 'r', encoding='utf-8') as f:
+                current = json.load(f) == stamp and os.path.exists(cache_file)
+        except (OSError, ValueError):
+            current = False
+        if not current:
+            tmp_path = f"{cache_file}.tmp"
+            with gzip.open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp_path, cache_file)
+            # Stamp written last: an interrupted refresh leaves a missing or stale stamp and is redone next time
+            with open(f"{stamp_path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(stamp, f)
+            os.replace(f"{stamp_path}.tmp", stamp_path)
+            logger.info(f"Decompressed search term file {self.path} to {cache_file}.")
+        return cache_file
+
+    def _open(self):
+        stat = os.stat(self.data_path)
+        if not self._index_is_current(stat):
+            self._build_index(stat)
+        if stat.st_size:
+            with open(self.data_path, 'rb') as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_path, 'rb') as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = self.INDEX_HEADER.unpack_from(self._index, 0)[4]
+
+    def _index_is_current(self, stat):
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(self.INDEX_HEADER.size)
+            magic, size, mtime_ns, _, count = self.INDEX_HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        expected_size = self.INDEX_HEADER.size + count * self.INDEX_ENTRY.size
+        return (magic == self.INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+                and os.path.getsize(self.index_path) == expected_size)
+
+    def _build_index(self, stat):
+        """Scans the term file once and writes the offsets of every non-empty, whitespace-trimmed term."""
+        started = time.monotonic()
+        tmp_path = f"{self.index_path}.tmp"
+        count = 0
+        delimiter = b'\n'
+        with open(self.data_path, 'rb') as src, open(tmp_path, 'wb') as out:
+            out.write(b'\0' * self.INDEX_HEADER.size) # Header is filled in once the count is known
+            if stat.st_size:
+                data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    # A file with no line breaks in its first 64KB but with commas is one comma-separated line
+                    sample = data[:65536].rstrip(b'\r\n')
+                    if b'\n' not in sample and b',' in sample:
+                        delimiter = b','
+                    entries = bytearray()
+                    pos = 0
+                    while pos < stat.st_size:
+                        end = data.find(delimiter, pos)
+                        if end == -1:
+                            end = stat.st_size
+                        start, stop = pos, end
+                        while start < stop and data[start] in b' \t\r\n':
+                            start += 1
+                        while stop > start and data[stop - 1] in b' \t\r\n':
+                            stop -= 1
+                        if stop > start:
+                            entries += self.INDEX_ENTRY.pack(start, stop)
+                            count += 1
+                            if len(entries) >= 1024 * 1024:
+                                out.write(entries)
+                                entries.clear()
+                        pos = end + 1
+                    out.write(entries)
+                finally:
+                    data.close()
+            out.seek(0)
+            out.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, delimiter[0], count))
+        os.replace(tmp_path, self.index_path)
+        logger.info(f"Indexed {count} search terms from {self.data_path} in {time.monotonic() - started:.2f}s.")
+
+    def __len__(self):
+        return self.count
+
+    def term(self, i):
+        """Returns the i-th term of the file."""
+        if not 0 <= i < self.count:
+            raise IndexError(f"term index {i} out of range")
+        start, end = self.INDEX_ENTRY.unpack_from(self._index, self.INDEX_HEADER.size + i * self.INDEX_ENTRY.size)
+        return self._data[start:end].decode('utf-8', errors='replace')
+
+    def __iter__(self):
+        """Yields the terms lazily in file order."""
+        for i in range(self.count):
+            yield self.term(i)
+
+    @property
+    def source_key(self):
+        """(size, mtime_ns) of the term data; changes whenever the file does."""
+        stat = os.stat(self.data_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def sample(self, k):
+        """Returns up to k distinct terms drawn uniformly at random (memory proportional to k, not to the file)."""
+        return [self.term(i) for i in self.rng.sample(range(self.count), min(k, self.count))]
+
+    def close(self):
+        for mapped in (self._data, self._index):
+            if mapped is not None:
+                mapped.close()
+        self._data = self._index = None
+
+
+class QueryGenerator:
+    """Word-level n-gram (Markov chain) model of a term corpus that generates new, plausible search queries.
+
+    Built in one pass over the corpus and cached in a compact binary file: the vocabulary, then one row per context
+    of `order` word ids pointing into flat uint32 arrays of next-word ids and cumulative counts, then the sorted
+    64-bit hashes of the corpus terms. Generating a word is a dict lookup plus a bisect over the context's cumulative
+    counts, so a query takes microseconds. The cache is rebuilt when source_key (e.g. TermSource.source_key) or the
+    order changes.
+
+    Walks that merely reproduce a corpus term are dropped (a bisect over the term hashes), since searching for them
+    is no different from reusing the terms. Short terms leave higher orders few choices: on the bundled file an order
+    of 2 reproduces a corpus term in most walks, so the default order is 1.
+    """
+
+    MAGIC = b'MSRNGRM2'
+    # magic, source size, source mtime_ns, order, vocabulary, contexts, transitions, term hashes
+    HEADER = struct.Struct('<8sQQIIIII')
+    BOUNDARY = 0 # Word id marking the start and end of a query
+
+    def __init__(self, terms, cache_path=None, source_key=None, order=1, rng=None, min_words=2, max_words=8):
+        if order < 1:
+            raise ValueError(f"N-gram order must be at least 1, got {order}.")
+        self.order = order
+        self.rng = rng or random.Random()
+        self.min_words = min_words
+        self.max_words = max_words
+        self.walks = 0 # Queries generated, and how many of them were dropped as copies of a corpus term
+        self.corpus_copies = 0
+        key = tuple(source_key) if source_key else (0, 0)
+        if not (cache_path and self._load(cache_path, key)):
+            self._build(terms)
+            if cache_path:
+                self._save(cache_path, key)
+        # Context (tuple of word ids) -> (first transition, transition count)
+        width = order + 2
+        self.index = {tuple(self.contexts[row:row + order]): (self.contexts[row + order], self.contexts[row + order + 1])
+                      for row in range(0, len(self.contexts), width)}
+
+    @staticmethod
+    def _little_endian(values):
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    @staticmethod
+    def _term_hash(term):
+        digest = hashlib.blake2b(QueryHistory.normalize(term).encode('utf-8'), digest_size=8).digest()
+        return struct.unpack('<Q', digest)[0]
+
+    def is_corpus_term(self, query):
+        """True if the query (normalized like QueryHistory) is one of the corpus terms."""
+        term_hash = self._term_hash(query)
+        position = bisect_left(self.term_hashes, term_hash)
+        return position < len(self.term_hashes) and self.term_hashes[position] == term_hash
+
+    def _build(self, terms):
+        started = time.monotonic()
+        word_ids = {'': self.BOUNDARY}
+        self.vocabulary = ['']
+        counts = {}
+        term_hashes = set()
+        for term in terms:
+            ids = []
+            for word in term.split():
+                if word not in word_ids:
+                    word_ids[word] = len(self.vocabulary)
+                    self.vocabulary.append(word)
+                ids.append(word_ids[word])
+            if not ids:
+                continue
+            term_hashes.add(self._term_hash(term))
+            context = (self.BOUNDARY,) * self.order
+            for word_id in ids + [self.BOUNDARY]:
+                followers = counts.setdefault(context, {})
+                followers[word_id] = followers.get(word_id, 0) + 1
+                context = context[1:] + (word_id,)
+        self.contexts, self.next_words, self.cumulative = array('I'), array('I'), array('I')
+        for context in sorted(counts):
+            followers = counts[context]
+            self.contexts.extend(context)
+            self.contexts.extend((len(self.next_words), len(followers)))
+            total = 0
+            for word_id in sorted(followers):
+                total += followers[word_id]
+                self.next_words.append(word_id)
+                self.cumulative.append(total)
+        self.term_hashes = array('Q', sorted(term_hashes))
+        logger.info(f"Built {self.order}-gram query model: {len(self.vocabulary) - 1} words, {len(counts)} contexts "
+                    f"in {time.monotonic() - started:.2f}s.")
+
+    def _save(self, path, key):
+        vocabulary = "\n".join(self.vocabulary).encode('utf-8')
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, key[0], key[1], self.order, len(self.vocabulary),
+                                         len(self.contexts) // (self.order + 2), len(self.next_words),
+                                         len(self.term_hashes)))
+                f.write(struct.pack('<I', len(vocabulary)))
+                f.write(vocabulary)
+                for values in (self.contexts, self.next_words, self.cumulative, self.term_hashes):
+                    f.write(self._little_endian(array(values.typecode, values)).tobytes())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write query model cache {path}: {e}")
+
+    def _load(self, path, key):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, size, mtime_ns, order, vocabulary_count, context_count, transition_count, hash_count = \
+                self.HEADER.unpack_from(data, 0)
+            if magic != self.MAGIC or (size, mtime_ns) != key or order != self.order:
+                return False
+            offset = self.HEADER.size
+            (vocabulary_size,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            self.vocabulary = data[offset:offset + vocabulary_size].decode('utf-8').split("\n")
+            offset += vocabulary_size
+            arrays = []
+            for typecode, length in (('I', context_count * (order + 2)), ('I', transition_count),
+                                     ('I', transition_count), ('Q', hash_count)):
+                values = array(typecode)
+                values.frombytes(data[offset:offset + length * values.itemsize])
+                arrays.append(self._little_endian(values))
+                offset += length * values.itemsize
+            if len(self.vocabulary) != vocabulary_count or offset != len(data):
+                return False
+        except (OSError, struct.error, UnicodeDecodeError, ValueError):
+            return False
+        self.contexts, self.next_words, self.cumulative, self.term_hashes = arrays
+        return True
+
+    def generate(self):
+        """Returns one query from a random walk through the model (may be empty if the model is)."""
+        words = []
+        context = (self.BOUNDARY,) * self.order
+        while len(words) < self.max_words:
+            found = self.index.get(context)
+            if not found:
+                break
+            start, count = found
+            end = start + count
+            pick = bisect_right(self.cumulative, self.rng.random() * self.cumulative[end - 1], start, end)
+            word_id = self.next_words[min(pick, end - 1)]
+            if word_id == self.BOUNDARY:
+                break
+            words.append(self.vocabulary[word_id])
+            context = context[1:] + (word_id,)
+        return " ".join(words)
+
+    def queries(self):
+        """Lazily yields generated queries of at least min_words words that are not corpus terms.
+
+        Runs without end unless 1000 walks in a row fail those checks (an empty model, or one that only replays its corpus).
+        """
+        misses = 0
+        while misses < 1000:
+            query = self.generate()
+            self.walks += 1
+            if len(query.split()) < self.min_words:
+                misses += 1
+            elif self.is_corpus_term(query):
+                self.corpus_copies += 1
+                misses += 1
+            else:
+                misses = 0
+                yield query
+
+
+class QueryHistory:
+    """Rotating Bloom filter of the queries searched on each of the last window_days days.
+
+    One fixed-size filter per day, kept in a ring and cleared when its slot comes round again, so the file stays at
+    window_days * bits_per_day / 8 bytes however long the history gets, and add/contains cost O(window_days * hashes).
+    Queries are normalized (case-folded, whitespace collapsed) before hashing. A false positive only means a term is
+    skipped for a day; with the defaults it is vanishingly rare at a few hundred queries per day.
+    """
+
+    MAGIC = b'MSRQHIS1'
+    HEADER = struct.Struct('<8sIII') # magic, bits per day, hashes, days
+    SLOT_DAY = struct.Struct('<Q') # day ordinal the slot's filter belongs to
+
+    def __init__(self, path, window_days=7, bits_per_day=16384, hashes=7):
+        self.path = path
+        self.window_days = window_days
+        self.bits_per_day = bits_per_day
+        self.hashes = hashes
+        self.slot_size = self.SLOT_DAY.size + bits_per_day // 8
+        self.data = bytearray(self.HEADER.pack(self.MAGIC, bits_per_day, hashes, window_days)) + bytearray(self.slot_size * window_days)
+        try:
+            with open(self.path, 'rb') as f:
+                saved = f.read()
+            if saved[:self.HEADER.size] == self.data[:self.HEADER.size] and len(saved) == len(self.data):
+                self.data = bytearray(saved)
+            else:
+                logger.info(f"Query history {self.path} has a different layout. Starting a new history.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read query history {self.path}: {e}. Starting a new history.")
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.casefold().split())
+
+    def _positions(self, query):
+        digest = hashlib.blake2b(self.normalize(query).encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        # Kirsch-Mitzenmacher double hashing: k positions from two hash values
+        return [(h1 + i * h2) % self.bits_per_day for i in range(self.hashes)]
+
+    def _slot_offset(self, day):
+        return self.HEADER.size + (day % self.window_days) * self.slot_size
+
+    def contains(self, query, today=None):
+        """True if the query was (probably) searched within the window, today included."""
+        today = today or datetime.now().date().toordinal()
+        positions = self._positions(query)
+        for day in range(today - self.window_days + 1, today + 1):
+            offset = self._slot_offset(day)
+            if self.SLOT_DAY.unpack_from(self.data, offset)[0] != day:
+                continue # Slot is empty or still holds a day outside the window
+            bits = offset + self.SLOT_DAY.size
+            if all(self.data[bits + position // 8] & (1 << (position % 8)) for position in positions):
+                return True
+        return False
+
+    def add(self, query, today=None):
+        """Records the query under today's filter, recycling the slot if it still holds an older day."""
+        today = today or datetime.now().date().toordinal()
+        offset = self._slot_offset(today)
+        if self.SLOT_DAY.unpack_from(self.data, offset)[0] != today:
+            self.data[offset:offset + self.slot_size] = bytearray(self.slot_size)
+            self.SLOT_DAY.pack_into(self.data, offset, today)
+        bits = offset + self.SLOT_DAY.size
+        for position in self._positions(query):
+            self.data[bits + position // 8] |= 1 << (position % 8)
+        self.save()
+
+    def save(self):
+        """Writes the history atomically (temp file, fsync, rename), like RunCheckpoint."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not write query history {self.path}: {e}")
+
+
 class MicrosoftRewardsBot:
-    def __init__(self, user_data_dir=None):
+    def __init__(self, user_data_dir=None, max_parallel_activities=1, search_mode='box', offline_driver=False,
+                 keep_alive=False, max_session_age_hours=72, max_browser_memory_mb=None,
+                 block_resources=None, blocked_url_patterns=None, unblocked_url_patterns=None,
+                 page_load_strategy='normal', driver_factory=None, clock=None, interleave_searches=False,
+                 search_terms_file=None, query_history_days=7, generate_queries=False, ngram_order=1):
+        # Every sleep, wait deadline and random choice goes through the clock (VirtualClock replays a run instantly)
+        self.clock = clock or Clock()
+        self.rng = self.clock.rng
+
         # Define search terms - expanded list
         self.search_terms = [
             "weather forecast today", "latest news headlines", "easy recipe ideas", "popular movies to stream",
@@ -66,7 +1321,7 @@ class MicrosoftRewardsBot:
             "types of paradoxes", "famous equations", "astrophysics concepts"
         ]
         # Shuffle terms slightly for variation each run
-        random.shuffle(self.search_terms)
+        self.rng.shuffle(self.search_terms)
 
         self.desktop_search_count = 35 # Defaulting to max possible
         self.mobile_search_count = 25 # Defaulting to max possible
@@ -85,9 +1340,173 @@ class MicrosoftRewardsBot:
 
 
         self.driver = None
+        # Optional callable(options) -> driver used instead of launching Edge (e.g. the offline benchmark's fake driver)
+        self.driver_factory = driver_factory
+        # Result of the most recent probe_dashboard call (login state, points, DOM handle)
+        self.last_dashboard_probe = None
         self.base_url = "https://rewards.microsoft.com/"
         self.bing_url = "https://www.bing.com/"
 
+        # Updated XPaths based on provided HTML for points display, prioritizing structure
+        self.points_xpaths = [
+            "//mee-rewards-user-status-banner//p[contains(@class, 'pointsValue')]//span", # Confirmed structure
+            "//mee-rewards-user-status-banner//mee-rewards-counter-animation/span", # Confirmed structure (might be same as above)
+            "//div[contains(@class, 'points-package')]//span[contains(@class, 'points-label')]", # Common pattern (fallback)
+            "//p[contains(@class, 'points')] | //span[contains(@class, 'points')]", # Broader classes (fallback)
+            "//div[contains(@class, 'mee-rewards-counter')]//span[string-length(normalize-space()) > 0]", # Counter element (fallback)
+            "//mee-rewards-user-status-banner//div[contains(@class, 'pointsBalance')]//span" # Specific to the user status banner (fallback)
+        ]
+
+        # More comprehensive list of potential banner/popup close XPaths
+        self.banner_close_button_xpaths = [
+            "//promotional-item//button[contains(@aria-label, 'Close')]", # Specific promotional item
+            "//div[contains(@class, 'redeem-banner')]//button[contains(@aria-label, 'Close')]", # Redeem banner
+            "//button[contains(@aria-label, 'Close')]", # Generic close button by aria-label
+            "//button[text()='Not now']", # Common "Not now" button
+            "//button[contains(text(), 'Maybe later')]", # Common "Maybe later" button
+            "//button[contains(@class, 'close-button')]", # Common close button class
+            "//div[contains(@id, 'banner')]//button[contains(@class, 'close')]", # Generic banner close
+            "//div[contains(@role, 'dialog')]//button[contains(@aria-label, 'Close')]", # Modal dialog close
+            "//span[contains(@class, 'close-button')]", # Sometimes span is used
+            "//button[contains(@class, 'glif-msft-modal-close')]" # Another close button pattern
+        ]
+        # Evaluate all banner XPaths in one injected script instead of one 2s wait per XPath
+        self.single_pass_banner_dismissal = True
+
+        # XPaths for the Bing search box - based on common Bing HTML
+        self.search_box_xpaths = [
+             "//textarea[@id='sb_form_q']", # Most common Bing search box
+             "//input[@id='sb_form_q']",    # Older/alternative Bing input
+             "//input[@name='q']",         # Generic search input name
+             "//textarea[@name='q']",      # Generic search textarea name
+             "//input[contains(@class, 'searchbox')]", # Common search box class
+             "//textarea[contains(@class, 'searchbox')]"
+        ]
+        # Clickable daily set cards, targeting the <a> tags inside #daily-sets
+        self.daily_set_card_xpaths = [
+             ".//div[contains(@class, 'daily-set-item')]/a", # Specific structure confirmed
+             ".//a[contains(@class, 'ds-card-sec')]",       # Alternative targeting the specific class
+             ".//mee-card//a[contains(@href, '')]"          # Fallback: any link within a mee-card
+        ]
+        # Clickable other activity cards inside #more-activities
+        self.other_activity_card_xpaths = [
+            ".//div[contains(@class, 'rewards-card-container')]/a[contains(@class, 'ds-card-sec')]", # Specific structure confirmed
+            ".//div[contains(@class, 'more-earning-card-item')]/a", # Structure seen in Daily Set, might apply here
+            ".//a[contains(@class, 'ds-card-sec')]",       # Alternative targeting the specific class
+            ".//div[contains(@class, 'rewards-card')]//mee-card", # Broader class from source, target mee-card
+            ".//div[contains(@class, 'promo-item')]//mee-card", # Another common promo pattern
+            ".//mee-card//a[contains(@href, '')]"          # Fallback: any link within a mee-card
+        ]
+
+        # Resolved msedgedriver path cached per installed Edge version, so startup needs no network lookup.
+        # offline_driver=True never contacts the network: it uses the cache or an msedgedriver on PATH.
+        self.driver_cache_path = f"{self.user_data_dir}.driver.json"
+        self.offline_driver = offline_driver
+
+        # Span timings for the current run, appended to <profile>.metrics.jsonl when the run ends
+        self.metrics = RunMetrics(self.clock)
+        self.metrics_path = f"{self.user_data_dir}.metrics.jsonl"
+        # WebDriver round trips per phase (the outermost open metrics span)
+        self.command_counter = CommandCounter(phase_provider=self.current_phase)
+
+        # Per-day progress checkpoint, so a crashed or killed run resumes where it stopped
+        self.checkpoint = RunCheckpoint(f"{self.user_data_dir}.checkpoint.json")
+
+        # Search terms are sampled from a term file (streamed, see TermSource); the built-in list above is the fallback
+        self.term_source = self.open_term_source(search_terms_file)
+        # Optional n-gram model of the terms that generates fresh queries instead of reusing the terms themselves
+        self.query_generator = self.open_query_generator(ngram_order) if generate_queries else None
+        self.generated_queries = iter(self.query_generator.queries()) if self.query_generator else None
+        # Base queries searched in the last query_history_days days are not drawn again (0 disables the history)
+        self.query_history = QueryHistory(f"{self.user_data_dir}.query_history.bin", window_days=query_history_days) \
+            if query_history_days > 0 else None
+
+        # Reorder every fallback list by what worked on previous runs (stats live next to the profile).
+        # Card XPaths are left out: the snapshot script evaluates all of them at once, so their order saves nothing.
+        self.selector_registry = SelectorRegistry(f"{self.user_data_dir}.selectors.json")
+        self.points_xpaths = self.selector_registry.ordered('points', self.points_xpaths)
+        self.banner_close_button_xpaths = self.selector_registry.ordered('banner_close', self.banner_close_button_xpaths)
+        self.search_box_xpaths = self.selector_registry.ordered('search_box', self.search_box_xpaths)
+
+        # Element each navigation waits for under the eager/none page-load strategies:
+        # the points counter (or the sign-in form after a redirect) on the dashboard, the search box on Bing
+        self.dashboard_ready_xpath = " | ".join(self.points_xpaths + ["//input[@name='loginfmt']"])
+        self.search_box_ready_xpath = " | ".join(self.search_box_xpaths)
+
+        # Dashboard card sections processed by complete_daily_set / complete_other_activities
+        self.card_sections = {
+            'daily_set': {
+                'title': "daily set",
+                'label': "daily set",
+                'container_xpath': "//*[@id='daily-sets']", # Use the confirmed ID
+                'card_xpaths': self.daily_set_card_xpaths,
+                'fallback_prefix': "Unknown_DailySet",
+                'required': True, # Daily set is always present; a missing container is a failure
+            },
+            'more_activities': {
+                'title': "other activities",
+                'label': "other activity",
+                'container_xpath': "//*[@id='more-activities']", # Use the confirmed ID
+                'card_xpaths': self.other_activity_card_xpaths,
+                'fallback_prefix': "Unknown_OtherActivity",
+                'required': False,
+            },
+        }
+
+        # Keep the dashboard tab open between cards and refresh only the card just acted on,
+        # reloading the dashboard only when its DOM was actually invalidated
+        self.incremental_dashboard = True
+        self.dashboard_handle = None # Window handle of the dashboard tab while cards are being processed
+        # Section name -> ids of cards that failed or were never reached in this run (None: no cards were seen)
+        self.unfinished_cards = {}
+        # How many activity tabs may run at once (1 = one card after another)
+        self.max_parallel_activities = max(1, int(max_parallel_activities))
+
+        # 'box' types each query into the Bing search box; 'url' navigates straight to the results URL
+        if search_mode not in ('box', 'url'):
+            raise ValueError(f"Unknown search mode '{search_mode}'. Use 'box' or 'url'.")
+        self.search_mode = search_mode
+        self.search_form_code = "QBLH" # Form code Bing attaches to searches typed into its search box
+        self.search_results_xpath = "//*[@id='b_results']"
+        # Early exit: read the dashboard search counters before and during the search loop
+        self.points_per_search = 3 # Points Bing awards per qualifying search
+        self.search_progress_check_interval = 5 # Re-check the counters every N searches
+        self.search_progress_timeout = 5 # Seconds the counters fetch may take before falling back to the page data
+        self.progress_handle = None # Background dashboard tab used to read the counters
+        self.search_plans = {device_type: {'requested': 0, 'planned': 0, 'performed': 0, 'cap_reached': False} for device_type in ('desktop', 'mobile')}
+        # Interleaved searches: a desktop tab and a mobile-emulated tab search side by side in one session
+        self.interleave_searches = interleave_searches
+        self.mobile_user_agent = "Mozilla/5.0 (Linux; Android 10; SM-G975F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.106 Mobile Safari/537.36 EdgA/45.05.4.5058"
+        self.mobile_metrics = {'width': 375, 'height': 812, 'deviceScaleFactor': 3, 'mobile': True}
+
+        # Keep-alive: hold one browser between scheduled runs instead of cold-starting Edge every time.
+        # The session is health-checked before reuse and recycled when unhealthy or older than max_session_age_hours.
+        # Runs are scheduled daily, so the age limit must exceed 24h for a session to be reused at all.
+        self.keep_alive = keep_alive
+        self.max_session_age = max_session_age_hours * 3600 # seconds
+        # Resident memory of all browser processes; None skips the process walk (seconds of PowerShell on Windows)
+        self.max_browser_memory_mb = max_browser_memory_mb
+        self.max_session_windows = 3 # More windows than this at parking time means the run leaked tabs
+        self.health_check_timeout = 5 # Seconds a healthy browser needs to answer a trivial script
+        self.script_timeout = None # Async script timeout last set on the current driver
+        self.driver_started_at = None
+
+        # Opt-in resource policy, applied per tab through Network.setBlockedURLs (see build_url_blocklist)
+        self.blocked_url_patterns = build_url_blocklist(block_resources, blocked_url_patterns, unblocked_url_patterns)
+        self.resource_policy_handles = set() # Tabs the blocklist has been sent to
+        self.resource_stats = {'pages': 0, 'blocked': {}, 'transferred_bytes': 0}
+
+        # Selenium page-load strategy: 'normal' blocks driver.get until every subresource has loaded,
+        # 'eager' returns once the DOM is parsed, 'none' returns immediately. Readiness then comes from ready_xpath.
+        if page_load_strategy not in ('normal', 'eager', 'none'):
+            raise ValueError(f"Unknown page load strategy '{page_load_strategy}'. Use 'normal', 'eager' or 'none'.")
+        self.page_load_strategy = page_load_strategy
+
+        # Upper bound for event-driven page readiness waits (seconds)
+        self.page_ready_timeout = 15
+        # How long the network must stay quiet to count as idle (milliseconds)
+        self.network_idle_ms = 500
+
     def setup_driver(self):
         """Initialize and configure the Edge webdriver with persistent session using webdriver-manager"""
         try:
@@ -104,6 +1523,7 @@ class MicrosoftRewardsBot:
 
             options = EdgeOptions()
             options.use_chromium = True
+            options.page_load_strategy = self.page_load_strategy
 
             # Set user data directory for persistent session
             # Ensure profile-directory is specified alongside user-data-dir
@@ -119,24 +1539,271 @@ class MicrosoftRewardsBot:
             options.add_argument("--disable-features=PasswordManager")
 
 
+            # Performance log carries the Network events used to report blocked requests per page
+            if self.blocked_url_patterns:
+                options.set_capability("ms:loggingPrefs", {"performance": "ALL"})
+
             # Optional: Headless mode (uncomment to enable)
             # options.add_argument("--headless")
             # options.add_argument("--disable-gpu") # Needed for headless
             # options.add_argument("--no-sandbox") # Often needed in headless/docker environments
             # options.add_argument("--disable-dev-shm-usage") # Often needed in headless/docker environments
 
-            logger.info("Initializing Edge WebDriver via webdriver-manager...")
-            # Use the latest version manager can find
-            service = EdgeService(EdgeChromiumDriverManager().install())
-
-            self.driver = webdriver.Edge(service=service, options=options)
+            logger.info("Initializing Edge WebDriver...")
+            if self.driver_factory:
+                self.driver = self.driver_factory(options)
+            else:
+                driver_path, from_cache = self.resolve_driver_path()
+                try:
+                    self.driver = webdriver.Edge(service=EdgeService(driver_path), options=options)
+                except Exception as start_err:
+                    # A cached driver that no longer matches the browser fails to start: re-resolve once
+                    if not from_cache or self.offline_driver:
+                        raise
+                    logger.warning(f"Cached msedgedriver failed to start ({start_err}). Re-resolving the driver.")
+                    driver_path, _ = self.resolve_driver_path(force_refresh=True)
+                    self.driver = webdriver.Edge(service=EdgeService(driver_path), options=options)
+            self.driver_started_at = time.time()
+            self.script_timeout = None
+            self.resource_policy_handles = set()
+            self.command_counter.attach(self.driver)
             logger.info("Edge WebDriver initialized successfully.")
-            # Add a brief initial wait for browser window to settle
-            time.sleep(3)
+            # Wait until the browser reports a usable window instead of sleeping a fixed time
+            self.wait(self.page_ready_timeout, poll_frequency=0.25).until(
+                lambda d: len(d.window_handles) > 0
+            )
+            if self.blocked_url_patterns:
+                logger.info(f"Resource blocking enabled with {len(self.blocked_url_patterns)} URL patterns.")
+                self.apply_resource_policy()
         except Exception as e:
             logger.error(f"Failed to initialize Edge WebDriver: {str(e)}")
             raise # Re-raise the exception to stop the workflow
 
+    def resolve_driver_path(self, force_refresh=False):
+        """Returns (msedgedriver path, came_from_cache), only asking webdriver-manager when the Edge version changed."""
+        edge_version = detect_edge_version()
+        cache = {}
+        try:
+            with open(self.driver_cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read driver cache {self.driver_cache_path}: {e}")
+
+        cached_path = cache.get('driver_path')
+        cache_usable = bool(cached_path) and os.path.isfile(cached_path)
+        # An undetectable browser version cannot invalidate the cache; a failed start does (see setup_driver)
+        version_matches = edge_version is None or cache.get('edge_version') == edge_version
+        if cache_usable and not force_refresh and (version_matches or self.offline_driver):
+            if not version_matches:
+                logger.warning(f"Offline mode: cached msedgedriver was resolved for Edge {cache.get('edge_version')}, "
+                               f"installed Edge is {edge_version}. Using it anyway.")
+            logger.info(f"Using cached msedgedriver for Edge {cache.get('edge_version') or 'unknown'}: {cached_path}")
+            return cached_path, True
+
+        if self.offline_driver:
+            path_driver = shutil.which("msedgedriver")
+            if path_driver:
+                logger.info(f"Offline mode: no usable cached driver, using msedgedriver from PATH: {path_driver}")
+                return path_driver, False
+            raise RuntimeError("Offline mode: no cached msedgedriver and none on PATH. Run once online to populate the cache.")
+
+        logger.info(f"Resolving msedgedriver via webdriver-manager (installed Edge: {edge_version or 'unknown'})...")
+        driver_path = EdgeChromiumDriverManager().install()
+        try:
+            tmp_path = f"{self.driver_cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'edge_version': edge_version, 'driver_path': driver_path,
+                           'resolved_at': datetime.now().isoformat(timespec='seconds')}, f, indent=1)
+            os.replace(tmp_path, self.driver_cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write driver cache {self.driver_cache_path}: {e}")
+        return driver_path, False
+
+    def check_session_health(self):
+        """Returns (healthy, reason) for the current driver: responsiveness, open windows, age and browser memory."""
+        if not self.driver:
+            return False, "no driver"
+        age = time.time() - (self.driver_started_at or 0)
+        if age > self.max_session_age:
+            return False, f"session is {age / 3600:.1f}h old (limit {self.max_session_age / 3600:.1f}h)"
+        try:
+            self.set_script_timeout(self.health_check_timeout)
+            started = time.time()
+            # Async round trip through the renderer: a hung tab fails here instead of hanging the run
+            self.driver.execute_async_script(HEALTH_CHECK_JS)
+            latency = time.time() - started
+            handles = self.driver.window_handles
+        except Exception as e:
+            return False, f"browser not responding ({e.__class__.__name__})"
+        if not handles:
+            return False, "no open windows"
+        if self.max_browser_memory_mb is None:
+            return True, f"responded in {latency * 1000:.0f}ms, {age / 60:.0f}min old"
+        # The parked tab is about:blank, so only the memory of the whole browser says anything about leaks
+        memory_mb = self.browser_memory_mb()
+        if memory_mb is not None and memory_mb > self.max_browser_memory_mb:
+            return False, f"browser using {memory_mb:.0f}MB (limit {self.max_browser_memory_mb}MB)"
+        memory = "unknown memory" if memory_mb is None else f"{memory_mb:.0f}MB"
+        return True, f"responded in {latency * 1000:.0f}ms, {memory}, {age / 60:.0f}min old"
+
+    def browser_memory_mb(self):
+        """Resident memory of every browser process (renderers, GPU, utilities) in MB, or None if unknown.
+
+        Sums the process tree below the driver service: msedgedriver, the msedge browser process it started and
+        that process's children. (CDP SystemInfo.getProcessInfo would list them too, but only on the browser
+        target, which execute_cdp_cmd does not reach.)
+        """
+        service_process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        if service_process is None:
+            return None
+        return processes_rss_mb(process_tree_pids(service_process.pid))
+
+    def ensure_driver(self):
+        """Reuses a healthy kept-alive driver, otherwise starts a fresh one."""
+        if self.keep_alive and self.driver:
+            healthy, reason = self.check_session_health()
+            if healthy:
+                logger.info(f"Reusing kept-alive browser session ({reason}).")
+                return
+            logger.info(f"Recycling browser session: {reason}.")
+            self.quit_driver()
+        self.setup_driver()
+
+    def park_driver(self):
+        """Leaves a kept-alive browser in a clean state for the next run: one blank tab, default user agent, maximized."""
+        if not self.driver:
+            return
+        try:
+            handles = self.driver.window_handles
+            if len(handles) > self.max_session_windows:
+                # Counted before tidying up: a run that leaves this many tabs behind is leaking them
+                logger.warning(f"{len(handles)} windows were left open by the run. Quitting the browser instead of parking it.")
+                self.quit_driver()
+                return
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+            self.driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ""})
+            self.driver.get("about:blank")
+            self.driver.maximize_window()
+            logger.info("Browser session parked for the next scheduled run.")
+        except Exception as e:
+            # A session that cannot be tidied up is not worth keeping
+            logger.warning(f"Could not park browser session ({e}). Quitting it instead.")
+            self.quit_driver()
+
+    def open_term_source(self, path=None):
+        """Opens the search term file given with --terms-file, or returns None to use the built-in list."""
+        if not path:
+            return None
+        if not os.path.exists(path):
+            logger.warning(f"Search term file {path} not found. Using the built-in search terms.")
+            return None
+        try:
+            # Index sidecars live next to the profile, so the term file's directory may be read-only. They are named
+            # after the resolved path, so two term files with the same name never share (or reuse) each other's.
+            path_key = hashlib.blake2b(os.path.realpath(path).encode('utf-8'), digest_size=6).hexdigest()
+            source = TermSource(path, cache_path=f"{self.user_data_dir}.{os.path.basename(path)}.{path_key}", rng=self.rng)
+        except Exception as e:
+            logger.warning(f"Could not read search term file {path}: {e}. Using the built-in search terms.")
+            return None
+        if not len(source):
+            logger.warning(f"Search term file {path} has no terms. Using the built-in search terms.")
+            source.close()
+            return None
+        logger.info(f"Using {len(source)} search terms from {path}.")
+        return source
+
+    def open_query_generator(self, order=1):
+        """Builds (or loads the cached) QueryGenerator over the term file, or over the built-in list if there is none."""
+        try:
+            if self.term_source:
+                generator = QueryGenerator(self.term_source, cache_path=f"{self.term_source.cache_path}.ngram",
+                                           source_key=self.term_source.source_key, order=order, rng=self.rng)
+            else:
+                generator = QueryGenerator(self.search_terms, order=order, rng=self.rng)
+        except Exception as e:
+            logger.warning(f"Could not build the query generator: {e}. Using the search terms as they are.")
+            return None
+        if not generator.index:
+            logger.warning("Query generator has no model to draw from. Using the search terms as they are.")
+            return None
+        return generator
+
+    def _sample_terms(self, k, generated=False):
+        if generated:
+            # Pulled lazily from the generator's endless query stream
+            queries = list(itertools.islice(self.generated_queries, k))
+            if len(queries) < k:
+                logger.warning("Query generator stopped producing new queries. Using the search terms as they are.")
+                self.generated_queries = None
+            return queries
+        if self.term_source:
+            return self.term_source.sample(k)
+        return self.rng.sample(self.search_terms, min(k, len(self.search_terms)))
+
+    def draw_search_terms(self, count):
+        """Returns up to count distinct search terms, sampled at random from the term file or the built-in list.
+
+        With generate_queries, generated queries are drawn first and the terms themselves only make up a shortfall.
+        Terms found in the query history are skipped. Only if the pool runs out are recently used terms taken after all.
+        """
+        generator = self.query_generator if self.generated_queries else None
+        chosen, recent, seen = [], [], set()
+        for generated in ([True, False] if generator else [False]):
+            if generated:
+                pool_size = float('inf') # The generator never runs dry, but may only repeat itself (see below)
+                walks, corpus_copies = generator.walks, generator.corpus_copies
+            else:
+                pool_size = len(self.term_source) if self.term_source else len(self.search_terms)
+            drawn = 0 # Distinct terms from this source
+            # A few sampling rounds, oversampling more each time to make up for skipped terms. Fewer for the generator:
+            # a model that needs more walks than that mostly repeats itself, and the terms are a better top-up.
+            for attempt in range(3 if generated else 5):
+                wanted = count - len(chosen)
+                if wanted <= 0 or drawn >= pool_size or (generated and not self.generated_queries):
+                    break
+                drawn_before = drawn
+                for term in self._sample_terms(int(min(pool_size, 2 * wanted * 4 ** attempt)), generated):
+                    key = QueryHistory.normalize(term)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    drawn += 1
+                    if self.query_history and self.query_history.contains(term):
+                        recent.append(term)
+                    elif len(chosen) < count:
+                        chosen.append(term)
+                if generated and drawn == drawn_before:
+                    break # Nothing new in a whole round: the model's distinct queries are used up
+            if generated:
+                logger.info(f"Drew {drawn} distinct new queries from {generator.walks - walks} walks of the "
+                            f"{generator.order}-gram model ({generator.corpus_copies - corpus_copies} walks reproduced a search term and were dropped).")
+                if len(chosen) < count:
+                    logger.warning(f"Query generator had only {len(chosen)} of {count} queries not used recently. "
+                                   f"Drawing the rest from the search terms.")
+        if recent:
+            logger.info(f"Skipped {len(recent)} search terms used in the last {self.query_history.window_days} days.")
+        if len(chosen) < count and recent:
+            logger.warning(f"Only {len(chosen)} of {count} search terms are unused recently. Reusing {min(len(recent), count - len(chosen))} recent ones.")
+            chosen += recent[:count - len(chosen)]
+        return chosen
+
+    def prepare_new_run(self):
+        """Resets per-run state so a kept-alive bot instance starts each scheduled run like a new one."""
+        self.rng.shuffle(self.search_terms)
+        self.last_dashboard_probe = None
+        self.dashboard_handle = None
+        self.unfinished_cards = {}
+        self.progress_handle = None
+        self.search_plans = {device_type: {'requested': 0, 'planned': 0, 'performed': 0, 'cap_reached': False} for device_type in ('desktop', 'mobile')}
+        self.resource_stats = {'pages': 0, 'blocked': {}, 'transferred_bytes': 0}
+        # Picks up a new day's (empty) checkpoint, or today's progress if a run was interrupted
+        self.checkpoint = RunCheckpoint(self.checkpoint.path)
+
     def quit_driver(self):
         """Quits the WebDriver instance."""
         if self.driver:
@@ -149,38 +1816,156 @@ class MicrosoftRewardsBot:
                 logger.warning(f"Error during driver quit: {e}")
             self.driver = None # Ensure the reference is cleared
 
-    def dismiss_banners(self):
-        """Attempts to dismiss common banners like the 'Enough points to redeem' banner."""
+    def current_phase(self):
+        """Name of the outermost open metrics span (e.g. 'searches:mobile'), used to bucket WebDriver commands."""
+        if not self.metrics.open_spans:
+            return 'other'
+        span = self.metrics.open_spans[0]
+        return f"{span['name']}:{span['device']}" if span.get('device') else span['name']
+
+    def sleep(self, seconds):
+        """Sleeps through the clock and counts the time as wait time in the run metrics."""
+        with self.metrics.waiting():
+            self.clock.sleep(seconds, label=self.current_phase())
+
+    def wait(self, timeout, poll_frequency=0.5, ignored_exceptions=None):
+        """WebDriverWait on the current driver whose deadline and polling sleeps go through the clock."""
+        return ClockedWait(self.driver, timeout, self.clock, self.sleep,
+                           poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
+
+    def wait_for_page_ready(self, ready_xpath=None, timeout=None, network_idle=False):
+        """Waits for real readiness signals (document.readyState, a target element, network idle) instead of a fixed sleep.
+
+        Returns True as soon as the page is ready, or False if the timeout ceiling was reached.
+        """
+        timeout = self.page_ready_timeout if timeout is None else timeout
+        try:
+            # Under 'eager'/'none' the poll can land while the old document unloads or the new one has no
+            # context yet; those errors just mean "not ready", so they are retried until the timeout.
+            self.wait(timeout, poll_frequency=0.25,
+                      ignored_exceptions=(JavascriptException, StaleElementReferenceException, NoSuchFrameException)).until(
+                lambda d: d.execute_script(PAGE_READY_JS, ready_xpath, network_idle, self.network_idle_ms,
+                                           self.page_load_strategy != 'normal')
+            )
+            return True
+        except TimeoutException:
+            logger.debug(f"Page not ready within {timeout}s (ready_xpath={ready_xpath}, network_idle={network_idle}). Continuing anyway.")
+            return False
+        except Exception as e:
+            logger.debug(f"Error while waiting for page readiness: {e}. Continuing anyway.")
+            return False
+
+    def navigate(self, url, ready_xpath=None, network_idle=False, timeout=None):
+        """Navigates to a URL and waits for it to become ready. Returns True if the readiness signal fired."""
+        self.apply_resource_policy()
+        if self.page_load_strategy == 'none':
+            try:
+                self.driver.execute_script(MARK_DOCUMENT_STALE_JS)
+            except Exception:
+                pass # No document to mark (e.g. a crashed tab); nothing stale to confuse the wait either
+        self.driver.get(url)
+        ready = self.wait_for_page_ready(ready_xpath=ready_xpath, timeout=timeout, network_idle=network_idle)
+        self.report_resource_usage(url)
+        return ready
+
+    def apply_resource_policy(self):
+        """Sends the URL blocklist to the current tab once (Network.setBlockedURLs is scoped to a single tab)."""
+        if not self.blocked_url_patterns or not self.driver:
+            return
+        try:
+            handle = self.driver.current_window_handle
+            if handle in self.resource_policy_handles:
+                return
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_url_patterns})
+            self.resource_policy_handles.add(handle)
+        except Exception as e:
+            logger.warning(f"Could not apply resource blocking to the current tab: {e}")
+
+    def report_resource_usage(self, page_label):
+        """Logs how many requests were blocked (by resource type) and how many bytes were transferred since the last report."""
+        if not self.blocked_url_patterns or not self.driver:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return
+        blocked = {}
+        transferred = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.loadingFailed' and params.get('blockedReason'):
+                resource_type = params.get('type', 'Other')
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+            elif message.get('method') == 'Network.loadingFinished':
+                transferred += int(params.get('encodedDataLength', 0))
+        self.resource_stats['pages'] += 1
+        self.resource_stats['transferred_bytes'] += transferred
+        for resource_type, count in blocked.items():
+            self.resource_stats['blocked'][resource_type] = self.resource_stats['blocked'].get(resource_type, 0) + count
+        breakdown = ", ".join(f"{resource_type} {count}" for resource_type, count in sorted(blocked.items())) or "none"
+        logger.info(f"Resources for {page_label}: blocked {sum(blocked.values())} requests ({breakdown}), "
+                    f"transferred {transferred / 1024:.0f} KB.")
+
+    def wait_for_new_window(self, handles_before, timeout=5):
+        """Waits for a new browser tab to appear after a click. Returns the new handle, or None if none opened."""
+        try:
+            self.wait(timeout, poll_frequency=0.25).until(
+                lambda d: len(d.window_handles) > len(handles_before)
+            )
+        except TimeoutException:
+            return None
+        new_handles = [handle for handle in self.driver.window_handles if handle not in handles_before]
+        return new_handles[-1] if new_handles else None
+
+    def dismiss_banners(self, single_pass=None):
+        """Attempts to dismiss common banners like the 'Enough points to redeem' banner.
+
+        In single-pass mode every close-button XPath is evaluated by one injected script that clicks the
+        first visible match, so a page without banners costs a single WebDriver call.
+        Returns the XPath that fired, or None if nothing was dismissed.
+        """
+        single_pass = self.single_pass_banner_dismissal if single_pass is None else single_pass
         logger.info("Attempting to dismiss potential banners/popups.")
-        # More comprehensive list of potential banner/popup close XPaths
-        banner_close_button_xpaths = [
-            "//promotional-item//button[contains(@aria-label, 'Close')]", # Specific promotional item
-            "//div[contains(@class, 'redeem-banner')]//button[contains(@aria-label, 'Close')]", # Redeem banner
-            "//button[contains(@aria-label, 'Close')]", # Generic close button by aria-label
-            "//button[text()='Not now']", # Common "Not now" button
-            "//button[contains(text(), 'Maybe later')]", # Common "Maybe later" button
-            "//button[contains(@class, 'close-button')]", # Common close button class
-            "//div[contains(@id, 'banner')]//button[contains(@class, 'close')]", # Generic banner close
-            "//div[contains(@role, 'dialog')]//button[contains(@aria-label, 'Close')]", # Modal dialog close
-            "//span[contains(@class, 'close-button')]", # Sometimes span is used
-            "//button[contains(@class, 'glif-msft-modal-close')]" # Another close button pattern
-        ]
 
-        clicked_one = False
+        if single_pass:
+            try:
+                started = self.clock.monotonic()
+                fired_xpath = self.driver.execute_script(DISMISS_BANNERS_JS, self.banner_close_button_xpaths)
+                if fired_xpath:
+                    self.selector_registry.record_first_match('banner_close', self.banner_close_button_xpaths, fired_xpath, self.clock.monotonic() - started)
+                    logger.info(f"Dismissed potential banner/popup using XPath: {fired_xpath}.")
+                    # Give the element time to disappear
+                    self.sleep(1)
+                else:
+                    logger.debug("No dismissible banners/popups found.")
+                return fired_xpath
+            except Exception as e:
+                # Fall back to the per-XPath waits if the injected script cannot run on this page
+                logger.debug(f"Single-pass banner dismissal failed: {e}. Falling back to per-XPath checks.")
+
+        clicked_xpath = None
         # Iterate and try clicking each potential close button
-        for xpath in banner_close_button_xpaths:
+        for xpath in self.banner_close_button_xpaths:
             try:
                 # Wait briefly for the close button to be clickable
                 # Use a very short wait per XPath to not block for too long
-                close_button = WebDriverWait(self.driver, 2).until(
+                started = self.clock.monotonic()
+                close_button = self.wait(2).until(
                     EC.element_to_be_clickable((By.XPATH, xpath))
                 )
+                self.selector_registry.record('banner_close', xpath, True, self.clock.monotonic() - started)
                 # Use JavaScript click for robustness against overlays
                 self.driver.execute_script("arguments[0].click();", close_button)
                 logger.info(f"Dismissed potential banner/popup using XPath: {xpath}.")
-                clicked_one = True
+                clicked_xpath = xpath
                 # Give the element time to disappear
-                time.sleep(1)
+                self.sleep(1)
                 # After successfully clicking one, it's possible others appear or the page shifts,
                 # so we'll break after the first successful click assuming the most prominent one is handled.
                 break
@@ -195,80 +1980,68 @@ class MicrosoftRewardsBot:
                 logger.debug(f"Error dismissing banner with XPath {xpath}: {e}. Trying next XPath.")
                 pass
 
-        if clicked_one:
+        if clicked_xpath:
              logger.info("Attempted to dismiss banners/popups.")
         else:
              logger.debug("No dismissible banners/popups found.")
-        time.sleep(1) # Small buffer after attempting dismissal
+        self.sleep(1) # Small buffer after attempting dismissal
+        return clicked_xpath
 
 
-    def check_login_status(self):
-        """Check if already logged in to Microsoft account by waiting for points element on rewards dashboard."""
+    def probe_dashboard(self, navigate=True, timeout=10):
+        """Loads the rewards dashboard once and reads login state and points balance from that single page load.
+
+        Returns a dict with 'logged_in', 'points' (string or None), 'xpath' (the points XPath that matched),
+        'points_element', 'document' (handle to the page's root element, which goes stale once the DOM is replaced),
+        'window_handle' and 'url'. The result is also kept in self.last_dashboard_probe.
+        """
+        probe = {'logged_in': False, 'points': None, 'xpath': None, 'points_element': None,
+                 'document': None, 'window_handle': None, 'url': None}
         try:
-            logger.info("Checking login status on rewards page...")
-            # Always navigate to the rewards page first
-            self.driver.get(self.base_url)
-            # Add a brief wait for the page to start loading
-            time.sleep(5)
+            if navigate:
+                # Navigate to the rewards page and wait for the points counter (or the sign-in redirect)
+                self.navigate(self.base_url, ready_xpath=self.dashboard_ready_xpath)
 
             # Dismiss any banners that appear immediately upon loading
             self.dismiss_banners()
 
-            # Updated XPaths based on provided HTML for points display
-            points_xpaths = [
-                "//mee-rewards-user-status-banner//p[contains(@class, 'pointsValue')]//span", # Confirmed structure
-                "//mee-rewards-user-status-banner//mee-rewards-counter-animation/span", # Confirmed structure (might be same as above)
-                "//div[contains(@class, 'points-package')]//span[contains(@class, 'points-label')]", # Common pattern (fallback)
-                "//p[contains(@class, 'points')] | //span[contains(@class, 'points')]", # Broader classes (fallback)
-                "//div[contains(@class, 'mee-rewards-counter')]//span[string-length(normalize-space()) > 0]", # Counter element (fallback)
-                "//mee-rewards-user-status-banner//div[contains(@class, 'pointsBalance')]//span" # Specific to the user status banner (fallback)
-            ]
-
-            # Wait for visibility of *any* of these potential points elements
-            # Then, wait for the element to have text and retrieve it
-            # Basic validation: check if it's non-empty and looks like a number (possibly with commas)
-            for xpath in points_xpaths:
+            if "login.live.com" in self.driver.current_url.lower():
+                logger.info("Rewards dashboard redirected to the sign-in page. Not logged in.")
+            else:
+                # Evaluate every points XPath in one query per poll instead of sequential per-XPath timeouts
                 try:
-                    logger.debug(f"Checking presence and visibility of points element with XPath: {xpath}")
-                    points_element = WebDriverWait(self.driver, 10).until( # Wait up to 10s for visibility
-                         EC.visibility_of_element_located((By.XPATH, xpath))
-                    )
-                    # Additionally check for text presence and validate
-                    WebDriverWait(self.driver, 5).until(
-                         EC.text_to_be_present_in_element((By.XPATH, xpath), "")
+                    started = self.clock.monotonic()
+                    found = self.wait(timeout, poll_frequency=0.25).until(
+                        lambda d: d.execute_script(READ_POINTS_JS, self.points_xpaths)
                     )
-
-                    raw_text = points_element.text.strip()
-                    aria_label_text = points_element.get_attribute("aria-label") # Check aria-label as seen in HTML
-
-                    # Prioritize aria-label if it's a number, fallback to text
-                    text_to_check = aria_label_text if aria_label_text and aria_label_text.replace(",", "").isdigit() else raw_text
-
-                    # Basic validation: check if it's non-empty and looks like a number (possibly with commas)
-                    # Also, exclude common non-point texts found in similar elements
-                    if text_to_check and text_to_check.replace(",", "").isdigit() and len(text_to_check.replace(",", "")) > 0: # Check if it looks like a number with at least one digit
-                         points = text_to_check
-                         logger.info(f"Login status confirmed: Points element found and looks valid ('{text_to_check}').")
-                         return True # Found a valid points element, logged in
-                    else:
-                         logger.debug(f"XPath {xpath} found element, but text '{raw_text}' / aria_label '{aria_label_text}' did not look like points. Trying next XPath.")
-                         pass # Try next XPath
-
+                    self.selector_registry.record_first_match('points', self.points_xpaths, found['xpath'], self.clock.monotonic() - started)
+                    probe.update({
+                        'logged_in': True,
+                        'points': found['points'],
+                        'xpath': found['xpath'],
+                        'points_element': found['element'],
+                        'document': found['document'],
+                    })
+                    logger.info(f"Dashboard probe: logged in, points balance '{found['points']}' (using XPath: {found['xpath']}).")
                 except TimeoutException:
-                    logger.debug(f"Points element not found/visible with XPath: {xpath} within timeout.")
-                    pass # Try next XPath
-                except Exception as e:
-                    logger.warning(f"Error checking points element with XPath {xpath}: {e}. Trying next XPath.")
-                    pass # Try next XPath
-
-
-            logger.info("Points element not found/visible within timeout using any XPath. Assuming not logged in.")
-            return False # No valid points element found after trying all XPaths
+                    logger.info(f"Points element not found/visible within {timeout}s using any XPath. Assuming not logged in.")
 
+            probe['window_handle'] = self.driver.current_window_handle
+            probe['url'] = self.driver.current_url
         except Exception as e:
-            logger.error(f"Error during login status check workflow: {str(e)}")
+            logger.error(f"Error during dashboard probe: {str(e)}")
             # If any general error occurs, assume not logged in or unable to verify
-            return False
+
+        self.last_dashboard_probe = probe
+        return probe
+
+    def check_login_status(self):
+        """Check if already logged in to Microsoft account by probing the points element on the rewards dashboard."""
+        logger.info("Checking login status on rewards page...")
+        probe = self.probe_dashboard(navigate=True)
+        if probe['logged_in']:
+            logger.info(f"Login status confirmed: Points element found and looks valid ('{probe['points']}').")
+        return probe['logged_in']
 
     def login(self):
         """Handles login process by checking status and waiting for manual login if needed."""
@@ -283,9 +2056,8 @@ class MicrosoftRewardsBot:
         logger.info("Not logged in. Navigating to login page for manual authentication.")
         try:
             # Navigate directly to the Microsoft account login page
-            self.driver.get("https://account.microsoft.com/account/")
+            self.navigate("https://account.microsoft.com/account/", network_idle=True) # Let any immediate redirect settle
             logger.info(f"Navigated to: {self.driver.current_url}")
-            time.sleep(5) # Give it a few seconds to load/redirect
 
             # If it redirects quickly back to rewards, re-check status
             if self.base_url in self.driver.current_url:
@@ -312,7 +2084,7 @@ class MicrosoftRewardsBot:
 
         # Wait until the URL no longer contains common login/account paths
         try:
-            WebDriverWait(self.driver, 300).until( # Wait up to 5 minutes
+            self.wait(300).until( # Wait up to 5 minutes
                 lambda d: "login.live.com" not in d.current_url.lower()
                           and "oauth2" not in d.current_url.lower()
                           and "account.microsoft.com" not in d.current_url.lower()
@@ -320,8 +2092,8 @@ class MicrosoftRewardsBot:
                           and d.current_url != self.base_url # Also wait if it stays on the rewards page without showing points
             )
             logger.info(f"Detected navigation away from login/account/OAuth page. Current URL: {self.driver.current_url}")
-            # Add a small buffer time after redirect
-            time.sleep(5)
+            # Wait for the post-login redirect target to finish loading
+            self.wait_for_page_ready(network_idle=True)
         except TimeoutException:
             logger.error("Timeout (5 minutes): Still on login/account/OAuth page. Manual login failed or took too long.")
             # The browser is left open with the profile, user can continue manually later
@@ -335,18 +2107,14 @@ class MicrosoftRewardsBot:
         # Explicitly navigate back to the rewards page AFTER the potential login redirect
         logger.info("Navigating to rewards page to verify login status after manual attempt.")
         try:
-            self.driver.get(self.base_url)
-            time.sleep(7) # Wait for the rewards page to load properly
-            # Dismiss any potential banners that might appear after loading
-            self.dismiss_banners()
+            self.navigate(self.base_url, ready_xpath=self.dashboard_ready_xpath, network_idle=True) # Wait for the rewards page to load properly
         except Exception as e:
             logger.error(f"Failed to navigate to rewards page after login attempt: {e}")
             # Treat as login failure for script purposes
             return False
 
-        # Check login status again on the rewards page
-        # check_login_status here will dismiss banners again just in case
-        if self.check_login_status():
+        # Check login status again on the page we just loaded (the probe also dismisses banners)
+        if self.probe_dashboard(navigate=False)['logged_in']:
             logger.info("Manual login verified successfully on rewards page.")
             return True
         else:
@@ -365,7 +2133,7 @@ class MicrosoftRewardsBot:
             if mobile:
                 try:
                     # A recent common mobile user agent - using Android as it's common
-                    mobile_ua = "Mozilla/5.0 (Linux; Android 10; SM-G975F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.106 Mobile Safari/537.36 EdgA/45.05.4.5058"
+                    mobile_ua = self.mobile_user_agent
                     self.driver.execute_cdp_cmd("Network.setUserAgentOverride", {
                         "userAgent": mobile_ua,
                         "platform": "Android"
@@ -398,29 +2166,36 @@ class MicrosoftRewardsBot:
                     pass # Don't stop, just warn
 
 
-            # Navigate to Bing
-            self.driver.get(self.bing_url)
-            time.sleep(5) # Wait for Bing page to load
+            # Skip searches a previous (crashed) run already performed today
+            already_done = self.checkpoint.searches_done(device_type)
+            if already_done:
+                logger.info(f"Checkpoint: {already_done} {device_type} searches already performed today.")
+                count = max(0, count - already_done)
 
-            # Dismiss any banners that appear on Bing (like cookie banners, etc.)
-            self.dismiss_banners()
+            # Check the live search counters first - on a second run the same day the cap may already be reached
+            planned = self._plan_searches(count, device_type)
+            if planned == 0:
+                self._finish_search_plan(device_type)
+                return True
 
             # Prepare search queries - ensure enough terms are available
-            search_queries = self.search_terms[:min(count, len(self.search_terms))]
-            if len(search_queries) < count:
-                 logger.warning(f"Only {len(search_queries)} search terms available, requested {count}. Performing {len(search_queries)} searches.")
+            search_queries = self.draw_search_terms(planned)
+            if len(search_queries) < planned:
+                 logger.warning(f"Only {len(search_queries)} search terms available, requested {planned}. Performing {len(search_queries)} searches.")
 
+            if self.search_mode == 'url':
+                # Navigate straight to each results page - no search box lookup, typing or fallback cascade
+                return self._perform_url_searches(search_queries, device_type)
+
+            # Navigate to Bing and wait for the search box
+            self.navigate(self.bing_url, ready_xpath=self.search_box_ready_xpath)
+
+            # Dismiss any banners that appear on Bing (like cookie banners, etc.)
+            self.dismiss_banners()
 
             # Find the search input field - wait for it to be clickable
-            # XPaths for the Bing search box - based on common Bing HTML
-            search_box_xpaths = [
-                 "//textarea[@id='sb_form_q']", # Most common Bing search box
-                 "//input[@id='sb_form_q']",    # Older/alternative Bing input
-                 "//input[@name='q']",         # Generic search input name
-                 "//textarea[@name='q']",      # Generic search textarea name
-                 "//input[contains(@class, 'searchbox')]", # Common search box class
-                 "//textarea[contains(@class, 'searchbox')]"
-            ]
+            # The XPath list is ordered by past success (see SelectorRegistry)
+            search_box_xpaths = self.search_box_xpaths
 
             search_box = None
             # Wait for any of the search box XPaths to be present and clickable
@@ -428,15 +2203,18 @@ class MicrosoftRewardsBot:
             for xpath in search_box_xpaths:
                 try:
                     logger.debug(f"Attempting to find {device_type} search box with XPath: {xpath}")
-                    search_box = WebDriverWait(self.driver, 15).until( # Increased wait for initial element
+                    started = self.clock.monotonic()
+                    search_box = self.wait(15).until( # Increased wait for initial element
                         EC.element_to_be_clickable((By.XPATH, xpath))
                     )
+                    self.selector_registry.record('search_box', xpath, True, self.clock.monotonic() - started)
                     logger.info(f"Found {device_type} search box using XPath: {xpath}.")
                     # Store the successful XPath for potential re-finding
                     successful_search_box_xpath = xpath
                     break # Found it, exit loop
                 except TimeoutException:
                     logger.debug(f"{device_type} search box not found with XPath: {xpath} within timeout.")
+                    self.selector_registry.record('search_box', xpath, False)
                     pass # Try next XPath
                 except Exception as e:
                     logger.debug(f"Error finding {device_type} search box with XPath {xpath}: {e}. Trying next XPath.")
@@ -444,1063 +2222,967 @@ class MicrosoftRewardsBot:
 
             if not search_box:
                  logger.error(f"Could not find {device_type} search box using any XPath. Skipping searches.")
+                 self._finish_search_plan(device_type) # Also closes the progress tab opened for the plan
                  return False # Indicate failure
 
             # Perform searches in a loop
             for i in range(len(search_queries)):
                 query = search_queries[i]
-                try:
-                    # Make queries slightly unique
-                    unique_query = f"{query} {random.randint(1000, 9999)}"
-
-                    # --- Re-find the search box for each search ---
-                    # The page reloads after each search, making the previous element stale.
-                    # Wait for the search box element to be present and clickable again.
-                    # Use the xpath that worked initially if available, or try all again.
-                    current_search_box = None
-                    if successful_search_box_xpath:
-                        try:
-                            # Wait for the specific XPath that worked before
-                             current_search_box = WebDriverWait(self.driver, 10).until( # Wait up to 10s for element after refresh
-                                 EC.element_to_be_clickable((By.XPATH, successful_search_box_xpath))
-                             )
-                        except TimeoutException:
-                            logger.warning(f"Primary search box XPath ({successful_search_box_xpath}) not found after search {i+1}. Trying other XPaths.")
-                            pass # Fallback to trying all XPaths
-                        except Exception as e:
-                             logger.warning(f"Error re-finding primary search box XPath ({successful_search_box_xpath}) after search {i+1}: {e}. Trying other XPaths.")
-                             pass
-
-                    # If primary XPath failed, try all XPaths again
-                    if not current_search_box:
-                        for xpath in search_box_xpaths: # Try all XPaths again
-                             try:
-                                current_search_box = WebDriverWait(self.driver, 5).until( # Shorter wait per fallback XPath
-                                   EC.element_to_be_clickable((By.XPATH, xpath))
-                                )
-                                # Update successful XPath if a different one worked this time
-                                successful_search_box_xpath = xpath
-                                logger.debug(f"Re-found {device_type} search box using fallback XPath: {xpath} for search {i+1}.")
-                                break # Found it, exit retry loop
-                             except TimeoutException:
-                                 logger.debug(f"{device_type} search box not found with fallback XPath: {xpath} after search {i+1}.")
-                                 pass
-                             except Exception as e:
-                                 logger.debug(f"Error re-finding {device_type} search box with fallback XPath {xpath} after search {i+1}: {e}. Trying next XPath.")
+                if self._search_cap_reached(device_type, i):
+                    break
+                with self.metrics.span('search', device=device_type, index=i + 1) as search_span:
+                    try:
+                        # Make queries slightly unique
+                        unique_query = f"{query} {self.rng.randint(1000, 9999)}"
+
+                        # --- Re-find the search box for each search ---
+                        # The page reloads after each search, making the previous element stale.
+                        # Wait for the search box element to be present and clickable again.
+                        # Use the xpath that worked initially if available, or try all again.
+                        current_search_box = None
+                        if successful_search_box_xpath:
+                            try:
+                                # Wait for the specific XPath that worked before
+                                 current_search_box = self.wait(10).until( # Wait up to 10s for element after refresh
+                                     EC.element_to_be_clickable((By.XPATH, successful_search_box_xpath))
+                                 )
+                            except TimeoutException:
+                                logger.warning(f"Primary search box XPath ({successful_search_box_xpath}) not found after search {i+1}. Trying other XPaths.")
+                                pass # Fallback to trying all XPaths
+                            except Exception as e:
+                                 logger.warning(f"Error re-finding primary search box XPath ({successful_search_box_xpath}) after search {i+1}: {e}. Trying other XPaths.")
                                  pass
 
-                    # If search box could not be re-found after retries, stop searching
-                    if not current_search_box:
-                         logger.error(f"Could not re-find {device_type} search box after search {i+1}. Cannot continue searches.")
-                         break # Exit the search loop
-
-                    # Clear the search box and send the query
-                    current_search_box.clear(); time.sleep(0.5)
-                    current_search_box.send_keys(unique_query); time.sleep(0.5)
-                    current_search_box.send_keys(Keys.RETURN)
-
-                    logger.info(f"Completed {device_type} search {i+1}/{len(search_queries)}: '{unique_query}'")
-
-                    # Add a random delay between searches to simulate human behavior
-                    time.sleep(random.uniform(7, 12)) # Slightly longer random delay
-
-                    # Optional: Scroll down a bit to simulate real user behavior
-                    try:
-                        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);") # Scroll down 30%
-                        time.sleep(random.uniform(1, 3)) # Short random wait after scroll
-                         # Scroll back up to potentially see elements at the top on next search
-                        self.driver.execute_script("window.scrollTo(0, 0);")
-                        time.sleep(random.uniform(0.5, 1.5))
-                    except Exception as scroll_err:
-                         logger.debug(f"Scroll failed on search results page: {scroll_err}")
-                         pass # Ignore scroll errors
-
-
-                except StaleElementReferenceException:
-                     logger.warning(f"Stale element on {device_type} search attempt {i+1}. Re-finding search box (handled at start of loop).")
-                     # Stale element is handled by re-finding the element at the start of the next loop iteration.
-                     # No need to decrement 'i' or retry here, just continue the loop.
-                except Exception as e:
-                    logger.error(f"Error during {device_type} search {i+1}: {str(e)}")
-                    # If an error occurs during a search (other than stale element), try to continue with the next search.
-                    # Re-finding the search box at the start of the loop should handle most recovery.
-                    pass # Continue loop to try the next search query
+                        # If primary XPath failed, try all XPaths again
+                        if not current_search_box:
+                            for xpath in search_box_xpaths: # Try all XPaths again
+                                 try:
+                                    current_search_box = self.wait(5).until( # Shorter wait per fallback XPath
+                                       EC.element_to_be_clickable((By.XPATH, xpath))
+                                    )
+                                    # Update successful XPath if a different one worked this time
+                                    successful_search_box_xpath = xpath
+                                    logger.debug(f"Re-found {device_type} search box using fallback XPath: {xpath} for search {i+1}.")
+                                    break # Found it, exit retry loop
+                                 except TimeoutException:
+                                     logger.debug(f"{device_type} search box not found with fallback XPath: {xpath} after search {i+1}.")
+                                     pass
+                                 except Exception as e:
+                                     logger.debug(f"Error re-finding {device_type} search box with fallback XPath {xpath} after search {i+1}: {e}. Trying next XPath.")
+                                     pass
+
+                        # If search box could not be re-found after retries, stop searching
+                        if not current_search_box:
+                             logger.error(f"Could not re-find {device_type} search box after search {i+1}. Cannot continue searches.")
+                             search_span['outcome'] = 'failed'
+                             break # Exit the search loop
+
+                        # Clear the search box and send the query
+                        current_search_box.clear(); self.sleep(0.5)
+                        current_search_box.send_keys(unique_query); self.sleep(0.5)
+                        current_search_box.send_keys(Keys.RETURN)
+
+                        logger.info(f"Completed {device_type} search {i+1}/{len(search_queries)}: '{unique_query}'")
+                        self._record_search_done(device_type, query)
+                        self._browse_search_results()
+
+
+                    except StaleElementReferenceException:
+                         logger.warning(f"Stale element on {device_type} search attempt {i+1}. Re-finding search box (handled at start of loop).")
+                         search_span['outcome'] = 'stale'
+
+                         # Stale element is handled by re-finding the element at the start of the next loop iteration.
+                         # No need to decrement 'i' or retry here, just continue the loop.
+                    except Exception as e:
+                        logger.error(f"Error during {device_type} search {i+1}: {str(e)}")
+                        search_span['outcome'] = 'error'
+                        # If an error occurs during a search (other than stale element), try to continue with the next search.
+                        # Re-finding the search box at the start of the loop should handle most recovery.
+                        pass # Continue loop to try the next search query
 
             logger.info(f"Finished attempting {device_type} searches.")
+            self._finish_search_plan(device_type)
             return True # Indicate completion of attempts
         except Exception as e:
             logger.error(f"General error during {device_type} searches workflow: {str(e)}")
+            self._close_progress_tab()
             return False # Indicate failure
 
-    def is_daily_set_item_complete(self, card_element):
-        """Checks if a daily set card element visually indicates completion (green checkmark)."""
-        # This is the simplified check based on the green checkmark only.
-        try:
-            # Check for the specific green checkmark icon within the element (confirmed in HTML)
-            checkmark_icon = card_element.find_elements(By.XPATH, ".//span[contains(@class, 'mee-icon-SkypeCircleCheck')]")
-            if any(el.is_displayed() for el in checkmark_icon):
-                logger.debug("Item appears complete via green checkmark icon.")
-                return True
-
-            # Fallback checks for completion attributes/classes if the icon isn't found
-            state = card_element.get_attribute("state")
-            if state and state.lower() == "complete":
-                logger.debug(f"Item appears complete via state attribute: {state}")
-                return True
-
-            completed_class_elements = card_element.find_elements(By.XPATH, ".//*[contains(@class, 'completed')]")
-            if any(el.is_displayed() for el in completed_class_elements):
-                 logger.debug("Item appears complete via 'completed' class.")
-                 return True
-
-
-            # If none of the above are found, assume not complete
-            return False
-        except Exception as e:
-            logger.debug(f"Error checking daily set item completion status: {e}. Assuming not complete for now.")
-            return False # If checking fails, assume not complete
+    def set_script_timeout(self, seconds):
+        """Sets the async script timeout, skipping the round trip when it already has that value."""
+        if self.script_timeout != seconds:
+            self.driver.set_script_timeout(seconds)
+            self.script_timeout = seconds
 
+    def get_search_progress(self):
+        """Reads desktop/mobile search point progress from the rewards dashboard without leaving the current tab.
 
-    def get_daily_set_item_status(self, card_element):
-        """Checks the status of a daily set card element: 'completed' or 'actionable'."""
-        # Simplifies status to only check for completion. If not completed, it's actionable.
-
+        The dashboard is kept open in a background tab and its counters are re-fetched from the rewards API on each call.
+        Returns {'desktop': {'progress', 'max'} or None, 'mobile': {...} or None}, or None if nothing could be read.
+        """
+        search_handle = self.driver.current_window_handle
         try:
-            # Check for completion (Green checkmark, etc.)
-            if self.is_daily_set_item_complete(card_element):
-                return "completed"
-
-            # If not completed, it's actionable (ignoring any other icons/states)
-            return "actionable"
-
+            if self.progress_handle in self.driver.window_handles:
+                self.driver.switch_to.window(self.progress_handle)
+            else:
+                self.driver.switch_to.new_window('tab')
+                self.progress_handle = self.driver.current_window_handle
+                self.navigate(self.base_url)
+            # Set explicitly: the health check and card waits leave their own script timeouts behind
+            self.set_script_timeout(self.search_progress_timeout + 5)
+            return self.driver.execute_async_script(SEARCH_PROGRESS_JS, int(self.search_progress_timeout * 1000))
         except Exception as e:
-            logger.warning(f"Error checking daily set item status: {e}. Assuming 'actionable' for now.")
-            return "actionable" # If checking fails, assume actionable
-
-
-    def complete_daily_set(self):
-        """Complete daily set activities"""
-        try:
-            logger.info("Starting daily set tasks...")
-
-            # Ensure on the rewards page and dismiss banners
-            if self.base_url not in self.driver.current_url:
-                 logger.info("Navigating to rewards dashboard for daily set.")
-                 self.driver.get(self.base_url)
-                 time.sleep(5)
-            self.dismiss_banners() # Dismiss banners before finding elements
-
-            # --- Find Daily Set Container ---
-            # Use the confirmed ID
-            daily_sets_container_xpath = "//*[@id='daily-sets']"
-
-            found_container = None
-            try:
-                logger.info(f"Attempting to find daily set container with XPath: {daily_sets_container_xpath}")
-                # Wait for visibility of the container itself
-                found_container = WebDriverWait(self.driver, 15).until(
-                    EC.visibility_of_element_located((By.XPATH, daily_sets_container_xpath))
-                )
-                logger.info(f"Found daily set container.")
-            except TimeoutException:
-                logger.error("Could not find the daily set container. Skipping daily set.")
-                return False # Indicate failure
-            except Exception as e:
-                 logger.error(f"Error finding daily set container: {e}. Skipping daily set.")
-                 return False
-
-            # --- Define Clickable Daily Set Cards within the container ---
-            # Use XPaths based on the provided HTML, targeting the <a> tags
-            # that seem to be the clickable cards.
-            card_clickable_xpaths_in_container = [
-                 ".//div[contains(@class, 'daily-set-item')]/a", # Specific structure confirmed
-                 ".//a[contains(@class, 'ds-card-sec')]",       # Alternative targeting the specific class
-                 ".//mee-card//a[contains(@href, '')]"          # Fallback: any link within a mee-card
-            ]
-
-            # List to store unique identifiers of tasks found
-            task_identifiers = []
+            logger.debug(f"Could not read search progress counters: {e}")
+            return None
+        finally:
             try:
-                # Wait for *presence* of at least one potential card element matching *any* of the XPaths within the container
-                logger.debug("Checking presence of daily set card clickable elements within container...")
-                WebDriverWait(found_container, 10).until( # Wait up to 10s for presence
-                     EC.presence_of_element_located((By.XPATH, " | ".join(card_clickable_xpaths_in_container)))
-                )
-                logger.debug("Presence of daily set card element confirmed.")
-
-                # Find all *visible* elements matching the card XPaths within the container
-                all_candidate_cards = found_container.find_elements(By.XPATH, " | ".join(card_clickable_xpaths_in_container))
-                visible_cards = [card for card in all_candidate_cards if card.is_displayed()]
-                logger.info(f"Identified {len(visible_cards)} visible daily set cards within the container.")
-
-                if not visible_cards:
-                    logger.info("No visible daily set cards found initially. Daily set likely already completed or not available.")
-                    return True # Consider this success if no tasks are found
-
-                # Collect identifiers for processing loop
-                for idx, card in enumerate(visible_cards):
-                    # Get unique identifiers for the card
-                    identifiers = {}
-                    identifiers['original_index'] = idx
-                    identifiers['href'] = card.get_attribute("href")
-                    identifiers['data_bi_id'] = card.get_attribute("data-bi-id")
-                    identifiers['data_m_attr'] = card.get_attribute("data-m")
-
-                    # Fallback to text if no reliable identifier found
-                    if not identifiers['href'] and not identifiers['data_bi_id'] and not identifiers['data_m_attr']:
-                         try:
-                            text_element = card.find_elements(By.XPATH, ".//h3 | .//div[contains(@class, 'card-title')] | .//*[string-length(normalize-space()) > 0]")
-                            identifiers['id'] = text_element[0].text.strip() if text_element else f"Unknown_DailySet_{idx}"
-                            if len(identifiers['id']) > 50: identifiers['id'] = identifiers['id'][:50] + "..."
-                         except:
-                            identifiers['id'] = f"Unknown_DailySet_{idx}"
-                         logger.warning(f"No reliable ID (href, data-bi-id, data-m) for card {idx}, using fallback identifier '{identifiers['id']}'.")
-                    else:
-                         # Use a primary ID for logging if available
-                         identifiers['id'] = identifiers.get('href') or identifiers.get('data_bi_id') or identifiers.get('data_m_attr')[:50] + '...' if identifiers.get('data_m_attr') else f"ID_Found_{idx}"
-
-
-                    task_identifiers.append(identifiers)
-
-                logger.info(f"Collected {len(task_identifiers)} daily set task identifiers.")
-
-
-            except TimeoutException:
-                logger.error("Timeout waiting for presence of daily set card clickable elements within the container. Skipping daily set.")
-                return False
-            except Exception as e:
-                logger.error(f"Error finding initial visible daily set cards within container: {str(e)}. Skipping daily set.")
-                return False
-
-
-            # --- Process Found Cards using Identifiers ---
-            task_statuses = {info['original_index']: 'initial' for info in task_identifiers}
-
-            # Process tasks by their original index order
-            for original_index in sorted(task_statuses.keys()):
-                 # Find the task_info for this original_index
-                 task_info = next((item for item in task_identifiers if item['original_index'] == original_index), None)
-                 if not task_info: # Should not happen if logic is correct
-                      logger.error(f"Could not find task_info for original index {original_index}. Skipping.")
-                      continue
-
-                 offer_id = task_info['id']
-                 href_to_find = task_info.get('href')
-                 data_bi_id_to_find = task_info.get('data_bi_id')
-                 data_m_attr_to_find = task_info.get('data_m_attr')
-
-
-                 logger.info(f"Processing daily set task (original index {original_index}): '{offer_id}'...")
-
-                 # --- Attempt to process the specific card with retries ---
-                 max_retries = 3
-                 task_processed_successfully = False
-
-                 for retry_count in range(max_retries):
-                     card_element = None
-                     current_task_status = 'unknown'
-
-                     try:
-                         # --- Navigate back to Rewards Dashboard and Re-find Elements ---
-                         logger.debug(f"Navigating back to Rewards dashboard to re-find element (Retry {retry_count+1}/{max_retries})...")
-                         self.driver.get(self.base_url)
-                         time.sleep(7)
-                         self.dismiss_banners()
-
-                         # Re-find the container after navigating back
-                         found_container = WebDriverWait(self.driver, 15).until(
-                             EC.visibility_of_element_located((By.XPATH, daily_sets_container_xpath))
-                         )
-                         logger.debug("Re-found daily set container.")
-
-                         # Re-find the SPECIFIC element using its identifier within the fresh container
-                         logger.debug(f"Re-finding daily set card by identifiers within container...")
-                         all_current_visible_cards = [card for card in found_container.find_elements(By.XPATH, " | ".join(card_clickable_xpaths_in_container)) if card.is_displayed()]
-
-                         found_match = False
-                         for current_card in all_current_visible_cards:
-                             current_href = current_card.get_attribute("href")
-                             current_data_bi_id = current_card.get_attribute("data-bi-id")
-                             current_data_m_attr = current_card.get_attribute("data-m")
-
-                             if (href_to_find and current_href == href_to_find) or \
-                                (data_bi_id_to_find and current_data_bi_id == data_bi_id_to_find) or \
-                                (data_m_attr_to_find and current_data_m_attr == data_m_attr_to_find):
-                                 card_element = current_card
-                                 logger.debug(f"Matched daily set card by identifier on retry {retry_count+1}.")
-                                 found_match = True
-                                 WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-                                 break
-
-                         if not found_match and original_index < len(all_current_visible_cards):
-                              card_element = all_current_visible_cards[original_index]
-                              logger.debug(f"Matched daily set card by index {original_index} on retry {retry_count+1}.")
-                              WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-
-
-                         if card_element is None:
-                                   logger.warning(f"Could not re-find visible element for daily set task '{offer_id}' on retry {retry_count+1}/{max_retries}. Skipping processing for this task.")
-                                   break
-
-
-                         # --- If element re-found, check status and interact ---
-                         if card_element:
-                             current_task_status = self.get_daily_set_item_status(card_element)
-                             if current_task_status == "completed":
-                                 logger.info(f"Daily set task '{offer_id}' appears completed.")
-                                 task_statuses[original_index] = "completed"
-                                 task_processed_successfully = True
-                                 break
-
-                             # We do not explicitly check for "locked" status here anymore,
-                             # as any non-completed task is considered "actionable" based on the simplified logic.
-
-                             # If status is "actionable"
-                             logger.info(f"Daily set task '{offer_id}' is actionable. Attempting interaction (Retry {retry_count+1}/{max_retries})...")
-
-                             # Scroll to the card and click
-                             try:
-                                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card_element)
-                                 time.sleep(1)
-                             except Exception as scroll_err:
-                                 logger.debug(f"Scroll failed for daily set card: {scroll_err}")
-                                 pass
-
-                             try:
-                                WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-                                self.driver.execute_script("arguments[0].click();", card_element)
-                                logger.info(f"Clicked daily set task '{offer_id}' successfully.")
-                             except Exception as click_err:
-                                 logger.warning(f"JS click failed for daily set task '{offer_id}': {click_err}. Retrying.")
-                                 if retry_count == max_retries - 1:
-                                      logger.error(f"Max retries reached for JS click on daily set task '{offer_id}'. Skipping task.")
-                                      break
-                                 time.sleep(2)
-                                 continue
-
-                             # --- Handle Activity Page (New Tab or In-Page) ---
-                             initial_window_handle = self.driver.current_window_handle
-                             time.sleep(2)
-                             window_handles_after = self.driver.window_handles
-
-                             if len(window_handles_after) > len(self.driver.window_handles):
-                                 logger.error("Window handles increased unexpectedly after click. This might indicate a problem with tab handling.")
-                                 try:
-                                      self.driver.switch_to.window(initial_window_handle)
-                                      logger.warning("Switched back to original window. Skipping interaction on potential new tab.")
-                                 except:
-                                      logger.critical("Failed to switch back to original window. Cannot continue.")
-                                      raise
-                                 task_statuses[original_index] = "attempted"
-
-
-                             elif len(window_handles_after) > 1:
-                                 new_window_handle = [handle for handle in window_handles_after if handle != initial_window_handle]
-                                 if new_window_handle:
-                                      self.driver.switch_to.window(new_window_handle[-1])
-                                      logger.info(f"Switched to new tab for daily set task '{offer_id}'")
-
-                                      self.handle_activity_page() # Call dedicated handler
-
-                                      logger.info("Closing daily set activity tab and switching back.")
-                                      try:
-                                          self.driver.close()
-                                          self.driver.switch_to.window(initial_window_handle)
-                                          time.sleep(3)
-                                      except Exception as close_err:
-                                           logger.error(f"Error closing activity tab or switching back: {close_err}. Recovery attempt.")
-                                           try:
-                                                self.driver.get(self.base_url)
-                                                time.sleep(7)
-                                                self.dismiss_banners()
-                                           except:
-                                                logger.critical("Failed to navigate back to rewards dashboard after tab error. Cannot reliably continue daily set.")
-                                                raise
-                                 else:
-                                     logger.warning(f"Expected new tab after clicking daily set task '{offer_id}', but no new handle found. Assuming in-page or error.")
-
-
-                             else:
-                                 logger.warning(f"Clicking daily set task '{offer_id}' did not open a new tab or multiple windows already existed. Assuming in-page activity or simple link. Waiting...")
-                                 time.sleep(random.uniform(10, 15))
-                                 logger.info("Finished waiting after in-page interaction attempt.")
-
-                             task_statuses[original_index] = "attempted"
-                             task_processed_successfully = True
-                             break
-
-                     # --- Except blocks for retry attempts ---
-                     except TimeoutException:
-                          logger.warning(f"Timeout waiting for element/page on retry {retry_count+1}/{max_retries} for daily set task '{offer_id}'. Retrying.")
-                          time.sleep(2)
-                          if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for daily set task '{offer_id}' due to Timeout. Skipping task.")
-                               task_statuses[original_index] = "failed"
-                          continue
-
-                     except StaleElementReferenceException:
-                          logger.warning(f"Stale element reference on retry {retry_count+1}/{max_retries} for daily set task '{offer_id}'. Re-finding element and retrying.")
-                          time.sleep(2)
-                          if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for daily set task '{offer_id}' due to Stale Element. Skipping task.")
-                               task_statuses[original_index] = "failed"
-                          continue
-
-                     except ElementClickInterceptedException as ice:
-                          logger.warning(f"Click intercepted on retry {retry_count+1}/{max_retries} for daily set task '{offer_id}': {ice}. Retrying.")
-                          time.sleep(2)
-                          if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for daily set task '{offer_id}' due to Element Click Intercepted. Skipping task.")
-                               task_statuses[original_index] = "failed"
-                          continue
-
-                     except ElementNotInteractableException as eint_err:
-                         logger.warning(f"Element not interactable on retry {retry_count+1}/{max_retries} for daily set task '{offer_id}': {eint_err}. Skipping task.")
-                         task_statuses[original_index] = "skipped_not_interactable"
-                         break
-
-                     except Exception as e:
-                          logger.error(f"Unexpected error on retry {retry_count+1}/{max_retries} for daily set task '{offer_id}': {str(e)}. Retrying.")
-                          time.sleep(3)
-                          if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for daily set task '{offer_id}' due to unexpected error. Skipping task.")
-                               task_statuses[original_index] = "failed"
-                          continue
-
-                 # --- After the retry loop finishes for a single task ---
-                 if not task_processed_successfully:
-                      logger.warning(f"Daily set task '{offer_id}' was not successfully processed after {max_retries} retries.")
-                 else:
-                      if task_statuses[original_index] == 'initial':
-                           task_statuses[original_index] = 'attempted'
-
-
-                 logger.info(f"Finished processing logic for daily set task '{offer_id}'. Final Status: {task_statuses[original_index]}.")
-
-
-            logger.info("Finished attempting daily set tasks.")
-            # Log final status of all tasks attempted
-            for original_index, status in task_statuses.items():
-                 offer_id = next((item['id'] for item in task_identifiers if item['original_index'] == original_index), 'N/A')
-                 logger.info(f"Daily Set Task (Original Index {original_index}, ID: '{offer_id}'): {status}")
+                self.driver.switch_to.window(search_handle)
+            except Exception as switch_err:
+                logger.warning(f"Could not switch back to search tab after reading progress: {switch_err}")
+
+    def _close_progress_tab(self):
+        """Closes the background dashboard tab used by get_search_progress, if open."""
+        if not self.progress_handle:
+            return
+        try:
+            if self.progress_handle in self.driver.window_handles:
+                current_handle = self.driver.current_window_handle
+                self.driver.switch_to.window(self.progress_handle)
+                self.driver.close()
+                self.driver.switch_to.window(current_handle)
+        except Exception as e:
+            logger.debug(f"Error closing search progress tab: {e}")
+        self.progress_handle = None
+
+    def _remaining_searches(self, device_type):
+        """Returns how many searches are still worth points for the device, or None if the counters are unknown."""
+        progress = self.get_search_progress()
+        counter = progress.get(device_type) if progress else None
+        if not counter:
+            return None
+        remaining_points = max(0, counter['max'] - counter['progress'])
+        # Round up so a partially earned search still gets performed
+        return -(-remaining_points // self.points_per_search)
+
+    def _plan_searches(self, count, device_type):
+        """Caps the requested search count by the live dashboard counters and logs the plan."""
+        remaining = self._remaining_searches(device_type)
+        planned = count if remaining is None else min(count, remaining)
+        self.search_plans[device_type] = {'requested': count, 'planned': planned, 'performed': 0, 'cap_reached': False}
+        if remaining is None:
+            logger.info(f"Search plan ({device_type}): {count} searches (search progress counters unavailable).")
+        else:
+            logger.info(f"Search plan ({device_type}): {planned} of {count} requested searches ({remaining} still earn points).")
+        return planned
 
+    def _search_cap_reached(self, device_type, searches_done):
+        """Re-checks the live counters every few searches. Returns True once the daily cap has been hit."""
+        if searches_done == 0 or searches_done % self.search_progress_check_interval != 0:
+            return False
+        remaining = self._remaining_searches(device_type)
+        if remaining == 0:
+            logger.info(f"Daily {device_type} search cap reached after {searches_done} searches. Stopping early.")
+            self.search_plans[device_type]['cap_reached'] = True
             return True
-        except Exception as e:
-            logger.error(f"General error completing daily set workflow: {str(e)}")
+        return False
+
+    def search_phase_finished(self, device_type):
+        """True if the device's searches are really done for today: every planned search performed, or the cap hit."""
+        plan = self.search_plans[device_type]
+        return plan['cap_reached'] or plan['performed'] >= plan['planned']
+
+    def _record_search_done(self, device_type, query):
+        """Counts a completed search in the current plan and in the crash-safe checkpoint, and logs its base query."""
+        self.search_plans[device_type]['performed'] += 1
+        self.checkpoint.add_search(device_type)
+        if self.query_history:
+            self.query_history.add(query)
+
+    def _finish_search_plan(self, device_type, close_progress=True):
+        """Logs planned vs performed vs skipped searches and closes the progress tab."""
+        plan = self.search_plans[device_type]
+        skipped = plan['requested'] - plan['performed']
+        logger.info(f"Search summary ({device_type}): planned {plan['planned']}, performed {plan['performed']}, skipped {skipped} of {plan['requested']} requested.")
+        if close_progress:
+            self._close_progress_tab()
+
+    def build_search_url(self, query):
+        """Builds the Bing results URL a typed search for the query would produce (same form code as the search box)."""
+        return f"{self.bing_url}search?q={quote_plus(query)}&form={self.search_form_code}"
+
+    def _perform_url_searches(self, search_queries, device_type):
+        """Performs searches by navigating directly to each results URL and waiting only for the results container."""
+        # Drive the step generator serially, sleeping through each wait it asks for
+        for wait_seconds in self.search_stream_steps(device_type, search_queries):
+            self.sleep(wait_seconds)
+        return True # Indicate completion of attempts
+
+    def _browse_search_results(self):
+        """Lingers on a results page like a human would: random delay, then a short scroll down and back up."""
+        for wait_seconds in self._browse_search_results_steps():
+            self.sleep(wait_seconds)
+
+    def _browse_search_results_steps(self):
+        """Generator behind _browse_search_results: scrolls the focused results tab and yields the seconds to wait."""
+        # Add a random delay between searches to simulate human behavior
+        yield self.rng.uniform(7, 12) # Slightly longer random delay
+
+        # Optional: Scroll down a bit to simulate real user behavior
+        try:
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);") # Scroll down 30%
+        except Exception as scroll_err:
+             logger.debug(f"Scroll failed on search results page: {scroll_err}")
+             return # Ignore scroll errors
+        yield self.rng.uniform(1, 3) # Short random wait after scroll
+        try:
+            # Scroll back up to potentially see elements at the top on next search
+            self.driver.execute_script("window.scrollTo(0, 0);")
+        except Exception as scroll_err:
+             logger.debug(f"Scroll failed on search results page: {scroll_err}")
+             return
+        yield self.rng.uniform(0.5, 1.5)
+
+    def open_mobile_search_tab(self):
+        """Opens a new tab emulating a phone and returns its handle; the other tabs keep their desktop settings.
+
+        CDP emulation overrides apply only to the target (tab) they are sent to, so no window resize or user agent
+        reset is needed: closing the tab discards them.
+        """
+        self.driver.switch_to.new_window('tab')
+        handle = self.driver.current_window_handle
+        self.driver.execute_cdp_cmd("Emulation.setUserAgentOverride", {"userAgent": self.mobile_user_agent, "platform": "Android"})
+        self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", self.mobile_metrics)
+        self.driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": True, "maxTouchPoints": 5})
+        logger.info(f"Opened mobile-emulated search tab ({self.mobile_metrics['width']}x{self.mobile_metrics['height']}).")
+        return handle
+
+    def search_stream_steps(self, device_type, search_queries, interleaved=False):
+        """Generator behind _perform_url_searches: performs one device's searches on the focused tab, yielding the waits.
+
+        Searches navigate straight to the results URL. Each search span is closed before the delay after it, so spans
+        of interleaved streams never overlap. Interleaved streams leave the shared progress tab open for the others.
+        """
+        for i, query in enumerate(search_queries):
+            if self._search_cap_reached(device_type, i):
+                break
+            searched = False
+            with self.metrics.span('search', device=device_type, index=i + 1, interleaved=interleaved) as search_span:
+                try:
+                    # Make queries slightly unique
+                    unique_query = f"{query} {self.rng.randint(1000, 9999)}"
+                    if not self.navigate(self.build_search_url(unique_query), ready_xpath=self.search_results_xpath):
+                        logger.warning(f"Results container did not appear for {device_type} search {i+1}. Continuing.")
+                    if i == 0:
+                        # Dismiss any banners that appear on Bing (like cookie banners, etc.)
+                        self.dismiss_banners()
+                    logger.info(f"Completed {device_type} search {i+1}/{len(search_queries)}: '{unique_query}'")
+                    self._record_search_done(device_type, query)
+                    searched = True
+                except Exception as e:
+                    logger.error(f"Error during {device_type} search {i+1}: {str(e)}")
+                    search_span['outcome'] = 'error'
+            if searched:
+                yield from self._browse_search_results_steps()
+        logger.info(f"Finished attempting {device_type} searches.")
+        self._finish_search_plan(device_type, close_progress=not interleaved)
+
+    def perform_interleaved_searches(self, devices):
+        """Runs the searches of several devices ('desktop', 'mobile') at once, each in its own tab of this session.
+
+        The desktop stream uses the current tab and the mobile stream a mobile-emulated tab. Their inter-search
+        delays overlap, so the phase takes about as long as the longer stream. Returns {device_type: success}.
+        """
+        results = {}
+        jobs = []
+        desktop_handle = self.driver.current_window_handle
+        plans = {}
+        try:
+            for device_type in devices:
+                count = self.desktop_search_count if device_type == 'desktop' else self.mobile_search_count
+                already_done = self.checkpoint.searches_done(device_type)
+                if already_done:
+                    logger.info(f"Checkpoint: {already_done} {device_type} searches already performed today.")
+                    count = max(0, count - already_done)
+                plans[device_type] = self._plan_searches(count, device_type)
+                results[device_type] = True
+
+            # One draw for both streams, split between them, so the two tabs never search for the same thing
+            drawn = self.draw_search_terms(sum(plans.values()))
+            query_offset = 0
+            for device_type, planned in plans.items():
+                if planned == 0:
+                    self._finish_search_plan(device_type, close_progress=False)
+                    continue
+                # A short draw shortens the later streams rather than handing them the queries of the earlier ones
+                search_queries = drawn[query_offset:query_offset + planned]
+                query_offset += len(search_queries)
+                if len(search_queries) < planned:
+                    logger.warning(f"Only {len(search_queries)} of {planned} search terms left for the {device_type} stream. "
+                                   f"Performing {len(search_queries)} {device_type} searches.")
+                if not search_queries:
+                    self._finish_search_plan(device_type, close_progress=False)
+                    continue
+                try:
+                    handle = desktop_handle if device_type == 'desktop' else self.open_mobile_search_tab()
+                except Exception as e:
+                    logger.error(f"Could not open {device_type} search tab: {str(e)}. Skipping {device_type} searches.")
+                    results[device_type] = False
+                    continue
+                jobs.append({'handle': handle, 'label': f"{device_type} search tab", 'device': device_type,
+                             'steps': self.search_stream_steps(device_type, search_queries, interleaved=True)})
+
+            if jobs:
+                logger.info(f"Running {' and '.join(job['device'] for job in jobs)} searches interleaved in {len(jobs)} tabs.")
+                for job in self.interleave_tab_steps(jobs):
+                    if job.get('error'):
+                        results[job['device']] = False
+        finally:
+            # Close the mobile tab (its emulation goes with it) and carry on from the desktop tab
+            for job in jobs:
+                if job['handle'] != desktop_handle:
+                    self._close_tab(job['handle'])
+            self._close_progress_tab()
             try:
-                 self.driver.get(self.base_url)
-                 time.sleep(7)
-                 self.dismiss_banners()
-            except:
-                 logger.warning("Failed to refresh page after general daily set error.")
-            raise
-
-
-    def is_other_activity_complete(self, card_element):
-         """Checks if an other activity card element visually indicates completion (green checkmark)."""
-         # This is the simplified check based on the green checkmark only.
-         try:
-             # Check the 'complete' attribute (seen on mee-rewards-points parent)
-             try:
-                 points_parent = card_element.find_element(By.XPATH, "./ancestor::mee-rewards-points")
-                 complete_attr = points_parent.get_attribute("complete")
-                 if complete_attr and complete_attr.lower() == "true":
-                      logger.debug(f"Item appears complete via mee-rewards-points@complete='true'.")
-                      return True
-             except NoSuchElementException:
-                  pass
-
-             # Check the 'state' attribute if it exists (seen on some elements)
-             state = card_element.get_attribute("state")
-             if state and state.lower() == "complete":
-                 logger.debug(f"Item appears complete via state attribute: {state}")
-                 return True
-
-             # Check for the specific green checkmark icon within the element (confirmed in HTML)
-             checkmark_icon = card_element.find_elements(By.XPATH, ".//span[contains(@class, 'mee-icon-SkypeCircleCheck')]")
-             if any(el.is_displayed() for el in checkmark_icon):
-                 logger.debug("Item appears complete via green checkmark icon.")
-                 return True
-
-             # Check for a common 'completed' class on the element itself or descendants
-             completed_class_elements = card_element.find_elements(By.XPATH, ".//*[contains(@class, 'completed')]")
-             if any(el.is_displayed() for el in completed_class_elements):
-                  logger.debug("Item appears complete via 'completed' class.")
-                  return True
-
-             # If none of the above are found, assume not complete
-             return False
-         except Exception as e:
-             logger.debug(f"Error checking other activity item completion status: {e}. Assuming not complete for now.")
-             return False # If checking fails, assume not complete
-
-
-    def get_other_activity_status(self, card_element):
-         """Checks the status of an other activity card element: 'completed' or 'actionable'."""
-         # Simplifies status to only check for completion. If not completed, it's actionable.
-
-         try:
-             # Check for completion (Green checkmark, etc.)
-             if self.is_other_activity_complete(card_element):
-                 return "completed"
-
-             # We will NOT explicitly check for "locked" status based on blue lock icon or is-exclusive-locked-item.
-             # We WILL check for explicit disabling like aria-disabled="true" or 'locked-card' class
-             # because these might make the element truly non-interactable by Selenium.
-
-             try:
-                 aria_disabled = card_element.get_attribute("aria-disabled")
-                 if aria_disabled and aria_disabled.lower() == 'true':
-                     logger.debug("Other Activity item appears explicitly disabled (aria-disabled=true).")
-                     return "locked" # Treat explicitly disabled as locked/unavailable
-
-                 # Check for disabling classes on the element itself or parents
-                 # Check the rewards-card-container parent div for 'locked-card' class
-                 try:
-                     parent_card_container = card_element.find_element(By.XPATH, "./ancestor::div[contains(@class, 'rewards-card-container')]")
-                     if parent_card_container:
-                          locked_status_ng_class = parent_card_container.get_attribute("ng-class")
-                          if locked_status_ng_class and "'locked-card'" in locked_status_ng_class:
-                               logger.debug("Other Activity item appears locked via parent ng-class 'locked-card'.")
-                               return "locked"
-                 except NoSuchElementException:
-                      pass # Ignore if parent not found
-
-             except Exception as e:
-                  logger.debug(f"Error checking explicit disabled status for other activity item: {e}")
-                  pass
-
-
-             # If not completed and not explicitly disabled, it's actionable
-             return "actionable"
-
-         except Exception as e:
-             logger.warning(f"Error checking other activity item status: {e}. Assuming 'actionable' for now.")
-             return "actionable" # If checking fails, assume actionable
-
+                self.driver.switch_to.window(desktop_handle)
+            except Exception as switch_err:
+                logger.warning(f"Could not switch back to the desktop search tab: {switch_err}")
+        return results
 
     def handle_activity_page(self):
         """Handles basic interactions on an activity page (quizzes, polls, etc.) after clicking a card."""
+        # Drive the step generator serially, sleeping through each wait it asks for
+        for wait_seconds in self.activity_page_steps():
+            self.sleep(wait_seconds)
+
+    def activity_page_steps(self):
+        """Generator behind handle_activity_page: performs one interaction per step and yields the seconds to wait before the next.
+
+        The caller must have the activity's tab focused whenever the generator is resumed, which lets
+        run_activity_tabs_concurrently interleave the waits of several activity tabs in one WebDriver session.
+        """
         logger.info("Attempting interactions on activity page...")
+        # New tabs do not inherit the blocklist; later requests from this activity page are filtered from here on
+        self.apply_resource_policy()
         try:
-             # Wait for body to ensure page has loaded
-             WebDriverWait(self.driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-             time.sleep(random.uniform(3, 6)) # Initial wait
+             # Wait for body to ensure page has loaded (polled so other tabs can make progress meanwhile)
+             body_deadline = self.clock.monotonic() + 15
+             while not self.driver.find_elements(By.TAG_NAME, "body"):
+                 if self.clock.monotonic() > body_deadline:
+                     raise TimeoutException("Activity page body did not load within 15s")
+                 yield 0.5
+             yield self.rng.uniform(3, 6) # Initial wait
 
              # Try basic interactions on the new page (e.g., quizzes, polls)
              # Use a broader range of potential interactive elements
              interactive_elements_xpath = "//input[@type='radio'] | //div[contains(@class, 'option') or contains(@class, 'choice')] | //button[contains(text(), 'Submit') or contains(text(), 'Next') or contains(text(), 'Play')] | //a[contains(@class, 'btn') or contains(@class, 'button')] | //button | //a[contains(@href, '')] | //div[@tabindex='0' and (contains(@role, 'button') or contains(@role, 'option'))] | //span[contains(@class, 'answer') or contains(@class, 'option')] | //label[contains(@class, 'option')]"
 
-             interactive_elements = self.driver.find_elements(By.XPATH, interactive_elements_xpath)
-             logger.info(f"Found {len(interactive_elements)} potential interactive elements on activity page.")
-
-             if interactive_elements:
-                 # Filter for visible and interactable elements before sampling
-                 interactable_candidates = [el for el in interactive_elements if el.is_displayed() and el.is_enabled()]
-                 logger.debug(f"Found {len(interactable_candidates)} interactable candidates.")
-
-                 if interactable_candidates:
-                     # Click a random sample of interactive elements
-                     random_elements_to_click = random.sample(interactable_candidates, min(len(interactable_candidates), 5)) # Click up to 5 random elements
-                     logger.info(f"Clicking {len(random_elements_to_click)} random interactive elements.")
-                     for j, el in enumerate(random_elements_to_click):
-                         try:
-                              # Re-find the specific element before clicking, in case the list became stale
-                              # Use a short wait as presence was just confirmed
-                              clickable_interactive_element = WebDriverWait(self.driver, 3).until(
-                                  EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(el)))
-                              )
-                              self.driver.execute_script("arguments[0].scrollIntoView({block: 'nearest'});", clickable_interactive_element)
-                              time.sleep(0.5) # Small pause after scrolling
-                              self.driver.execute_script("arguments[0].click();", clickable_interactive_element)
-                              logger.debug(f"Clicked interactive element {j+1}/{len(random_elements_to_click)}")
-                              time.sleep(random.uniform(2, 4)) # Wait after clicking an interactive element
-                         except TimeoutException:
-                             logger.debug(f"Interactive element {j+1} not clickable within timeout during interaction.")
-                             pass # Continue trying other random elements
-                         except StaleElementReferenceException:
-                             logger.debug(f"Interactive element {j+1} became stale during interaction. Skipping interaction for this element.")
-                             pass # Continue trying other random elements
-                         except ElementClickInterceptedException:
-                             logger.debug(f"Click on interactive element {j+1} intercepted during interaction. Skipping interaction for this element.")
-                             pass
-                         except Exception as interact_err:
-                             logger.debug(f"Could not click interactive element {j+1}: {interact_err}. Continuing.")
-                             pass # Continue trying other random elements
-                 else:
-                      logger.info("No visible and interactable common interactive elements found to click.")
+             # Matched and filtered for visible, enabled elements in one round trip
+             interactable_candidates = self.driver.execute_script(FIND_INTERACTABLE_JS, interactive_elements_xpath) or []
+             logger.info(f"Found {len(interactable_candidates)} visible interactive elements on activity page.")
 
+             if interactable_candidates:
+                 # Click a random sample of interactive elements
+                 random_elements_to_click = self.rng.sample(interactable_candidates, min(len(interactable_candidates), 5)) # Click up to 5 random elements
+                 logger.info(f"Clicking {len(random_elements_to_click)} random interactive elements.")
+                 for j, el in enumerate(random_elements_to_click):
+                     yield 0.5 # Small pause before each interaction
+                     try:
+                          # Check, scroll and click the element we already hold in one round trip
+                          outcome = self.try_click_element(el, block='nearest')
+                          if outcome != 'clicked':
+                              logger.debug(f"Interactive element {j+1} not clickable ({outcome}). Skipping interaction for this element.")
+                              continue
+                          logger.debug(f"Clicked interactive element {j+1}/{len(random_elements_to_click)}")
+                     except StaleElementReferenceException:
+                         logger.debug(f"Interactive element {j+1} became stale during interaction. Skipping interaction for this element.")
+                         continue
+                     except ElementClickInterceptedException:
+                         logger.debug(f"Click on interactive element {j+1} intercepted during interaction. Skipping interaction for this element.")
+                         continue
+                     except Exception as interact_err:
+                         logger.debug(f"Could not click interactive element {j+1}: {interact_err}. Continuing.")
+                         continue
+                     yield self.rng.uniform(2, 4) # Wait after clicking an interactive element
              else:
-                  logger.info("No common interactive elements found to click on activity page.")
+                  logger.info("No visible and interactable common interactive elements found to click.")
 
              # Stay on the page for a little longer regardless of interaction attempts
              logger.info("Staying on activity page for sufficient time...")
-             time.sleep(random.uniform(5, 10))
+             yield self.rng.uniform(5, 10)
 
         except Exception as e:
             logger.warning(f"Error during activity page interaction: {str(e)}")
             # Don't re-raise, just log and continue, as the task might complete just by visiting
 
+    def run_activity_tabs_concurrently(self, jobs):
+        """Runs several activity tabs at once within the single WebDriver session.
+
+        Each job is a dict with the tab's window 'handle' (plus any caller data). The tabs are advanced one step at a
+        time, always picking the tab whose wait expires first, so the phase takes about as long as the slowest
+        activity instead of the sum of all of them. Each tab is closed as soon as its activity is done.
+        """
+        for job in jobs:
+            # Generators do not run until first advanced, by which time their tab is focused
+            job['steps'] = self.activity_page_steps()
+            job['label'] = "activity tab"
+        try:
+            for job in self.interleave_tab_steps(jobs):
+                # Activity done (or broken): close its tab, and its span so the card is timed by its own tab only
+                self._close_tab(job['handle'])
+                if job.get('span'):
+                    self.metrics.finish(job['span'], outcome='error' if job['error'] else None)
+        finally:
+            # Always hand the session back on the dashboard tab
+            if self.dashboard_handle:
+                self.driver.switch_to.window(self.dashboard_handle)
+
+    def interleave_tab_steps(self, jobs):
+        """Advances the step generators of several tabs within the single WebDriver session.
+
+        Each job is a dict with the tab's window 'handle', its 'steps' generator (yielding the seconds to wait before
+        its next step) and a 'label' for log messages. The tab whose wait expires first is always resumed next.
+        Yields each job as it finishes; a job whose generator raised has the exception in job['error'].
+        """
+        now = self.clock.monotonic()
+        active = []
+        for job in jobs:
+            job['ready_at'] = now
+            job['error'] = None
+            active.append(job)
+
+        focused = None # Skip the switch round trip when the same tab is resumed twice in a row
+        while active:
+            job = min(active, key=lambda j: j['ready_at'])
+            delay = job['ready_at'] - self.clock.monotonic()
+            if delay > 0:
+                self.sleep(delay)
+            try:
+                if focused != job['handle']:
+                    self.driver.switch_to.window(job['handle'])
+                    focused = job['handle']
+                job['ready_at'] = self.clock.monotonic() + next(job['steps'])
+                continue
+            except StopIteration:
+                logger.debug(f"{job['label'].capitalize()} {job['handle']} finished.")
+            except Exception as e:
+                logger.warning(f"Error advancing {job['label']} {job['handle']}: {e}. Dropping it.")
+                job['error'] = e
+            active.remove(job)
+            focused = None # The caller may switch tabs while handling the finished job
+            yield job
+
+    def _close_tab(self, handle):
+        """Closes one tab (switching to it first); errors are only logged."""
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except Exception as close_err:
+            logger.debug(f"Error closing tab {handle}: {close_err}")
+
+    def _start_cards_in_parallel(self, section_name, task_records, task_statuses):
+        """Opens actionable cards into their own tabs in batches of max_parallel_activities and runs them concurrently.
+
+        Returns the task records that still need the serial retry loop (card not found or not clicked). A card whose
+        click opened no new tab is an in-page activity that has already started, so it is waited for here instead.
+        """
+        section = self.card_sections[section_name]
+        label = section['label']
+        needs_serial = []
+        batch = []
+        phase_span = self.metrics.open_spans[-1] if self.metrics.open_spans else None
+
+        def run_batch():
+            logger.info(f"Running {len(batch)} {label} activity tabs concurrently.")
+            self.run_activity_tabs_concurrently(batch)
+            for job in batch:
+                task_info = job['task']
+                if self.verify_card_completion(task_info):
+                    logger.info(f"{label.capitalize()} task '{task_info['id']}' now shows as completed ({task_info['complete_reason']}).")
+                    task_statuses[task_info['original_index']] = "completed"
+                else:
+                    task_statuses[task_info['original_index']] = "attempted"
+                # The span was closed when the tab finished; it only gets the verified outcome now
+                self.metrics.finish(job['span'])
+                job['span']['outcome'] = task_statuses[task_info['original_index']]
+                if task_statuses[task_info['original_index']] == "completed":
+                    self.checkpoint.mark_card_done(section_name, task_info['id'])
+            batch.clear()
+
+        for task_info in task_records:
+            offer_id = task_info['id']
+            clicked = False
+            try:
+                card = self.locate_card(section_name, task_info, task_records)
+                if card is None:
+                    needs_serial.append(task_info)
+                    continue
+                if self.get_card_status(card) == "completed":
+                    logger.info(f"{label.capitalize()} task '{offer_id}' appears completed.")
+                    task_statuses[task_info['original_index']] = "completed"
+                    self.checkpoint.mark_card_done(section_name, offer_id)
+                    continue
+
+                handles_before_click = self.driver.window_handles
+                self.click_element(card['element'], timeout=5)
+                clicked = True
+                new_window_handle = self.wait_for_new_window(handles_before_click)
+                if not new_window_handle:
+                    # In-page activity (e.g. a quiz overlay): clicking it again in the serial loop could close it
+                    logger.warning(f"Clicking {label} task '{offer_id}' did not open a new tab. Assuming in-page activity. Waiting...")
+                    card_span = self.metrics.start('card', parent=phase_span, section=section_name, card=offer_id)
+                    self.sleep(self.rng.uniform(10, 15))
+                    task_statuses[task_info['original_index']] = "completed" if self.verify_card_completion(task_info) else "attempted"
+                    self.metrics.finish(card_span, outcome=task_statuses[task_info['original_index']])
+                    if task_statuses[task_info['original_index']] == "completed":
+                        logger.info(f"{label.capitalize()} task '{offer_id}' now shows as completed ({task_info['complete_reason']}).")
+                        self.checkpoint.mark_card_done(section_name, offer_id)
+                    continue
+
+                logger.info(f"Opened {label} task '{offer_id}' in a new tab.")
+                batch.append({'task': task_info, 'handle': new_window_handle,
+                              'span': self.metrics.start('card', parent=phase_span, section=section_name, card=offer_id, parallel=True)})
+                # The new tab opens in the background; make sure we are still driving the dashboard
+                self.driver.switch_to.window(self.dashboard_handle)
+                if len(batch) >= self.max_parallel_activities:
+                    run_batch()
+            except Exception as e:
+                if clicked:
+                    # The activity may already be open; another click could undo it, so leave it for a later run
+                    logger.warning(f"Error after clicking {label} task '{offer_id}': {e}. Not clicking it again.")
+                    task_statuses[task_info['original_index']] = "attempted"
+                    continue
+                logger.warning(f"Could not start {label} task '{offer_id}' in parallel: {e}. Deferring to serial processing.")
+                needs_serial.append(task_info)
+
+        if batch:
+            run_batch()
+        return needs_serial
+
+    def snapshot_dashboard_cards(self, section_names=None):
+        """Reads every card of the given dashboard sections (default: all) in a single execute_script call.
+
+        Returns {section_name: {'container_found': bool, 'cards': [record, ...], 'by_key': {key: record}}}.
+        Each record is a plain dict with the card's identifiers ('key', 'href', 'data_bi_id', 'data_m_attr', 'id'),
+        its position among visible cards ('original_index'), 'title', 'points', completion markers ('complete',
+        'complete_reason', 'locked'), the XPath that matched it and the WebElement handle ('element') for clicking.
+        """
+        section_names = section_names or list(self.card_sections)
+        specs = [{'name': name,
+                  'container': self.card_sections[name]['container_xpath'],
+                  'card_xpaths': self.card_sections[name]['card_xpaths']} for name in section_names]
+        raw_sections = self.driver.execute_script(SNAPSHOT_CARDS_JS, specs) or {}
+
+        snapshot = {}
+        for name in section_names:
+            raw = raw_sections.get(name) or {'container_found': False, 'cards': []}
+            section = self.card_sections[name]
+            cards = []
+            for raw_card in raw['cards']:
+                record = dict(raw_card)
+                record['id'] = self._card_display_id(record, section['fallback_prefix'])
+                cards.append(record)
+            snapshot[name] = {'container_found': raw['container_found'], 'cards': cards,
+                              'by_key': {card['key']: card for card in cards if card.get('key')}}
+        return snapshot
+
+    def wait_for_card_snapshot(self, section_name, timeout=15):
+        """Polls snapshot_dashboard_cards until the section's container shows at least one visible card.
+
+        Returns the section snapshot ({'container_found', 'cards', 'by_key'}) from the last poll, even if it is still empty.
+        """
+        last_section = {'container_found': False, 'cards': [], 'by_key': {}}
+
+        def section_has_cards(driver):
+            last_section.update(self.snapshot_dashboard_cards([section_name])[section_name])
+            return last_section['container_found'] and last_section['cards']
 
-    def complete_other_activities(self):
-        """Complete other available point activities"""
         try:
-            logger.info("Looking for other point activities...")
+            self.wait(timeout, poll_frequency=0.5).until(section_has_cards)
+        except TimeoutException:
+            logger.debug(f"No visible cards in section '{section_name}' within {timeout}s.")
+        return last_section
+
+    def _card_display_id(self, record, fallback_prefix):
+        """Picks a human-readable identifier for logging: href, data-bi-id, data-m, then the card title."""
+        if record.get('href'):
+            return record['href']
+        if record.get('data_bi_id'):
+            return record['data_bi_id']
+        if record.get('data_m_attr'):
+            return record['data_m_attr'][:50] + '...'
+        title = record.get('title') or f"{fallback_prefix}_{record['original_index']}"
+        logger.warning(f"No reliable ID (href, data-bi-id, data-m) for card {record['original_index']}, using fallback identifier '{title[:50]}'. "
+                       f"It cannot be re-found after the dashboard reloads.")
+        return title[:50] + "..." if len(title) > 50 else title
+
+    def get_card_status(self, record):
+        """Returns the status of a card snapshot record: 'completed', 'locked' or 'actionable'."""
+        if record.get('complete'):
+            logger.debug(f"Item appears complete via {record.get('complete_reason')}.")
+            return "completed"
+        if record.get('locked'):
+            # Explicitly disabled cards (aria-disabled or 'locked-card') might be non-interactable
+            return "locked"
+        return "actionable"
+
+    def find_card_record(self, cards_by_key, task_info):
+        """Finds the snapshot record with the task's card key. Cards without a key are never matched by position."""
+        if not task_info.get('key'):
+            return None
+        return cards_by_key.get(task_info['key'])
+
+    def refresh_card_state(self, record):
+        """Re-reads the completion/lock state of one card in place with a single script call.
+
+        Returns False if the card's element is no longer attached to the DOM (the dashboard was reloaded or replaced).
+        """
+        if record.get('element') is None:
+            return False
+        try:
+            state = self.driver.execute_script(CARD_STATE_JS, record['element'])
+        except StaleElementReferenceException:
+            return False
+        if not state or not state['visible']:
+            return False
+        record.update(state)
+        return True
 
-            # Ensure on the rewards page and dismiss banners
-            if self.base_url not in self.driver.current_url:
-                logger.info("Navigating to rewards dashboard for other activities.")
-                self.driver.get(self.base_url)
-                time.sleep(5)
-            self.dismiss_banners() # Dismiss banners before finding elements
+    def install_completion_observer(self):
+        """Injects the card completion watcher (COMPLETION_OBSERVER_JS) into the current dashboard page."""
+        try:
+            if self.driver.execute_script(COMPLETION_OBSERVER_JS):
+                logger.debug("Installed card completion observer on the dashboard.")
+        except Exception as e:
+            logger.debug(f"Could not install card completion observer: {e}")
 
+    def wait_for_card_completion(self, record, timeout=3):
+        """Waits up to timeout seconds for the completion observer to report the card complete.
 
-            # --- Define Other Activities Container XPath ---
-            # Use the confirmed ID for the container
-            activities_container_xpath = "//*[@id='more-activities']"
+        Returns True (record updated with the completed state), False if it did not complete in time, or None if
+        the observer cannot tell (page reloaded, card gone, no key) and the caller should re-read the card instead.
+        """
+        if not record.get('key'):
+            return None
+        try:
+            self.set_script_timeout(timeout + 5)
+            with self.metrics.waiting():
+                result = self.driver.execute_async_script(WAIT_CARD_COMPLETION_JS, record['key'], int(timeout * 1000))
+        except Exception as e:
+            logger.debug(f"Card completion wait failed: {e}")
+            return None
+        status = (result or {}).get('status')
+        if status == 'complete':
+            record.update(result['state'])
+            return True
+        if status == 'timeout':
+            return False
+        logger.debug(f"Completion observer could not answer for card '{record['key']}' ({status}).")
+        return None
+
+    def verify_card_completion(self, record):
+        """Returns True if the card now shows as completed, using the observer and falling back to a state re-read."""
+        completed = self.wait_for_card_completion(record)
+        if completed is None:
+            completed = self.refresh_card_state(record) and record['complete']
+        return completed
+
+    def reload_card_section(self, section_name, task_records):
+        """Reloads the dashboard and re-binds every task record of the section to its fresh card element."""
+        section = self.card_sections[section_name]
+        logger.debug(f"Reloading rewards dashboard to re-find {section['title']} cards...")
+        self.navigate(self.base_url, ready_xpath=section['container_xpath'])
+        self.dismiss_banners()
+
+        current_section = self.wait_for_card_snapshot(section_name)
+        if not current_section['container_found']:
+            raise TimeoutException(f"{section['title']} container not found after returning to dashboard")
+
+        for record in task_records:
+            fresh = self.find_card_record(current_section['by_key'], record)
+            if fresh is None:
+                record['element'] = None
+                continue
+            for key in ('element', 'matched_xpath', 'visible', 'complete', 'complete_reason', 'locked', 'title', 'points'):
+                record[key] = fresh[key]
+        self.install_completion_observer()
+
+    def locate_card(self, section_name, task_info, task_records):
+        """Returns task_info with a live element and fresh state, or None if the card cannot be found.
+
+        In incremental mode only the card's own state is re-read; the dashboard is reloaded only when the
+        card's element has been invalidated (stale/detached) or the dashboard tab is no longer focused.
+        """
+        dashboard_focused = self.dashboard_handle is None or self.driver.current_window_handle == self.dashboard_handle
+        if self.incremental_dashboard and dashboard_focused and self.refresh_card_state(task_info):
+            logger.debug(f"Refreshed state of card '{task_info['id']}' in place.")
+            return task_info
+
+        if self.dashboard_handle and not dashboard_focused:
+            self.driver.switch_to.window(self.dashboard_handle)
+        self.reload_card_section(section_name, task_records)
+        return task_info if task_info.get('element') is not None else None
 
-            # --- Define Clickable Other Activities Cards XPaths ---
-            card_clickable_xpaths_in_container = [
-                ".//div[contains(@class, 'rewards-card-container')]/a[contains(@class, 'ds-card-sec')]", # Specific structure confirmed
-                ".//div[contains(@class, 'more-earning-card-item')]/a", # Structure seen in Daily Set, might apply here
-                ".//a[contains(@class, 'ds-card-sec')]",       # Alternative targeting the specific class
-                ".//div[contains(@class, 'rewards-card')]//mee-card", # Broader class from source, target mee-card
-                ".//div[contains(@class, 'promo-item')]//mee-card", # Another common promo pattern
-                ".//mee-card//a[contains(@href, '')]"          # Fallback: any link within a mee-card
-            ]
+    def complete_daily_set(self):
+        """Complete daily set activities"""
+        return self._complete_card_section('daily_set')
 
+    def complete_other_activities(self):
+        """Complete other available point activities"""
+        return self._complete_card_section('more_activities')
+
+    def card_section_finished(self, section_name):
+        """True if the section's cards were seen in this run and none of them was left failed or unreached."""
+        return self.unfinished_cards.get(section_name) == []
+
+    def _complete_card_section(self, section_name):
+        """Works through every card of one dashboard section (daily set or more activities)."""
+        section = self.card_sections[section_name]
+        label = section['label'] # e.g. 'daily set' / 'other activity' for log messages
+        container_xpath = section['container_xpath']
+        self.unfinished_cards[section_name] = None # Until the section's cards have been seen and worked through
+        try:
+            logger.info(f"Starting {section['title']} tasks...")
 
-            # List to store unique identifiers of tasks found
-            task_identifiers = []
+            # Ensure on the rewards page and dismiss banners
+            if self.base_url not in self.driver.current_url:
+                 logger.info(f"Navigating to rewards dashboard for {section['title']}.")
+                 self.navigate(self.base_url, ready_xpath=container_xpath)
+            self.dismiss_banners() # Dismiss banners before finding elements
 
+            # --- Snapshot all cards of the section in one round trip ---
+            logger.info(f"Attempting to find {section['title']} container with XPath: {container_xpath}")
             try:
-                 logger.debug(f"Attempting to find other activities container ({activities_container_xpath}) or cards.")
-
-                 found_container = None
-                 visible_cards = [] # Initialize visible_cards
-
-                 try:
-                      # Try to find the container first
-                      found_container = WebDriverWait(self.driver, 10).until(
-                          EC.visibility_of_element_located((By.XPATH, activities_container_xpath))
-                      )
-                      logger.info(f"Found other activities container.")
-
-                      # Find visible cards *within* the container
-                      all_candidate_cards = found_container.find_elements(By.XPATH, " | ".join([xp for xp in card_clickable_xpaths_in_container if xp.startswith('.//')]))
-                      visible_cards = [card for card in all_candidate_cards if card.is_displayed()]
-                      logger.info(f"Identified {len(visible_cards)} visible other activity cards within container.")
-
-                 except TimeoutException:
-                      logger.warning(f"Other activities container not found or no cards within it. Falling back to searching the entire page.")
-                      # Fallback: Search the whole page if the container or cards within it weren't found
-                      all_candidate_cards = self.driver.find_elements(By.XPATH, " | ".join([xp for xp in card_clickable_xpaths_in_container if xp.startswith('//')])) # Use absolute XPaths for page search
-                      visible_cards = [card for card in all_candidate_cards if card.is_displayed()]
-                      logger.info(f"Identified {len(visible_cards)} visible other activity cards using page-wide fallback.")
-
-                 except Exception as e:
-                      logger.error(f"Error finding initial other activity elements: {str(e)}. Skipping.")
-                      return False
-
-
-                 if not visible_cards:
-                     logger.info("No visible other activity cards found initially. Other activities likely already completed or not available.")
-                     return True # Consider this success if no tasks are found
-
-                 # Collect identifiers for processing loop
-                 for idx, card in enumerate(visible_cards):
-                     # Get unique identifiers for the card
-                     identifiers = {}
-                     identifiers['original_index'] = idx
-                     identifiers['href'] = card.get_attribute("href")
-                     identifiers['data_bi_id'] = card.get_attribute("data-bi-id")
-                     identifiers['data_m_attr'] = card.get_attribute("data-m")
-
-                     # Fallback to text if no reliable identifier found
-                     if not identifiers['href'] and not identifiers['data_bi_id'] and not identifiers['data_m_attr']:
-                         try:
-                            text_element = card.find_elements(By.XPATH, ".//h3 | .//div[contains(@class, 'card-title')] | .//*[string-length(normalize-space()) > 0]")
-                            identifiers['id'] = text_element[0].text.strip() if text_element else f"Unknown_OtherActivity_{idx}"
-                            if len(identifiers['id']) > 50: identifiers['id'] = identifiers['id'][:50] + "..."
-                         except:
-                            identifiers['id'] = f"Unknown_OtherActivity_{idx}"
-                         logger.warning(f"No reliable ID (href, data-bi-id, data-m) for card {idx}, using fallback identifier '{identifiers['id']}'.")
-                     else:
-                         # Use a primary ID for logging if available
-                         identifiers['id'] = identifiers.get('href') or identifiers.get('data_bi_id') or identifiers.get('data_m_attr')[:50] + '...' if identifiers.get('data_m_attr') else f"ID_Found_{idx}"
-
-
-                     task_identifiers.append(identifiers)
-
-                 logger.info(f"Collected {len(task_identifiers)} other activity task identifiers.")
-
-
-            except Exception as e: # Catch exceptions during the initial finding process
-                 logger.error(f"Error during initial scan for other activities: {str(e)}. Skipping.")
-                 return False # Indicate failure
+                section_snapshot = self.wait_for_card_snapshot(section_name)
+            except Exception as e:
+                 logger.error(f"Error reading {section['title']} cards: {e}. Skipping {section['title']}.")
+                 return False
 
+            if not section_snapshot['container_found']:
+                if section['required']:
+                    logger.error(f"Could not find the {section['title']} container. Skipping {section['title']}.")
+                    return False
+                logger.warning(f"{section['title'].capitalize()} container not found.")
+
+            task_identifiers = section_snapshot['cards']
+            logger.info(f"Identified {len(task_identifiers)} visible {label} cards.")
+            if not task_identifiers:
+                if section['required']:
+                    logger.error(f"No visible {label} cards found. Skipping {section['title']}.")
+                    return False
+                # A slow dashboard looks the same, so the section stays unfinished in the checkpoint and is retried
+                logger.info(f"No visible {label} cards found initially. {section['title'].capitalize()} likely already completed or not available.")
+                return True # Consider this success if no tasks are found
 
             # --- Process Found Cards using Identifiers ---
             task_statuses = {info['original_index']: 'initial' for info in task_identifiers}
+            # Keep this tab as the dashboard; activity tabs are closed and we always return here
+            self.dashboard_handle = self.driver.current_window_handle
+            self.install_completion_observer()
 
             # Process tasks by their original index order
-            for original_index in sorted(task_statuses.keys()):
-                 # Find the task_info for this original_index
-                 task_info = next((item for item in task_identifiers if item['original_index'] == original_index), None)
-                 if not task_info: # Should not happen if logic is correct
-                      logger.error(f"Could not find task_info for original index {original_index}. Skipping.")
-                      continue
+            serial_tasks = []
+            for task_info in sorted(task_identifiers, key=lambda item: item['original_index']):
+                if self.checkpoint.card_done(section_name, task_info['id']):
+                    logger.info(f"Checkpoint: {label} task '{task_info['id']}' was already handled earlier today. Skipping.")
+                    task_statuses[task_info['original_index']] = "completed"
+                else:
+                    serial_tasks.append(task_info)
+            if self.max_parallel_activities > 1:
+                # Open several activity cards into their own tabs at once; leftovers go through the serial loop
+                serial_tasks = self._start_cards_in_parallel(section_name, serial_tasks, task_statuses)
 
+            for task_info in serial_tasks:
+                 original_index = task_info['original_index']
                  offer_id = task_info['id']
-                 href_to_find = task_info.get('href')
-                 data_bi_id_to_find = task_info.get('data_bi_id')
-                 data_m_attr_to_find = task_info.get('data_m_attr')
 
-
-                 logger.info(f"Processing other activity task (original index {original_index}): '{offer_id}'...")
+                 logger.info(f"Processing {label} task (original index {original_index}): '{offer_id}'...")
+                 card_span = self.metrics.start('card', section=section_name, card=offer_id)
 
                  # --- Attempt to process the specific card with retries ---
                  max_retries = 3
                  task_processed_successfully = False
 
                  for retry_count in range(max_retries):
-                     card_element = None
-                     current_task_status = 'unknown'
-
                      try:
-                         # --- Navigate back to Rewards Dashboard and Re-find Elements ---
-                         logger.debug(f"Navigating back to Rewards dashboard to re-find element (Retry {retry_count+1}/{max_retries})...")
-                         self.driver.get(self.base_url)
-                         time.sleep(7)
-                         self.dismiss_banners()
-
-                         # Re-find the container if it was originally found, otherwise search the whole page
-                         search_context_retry = None
-                         if found_container:
-                              try:
-                                   search_context_retry = WebDriverWait(self.driver, 15).until(
-                                       EC.visibility_of_element_located((By.XPATH, activities_container_xpath))
-                                   )
-                                   logger.debug("Re-found other activities container.")
-                              except TimeoutException:
-                                   logger.warning("Other activities container not found after returning. Falling back to page search.")
-                                   search_context_retry = self.driver # Fallback to page search context
-                              except Exception as e:
-                                  logger.warning(f"Error re-finding other activities container: {e}. Falling back to page search.")
-                                  search_context_retry = self.driver # Fallback
-
-                         else: # If container wasn't found initially, always search the whole page
-                              search_context_retry = self.driver
-                              logger.debug("Using page search context to re-find other activities.")
-
-
-                         # Re-find the SPECIFIC element using its identifier within the fresh context
-                         logger.debug(f"Re-finding other activity card by identifiers within context...")
-                         current_card_xpaths = [xp for xp in card_clickable_xpaths_in_container if (search_context_retry != self.driver and xp.startswith('.//')) or (search_context_retry == self.driver and xp.startswith('//'))]
-                         all_current_visible_cards = [card for card in search_context_retry.find_elements(By.XPATH, " | ".join(current_card_xpaths)) if card.is_displayed()]
-
-                         found_match = False
-                         for current_card in all_current_visible_cards:
-                             current_href = current_card.get_attribute("href")
-                             current_data_bi_id = current_card.get_attribute("data-bi-id")
-                             current_data_m_attr = current_card.get_attribute("data-m")
-
-                             if (href_to_find and current_href == href_to_find) or \
-                                (data_bi_id_to_find and current_data_bi_id == data_bi_id_to_find) or \
-                                (data_m_attr_to_find and current_data_m_attr == data_m_attr_to_find):
-                                 card_element = current_card
-                                 logger.debug(f"Matched other activity card by identifier on retry {retry_count+1}.")
-                                 found_match = True
-                                 WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-                                 break
-
-                         if not found_match and original_index < len(all_current_visible_cards):
-                              card_element = all_current_visible_cards[original_index]
-                              logger.debug(f"Matched other activity card by index {original_index} on retry {retry_count+1}.")
-                              WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-
-
-                         if card_element is None:
-                                   logger.warning(f"Could not re-find visible element for other activity task '{offer_id}' on retry {retry_count+1}/{max_retries}. Skipping processing for this task.")
-                                   break
-
+                         # --- Refresh the card (reloading the dashboard only if its DOM was invalidated) ---
+                         logger.debug(f"Re-finding {label} card (Retry {retry_count+1}/{max_retries})...")
+                         card = self.locate_card(section_name, task_info, task_identifiers)
+                         if card is None:
+                              logger.warning(f"Could not re-find visible element for {label} task '{offer_id}' on retry {retry_count+1}/{max_retries}. Skipping processing for this task.")
+                              break
+                         card_element = card['element']
 
                          # --- If element re-found, check status and interact ---
-                         if card_element:
-                             current_task_status = self.get_other_activity_status(card_element)
-                             if current_task_status == "completed":
-                                 logger.info(f"Other activity task '{offer_id}' appears completed.")
-                                 task_statuses[original_index] = "completed"
-                                 task_processed_successfully = True
-                                 break
-
-                             # We do not check for "locked" status here anymore.
-                             # If status is "actionable"
-                             logger.info(f"Other activity task '{offer_id}' is actionable. Attempting interaction (Retry {retry_count+1}/{max_retries})...")
-
-                             # Scroll to the card and click
-                             try:
-                                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card_element)
-                                 time.sleep(1)
-                             except Exception as scroll_err:
-                                 logger.debug(f"Scroll failed for other activity card: {scroll_err}")
-                                 pass
-
-                             try:
-                                WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.XPATH, self.get_element_xpath(card_element))))
-                                self.driver.execute_script("arguments[0].click();", card_element)
-                                logger.info(f"Clicked other activity task '{offer_id}' successfully.")
-                             except Exception as click_err:
-                                 logger.warning(f"JS click failed for other activity task '{offer_id}': {click_err}. Retrying.")
-                                 if retry_count == max_retries - 1:
-                                      logger.error(f"Max retries reached for JS click on other activity task '{offer_id}'. Skipping task.")
-                                      break
-                                 time.sleep(2)
-                                 continue
-
-                             # --- Handle Activity Page (New Tab or In-Page) ---
-                             initial_window_handle = self.driver.current_window_handle
-                             time.sleep(2)
-                             window_handles_after = self.driver.window_handles
-
-                             if len(window_handles_after) > len(self.driver.window_handles):
-                                 logger.error("Window handles increased unexpectedly after click. This might indicate a problem with tab handling.")
-                                 try:
-                                      self.driver.switch_to.window(initial_window_handle)
-                                      logger.warning("Switched back to original window. Skipping interaction on potential new tab.")
-                                 except:
-                                      logger.critical("Failed to switch back to original window. Cannot continue.")
-                                      raise
-                                 task_statuses[original_index] = "attempted"
-
-
-                             elif len(window_handles_after) > 1:
-                                 new_window_handle = [handle for handle in window_handles_after if handle != initial_window_handle]
-                                 if new_window_handle:
-                                      self.driver.switch_to.window(new_window_handle[-1])
-                                      logger.info(f"Switched to new tab for other activity task '{offer_id}'")
-
-                                      self.handle_activity_page() # Call dedicated handler
-
-                                      logger.info("Closing other activity tab and switching back.")
-                                      try:
-                                          self.driver.close()
-                                          self.driver.switch_to.window(initial_window_handle)
-                                          time.sleep(3)
-                                      except Exception as close_err:
-                                           logger.error(f"Error closing activity tab or switching back: {close_err}. Recovery attempt.")
-                                           try:
-                                                self.driver.get(self.base_url)
-                                                time.sleep(7)
-                                                self.dismiss_banners()
-                                           except:
-                                                logger.critical("Failed to navigate back to rewards dashboard after tab error. Cannot reliably continue other activities.")
-                                                raise
-                                 else:
-                                     logger.warning(f"Expected new tab after clicking other activity task '{offer_id}', but no new handle found. Assuming in-page or error.")
-
-
-                             else:
-                                 logger.warning(f"Clicking other activity task '{offer_id}' did not open a new tab or multiple windows already existed. Assuming in-page activity or simple link. Waiting...")
-                                 time.sleep(random.uniform(10, 15))
-                                 logger.info("Finished waiting after in-page interaction attempt.")
-
-                             task_statuses[original_index] = "attempted"
+                         if self.get_card_status(card) == "completed":
+                             logger.info(f"{label.capitalize()} task '{offer_id}' appears completed.")
+                             task_statuses[original_index] = "completed"
                              task_processed_successfully = True
                              break
 
+                         # Any non-completed task is considered "actionable" (locked cards are still attempted)
+                         logger.info(f"{label.capitalize()} task '{offer_id}' is actionable. Attempting interaction (Retry {retry_count+1}/{max_retries})...")
+
+                         self.sleep(1) # Brief pause before acting on the card
+
+                         initial_window_handle = self.driver.current_window_handle
+                         handles_before_click = self.driver.window_handles
+                         try:
+                            # Scroll to the card and click it in page, on the handle we already hold
+                            self.click_element(card_element, timeout=10)
+                            logger.info(f"Clicked {label} task '{offer_id}' successfully.")
+                         except Exception as click_err:
+                             logger.warning(f"JS click failed for {label} task '{offer_id}': {click_err}. Retrying.")
+                             if retry_count == max_retries - 1:
+                                  logger.error(f"Max retries reached for JS click on {label} task '{offer_id}'. Skipping task.")
+                                  break
+                             self.sleep(2)
+                             continue
+
+                         # --- Handle Activity Page (New Tab or In-Page) ---
+                         # Wait for the click to open a new tab instead of sleeping a fixed time
+                         new_window_handle = self.wait_for_new_window(handles_before_click)
+
+                         if new_window_handle:
+                             self.driver.switch_to.window(new_window_handle)
+                             logger.info(f"Switched to new tab for {label} task '{offer_id}'")
+
+                             self.handle_activity_page() # Call dedicated handler
+
+                             logger.info(f"Closing {label} tab and switching back.")
+                             try:
+                                 self.driver.close()
+                                 self.driver.switch_to.window(initial_window_handle)
+                                 # The dashboard's completion observer reports the card as soon as it flips; no reload needed
+                                 if self.incremental_dashboard and self.verify_card_completion(card):
+                                     logger.info(f"{label.capitalize()} task '{offer_id}' now shows as completed ({card['complete_reason']}).")
+                                     task_statuses[original_index] = "completed"
+                             except Exception as close_err:
+                                  logger.error(f"Error closing activity tab or switching back: {close_err}. Recovery attempt.")
+                                  try:
+                                       self.driver.switch_to.window(self.driver.window_handles[0])
+                                       self.navigate(self.base_url, ready_xpath=container_xpath)
+                                       self.dismiss_banners()
+                                  except:
+                                       logger.critical(f"Failed to navigate back to rewards dashboard after tab error. Cannot reliably continue {section['title']}.")
+                                       raise
+
+                         else:
+                             logger.warning(f"Clicking {label} task '{offer_id}' did not open a new tab. Assuming in-page activity or simple link. Waiting...")
+                             self.sleep(self.rng.uniform(10, 15))
+                             logger.info("Finished waiting after in-page interaction attempt.")
+
+                         if task_statuses[original_index] != "completed":
+                             task_statuses[original_index] = "attempted"
+                         task_processed_successfully = True
+                         break
 
                      # --- Except blocks for retry attempts ---
                      except TimeoutException:
-                          logger.warning(f"Timeout waiting for element/page on retry {retry_count+1}/{max_retries} for other activity task '{offer_id}'. Retrying.")
-                          time.sleep(2)
+                          logger.warning(f"Timeout waiting for element/page on retry {retry_count+1}/{max_retries} for {label} task '{offer_id}'. Retrying.")
+                          self.sleep(2)
                           if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for other activity task '{offer_id}' due to Timeout. Skipping task.")
+                               logger.error(f"Max retries reached for {label} task '{offer_id}' due to Timeout. Skipping task.")
                                task_statuses[original_index] = "failed"
                           continue
 
                      except StaleElementReferenceException:
-                          logger.warning(f"Stale element reference on retry {retry_count+1}/{max_retries} for other activity task '{offer_id}'. Re-finding element and retrying.")
-                          time.sleep(2)
+                          logger.warning(f"Stale element reference on retry {retry_count+1}/{max_retries} for {label} task '{offer_id}'. Re-finding element and retrying.")
+                          self.sleep(2)
                           if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for other activity task '{offer_id}' due to Stale Element. Skipping task.")
+                               logger.error(f"Max retries reached for {label} task '{offer_id}' due to Stale Element. Skipping task.")
                                task_statuses[original_index] = "failed"
                           continue
 
                      except ElementClickInterceptedException as ice:
-                          logger.warning(f"Click intercepted on retry {retry_count+1}/{max_retries} for other activity task '{offer_id}': {ice}. Retrying.")
-                          time.sleep(2)
+                          logger.warning(f"Click intercepted on retry {retry_count+1}/{max_retries} for {label} task '{offer_id}': {ice}. Retrying.")
+                          self.sleep(2)
                           if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for other activity task '{offer_id}' due to Element Click Intercepted. Skipping task.")
+                               logger.error(f"Max retries reached for {label} task '{offer_id}' due to Element Click Intercepted. Skipping task.")
                                task_statuses[original_index] = "failed"
                           continue
 
                      except ElementNotInteractableException as eint_err:
-                         logger.warning(f"Element not interactable on retry {retry_count+1}/{max_retries} for other activity task '{offer_id}': {eint_err}. Skipping task.")
+                         logger.warning(f"Element not interactable on retry {retry_count+1}/{max_retries} for {label} task '{offer_id}': {eint_err}. Skipping task.")
                          task_statuses[original_index] = "skipped_not_interactable"
                          break
 
                      except Exception as e:
-                          logger.error(f"Unexpected error on retry {retry_count+1}/{max_retries} for other activity task '{offer_id}': {str(e)}. Retrying.")
-                          time.sleep(3)
+                          logger.error(f"Unexpected error on retry {retry_count+1}/{max_retries} for {label} task '{offer_id}': {str(e)}. Retrying.")
+                          self.sleep(3)
                           if retry_count == max_retries - 1:
-                               logger.error(f"Max retries reached for other activity task '{offer_id}' due to unexpected error. Skipping task.")
+                               logger.error(f"Max retries reached for {label} task '{offer_id}' due to unexpected error. Skipping task.")
                                task_statuses[original_index] = "failed"
                           continue
 
                  # --- After the retry loop finishes for a single task ---
                  if not task_processed_successfully:
-                      logger.warning(f"Other activity task '{offer_id}' was not successfully processed after {max_retries} retries.")
+                      logger.warning(f"{label.capitalize()} task '{offer_id}' was not successfully processed after {max_retries} retries.")
                  else:
                       if task_statuses[original_index] == 'initial':
                            task_statuses[original_index] = 'attempted'
 
-
-                 logger.info(f"Finished processing logic for other activity task '{offer_id}'. Final Status: {task_statuses[original_index]}.")
+                 # Only cards the dashboard shows as completed are skipped by a restart; attempted ones are retried
+                 if task_statuses[original_index] == "completed":
+                      self.checkpoint.mark_card_done(section_name, offer_id)
+                 self.metrics.finish(card_span, outcome=task_statuses[original_index], retries=retry_count)
+                 logger.info(f"Finished processing logic for {label} task '{offer_id}'. Final Status: {task_statuses[original_index]}.")
 
 
-            logger.info("Finished attempting other activities.")
+            self.dashboard_handle = None
+            logger.info(f"Finished attempting {section['title']} tasks.")
             # Log final status of all tasks attempted
-            for original_index, status in task_statuses.items():
-                 offer_id = next((item['id'] for item in task_identifiers if item['original_index'] == original_index), 'N/A')
-                 logger.info(f"Other Activity Task (Original Index {original_index}, ID: '{offer_id}'): {status}")
+            for task_info in task_identifiers:
+                 logger.info(f"{label.title()} Task (Original Index {task_info['original_index']}, ID: '{task_info['id']}'): {task_statuses[task_info['original_index']]}")
+            # Cards that failed (or were never reached) keep the section's checkpoint phase open for a restart
+            self.unfinished_cards[section_name] = [task_info['id'] for task_info in task_identifiers
+                                                   if task_statuses[task_info['original_index']] in ('failed', 'initial')]
 
             return True
         except Exception as e:
-            logger.error(f"General error completing other activities workflow: {str(e)}")
+            self.dashboard_handle = None
+            logger.error(f"General error completing {section['title']} workflow: {str(e)}")
             try:
-                 self.driver.get(self.base_url)
-                 time.sleep(7)
-                 self.dismiss_banners();
+                 self.navigate(self.base_url, ready_xpath=container_xpath)
+                 self.dismiss_banners()
             except:
-                 logger.warning("Failed to refresh page after general other activities error.")
+                 logger.warning(f"Failed to refresh page after general {section['title']} error.")
             raise
 
 
-    # Helper function to generate robust XPath for a specific element
-    def get_element_xpath(self, element):
-        """Generates a simple but reasonably robust XPath for a given element."""
-        try:
-            # Try to get XPath using JavaScript for robustness
-            xpath = self.driver.execute_script("""
-                getElementXPath = function(element) {
-                    if (!element) return null;
-                    // Prioritize ID
-                    if (element.id) {
-                        return "//*[@id='" + element.id + "']";
-                    }
-                    // Prioritize data-bi-id (common on rewards cards)
-                    if (element.hasAttribute('data-bi-id')) {
-                         return "//*[@data-bi-id='" + element.getAttribute('data-bi-id') + "']";
-                    }
-                     // Prioritize data-offer-id (common on some rewards cards)
-                    if (element.hasAttribute('data-offer-id')) {
-                         return "//*[@data-offer-id='" + element.getAttribute('data-offer-id') + "']";
-                    }
-                    // Prioritize data-m (contains structured data) - Use the exact string for XPath if it exists
-                     if (element.hasAttribute('data-m')) {
-                         let dataM = element.getAttribute('data-m');
-                         // Use the exact data-m string in XPath, escaping single quotes
-                         try {
-                            let escapedDataM = dataM.replace(/'/g, "',\"'\",'");
-                            return "//*[@data-m='" + escapedDataM + "']";
-                         } catch (e) {
-                             // console.error("Error escaping data-m for XPath:", e); // Avoid logging JS errors to main log
-                             // Fallback to simpler XPath if escaping fails
-                         }
-                     }
-                    // Prioritize href for links
-                     if (element.tagName === 'A' && element.hasAttribute('href')) {
-                         let href = element.getAttribute('href');
-                         // Use contains with the full href for uniqueness if it seems stable
-                         return "//a[contains(@href, '" + href + "')]";
-                     }
-                    // Check for common classes and text content (truncated) - less unique
-                    if (element.classList.length > 0) {
-                         if (element.textContent && element.textContent.trim().length > 5) {
-                              let textPart = element.textContent.trim().substring(0, 20).replace(/'/g, "',\"'\",'"); // Truncate & escape
-                               return ".//" + element.tagName.toLowerCase() + "[contains(@class, '" + element.classList[0] + "') and contains(text(), '" + textPart + "')]";
-                         }
-                         // Fallback to just tag and first class
-                         return ".//" + element.tagName.toLowerCase() + "[contains(@class, '" + element.classList[0] + "')]";
-                    }
-
-                    // Fallback to tag name (least specific)
-                    return ".//" + element.tagName.toLowerCase();
-                };
-                return getElementXPath(arguments[0]);
-            """, element)
-            if xpath and "null" not in xpath and xpath.strip() != "":
-                return xpath
-            else:
-                 logger.debug("JS XPath generation failed or returned empty, falling back to tag name.")
-                 return f".//{element.tag_name}"
+    def try_click_element(self, element, block='center'):
+        """Checks, scrolls to and clicks element in a single round trip. Returns 'clicked' or why it was not clickable."""
+        return self.driver.execute_script(CLICK_ELEMENT_JS, element, block)
 
-        except Exception as e:
-            logger.debug(f"Error getting XPath via JS: {e}. Falling back to tag name.")
-            return f".//{element.tag_name}"
+    def click_element(self, element, timeout=10, block='center'):
+        """Clicks element in page, retrying until it is displayed and enabled or timeout seconds have passed.
+
+        Raises TimeoutException if it never becomes clickable and StaleElementReferenceException if it is detached.
+        """
+        def attempt(driver):
+            outcome = self.try_click_element(element, block)
+            if outcome == 'detached':
+                raise StaleElementReferenceException("element is no longer attached to the page document")
+            return outcome == 'clicked'
+        self.wait(timeout).until(attempt, "element did not become clickable")
 
 
-    def check_points_balance(self):
-        """Check and log current points balance"""
+    def check_points_balance(self, reload=False):
+        """Check and log current points balance. reload=True re-reads the dashboard even if it is already open."""
         try:
             logger.info("Checking points balance...")
-            # Navigate to the dashboard if not already there
-            if self.base_url not in self.driver.current_url:
-                 logger.info("Navigating to rewards dashboard to check points.")
-                 self.driver.get(self.base_url)
-                 time.sleep(5)
-            self.dismiss_banners() # Dismiss banners before checking points
-
-            points = "Unknown"
-
-            # Updated XPaths based on provided HTML, prioritizing structure
-            points_xpaths = [
-                "//mee-rewards-user-status-banner//p[contains(@class, 'pointsValue')]//span", # Confirmed structure
-                "//mee-rewards-user-status-banner//mee-rewards-counter-animation/span", # Confirmed structure (might be same as above)
-                "//div[contains(@class, 'points-package')]//span[contains(@class, 'points-label')]", # Common pattern (fallback)
-                "//p[contains(@class, 'points')] | //span[contains(@class, 'points')]", # Broader classes (fallback)
-                "//div[contains(@class, 'mee-rewards-counter')]//span[string-length(normalize-space()) > 0]", # Counter element (fallback)
-                "//mee-rewards-user-status-banner//div[contains(@class, 'pointsBalance')]//span" # Specific to the user status banner (fallback)
-            ]
-
-            # Iterate through XPaths and try to find the element and get its text
-            for xpath in points_xpaths:
-                try:
-                    logger.debug(f"Attempting points check with XPath: {xpath}")
-                    # Wait for the element to be visible and have text
-                    points_element = WebDriverWait(self.driver, 10).until( # Shorter wait per XPath
-                         EC.visibility_of_element_located((By.XPATH, xpath))
-                    )
-                    WebDriverWait(self.driver, 5).until(
-                         EC.text_to_be_present_in_element((By.XPATH, xpath), "")
-                    )
-
-                    raw_text = points_element.text.strip()
-                    aria_label_text = points_element.get_attribute("aria-label") # Check aria-label as seen in HTML
-
-                    # Prioritize aria-label if it's a number, fallback to text
-                    text_to_check = aria_label_text if aria_label_text and aria_label_text.replace(",", "").isdigit() else raw_text
-
-                    # Basic validation: check if it's non-empty and looks like a number (possibly with commas)
-                    # Also, exclude common non-point texts found in similar elements
-                    if text_to_check and text_to_check.replace(",", "").isdigit() and len(text_to_check.replace(",", "")) > 0: # Check if it looks like a number with at least one digit
-                         points = text_to_check
-                         logger.info(f"Current points balance found: {points} (using XPath: {xpath})")
-                         return points # Return immediately on success
-                    else:
-                         logger.debug(f"XPath {xpath} found element, but text '{raw_text}' / aria_label '{aria_label_text}' did not look like points. Trying next XPath.")
-                         pass # Try next XPath
-
-                except TimeoutException:
-                    logger.debug(f"Points element not found/visible with XPath: {xpath} within timeout.")
-                    pass # Try next XPath
-                except Exception as e:
-                    logger.warning(f"Error during points check with XPath {xpath}: {e}. Trying next XPath.")
-                    pass # Try next XPath
-
-            logger.warning("Could not find points balance using any known XPaths.")
-            points = "Unknown"
+            # Navigate to the dashboard if not already there. The incremental dashboard tab is never reloaded
+            # during the activities, so its counter is stale by the final check and has to be loaded afresh.
+            needs_navigation = reload or self.base_url not in self.driver.current_url
+            if needs_navigation:
+                 logger.info("Loading rewards dashboard to check points.")
+            probe = self.probe_dashboard(navigate=needs_navigation)
+
+            if probe['points']:
+                points = probe['points']
+                logger.info(f"Current points balance found: {points} (using XPath: {probe['xpath']})")
+            else:
+                logger.warning("Could not find points balance using any known XPaths.")
+                points = "Unknown"
 
         except Exception as e:
             logger.error(f"General error checking points balance workflow: {str(e)}")
@@ -1510,9 +3192,23 @@ class MicrosoftRewardsBot:
         return points
 
 
+    def _install_sigterm_handler(self):
+        """Makes SIGTERM flush the checkpoint and exit cleanly so the next run resumes instead of starting over."""
+        def handle_sigterm(signum, frame):
+            logger.warning("Received SIGTERM. Saving checkpoint and shutting down.")
+            self.checkpoint.save()
+            raise SystemExit(1)
+        try:
+            signal.signal(signal.SIGTERM, handle_sigterm)
+        except ValueError:
+            # signal handlers can only be installed from the main thread
+            logger.debug("Not on the main thread; SIGTERM handler not installed.")
+
     def run_complete_workflow(self, nosearch=False):
         """Run the complete workflow of all tasks"""
         success = False # Assume failure initially
+        self.metrics = RunMetrics(self.clock)
+        self.command_counter.reset()
         try:
             logger.info("-" * 40)
             logger.info("Starting complete Microsoft Rewards workflow")
@@ -1520,38 +3216,75 @@ class MicrosoftRewardsBot:
             logger.info(f"Workflow started at: {current_time}")
             logger.info("-" * 40)
 
+            # On SIGTERM (service stop, container shutdown) flush the checkpoint and unwind through the finally block
+            self._install_sigterm_handler()
 
-            # Setup the driver instance for this run
+            # Setup the driver instance for this run (or reuse the kept-alive one if it is still healthy)
             # This must be done inside run_complete_workflow because each scheduled run
-            # creates a new bot instance.
-            self.setup_driver()
+            # creates a new bot instance unless keep-alive is enabled.
+            with self.metrics.span('setup_driver', keep_alive=self.keep_alive):
+                self.ensure_driver()
 
             # Attempt login or verify existing session
             # login method now handles initial navigation and status check
-            if self.login():
-                # Check initial points balance after successful login
-                # This check should now work reliably and banners are dismissed
-                initial_points = self.check_points_balance()
-
-                # Conditionally perform searches
-                if not nosearch:
-                    # Ensure we start from a clean Bing page for desktop searches
-                    self.driver.get(self.bing_url)
-                    time.sleep(3)
-                    self.perform_searches(count=self.desktop_search_count, mobile=False)
-
-                    # Now perform mobile searches
-                    # Navigate again to reset state before setting mobile UA
-                    self.driver.get(self.bing_url)
-                    time.sleep(3)
-                    self.perform_searches(count=self.mobile_search_count, mobile=True)
+            with self.metrics.span('login') as login_span:
+                logged_in = self.login()
+                login_span['outcome'] = 'ok' if logged_in else 'failed'
+            if logged_in:
+                # Reuse the points balance read by the login probe instead of loading the dashboard again
+                probe = self.last_dashboard_probe
+                if probe and probe['points']:
+                    initial_points = probe['points']
+                else:
+                    with self.metrics.span('check_points_balance', when='initial'):
+                        initial_points = self.check_points_balance()
+                logger.info(f"Initial points balance: {initial_points}")
+
+                # Conditionally perform searches (phases already finished today are skipped)
+                if not nosearch and self.interleave_searches:
+                    devices = [device_type for device_type in ('desktop', 'mobile')
+                               if not self.checkpoint.phase_done(f"{device_type}_searches")]
+                    if not devices:
+                        logger.info("Checkpoint: desktop and mobile searches already finished today. Skipping.")
+                    else:
+                        with self.metrics.span('searches', device='+'.join(devices), interleaved=True) as searches_span:
+                            results = self.perform_interleaved_searches(devices)
+                            searches_span.update(outcome='ok' if all(results.values()) else 'failed',
+                                                 performed={device_type: self.search_plans[device_type]['performed'] for device_type in devices})
+                        for device_type, searched in results.items():
+                            if searched and self.search_phase_finished(device_type):
+                                self.checkpoint.mark_phase(f"{device_type}_searches")
+                elif not nosearch:
+                    if self.checkpoint.phase_done('desktop_searches'):
+                        logger.info("Checkpoint: desktop searches already finished today. Skipping.")
+                    else:
+                        with self.metrics.span('searches', device='desktop') as searches_span:
+                            # Ensure we start from a clean Bing page for desktop searches (URL mode opens results pages directly)
+                            if self.search_mode != 'url':
+                                self.navigate(self.bing_url, ready_xpath=self.search_box_ready_xpath)
+                            searched = self.perform_searches(count=self.desktop_search_count, mobile=False)
+                            searches_span.update(outcome='ok' if searched else 'failed', performed=self.search_plans['desktop']['performed'])
+                        if searched and self.search_phase_finished('desktop'):
+                            self.checkpoint.mark_phase('desktop_searches')
+
+                    if self.checkpoint.phase_done('mobile_searches'):
+                        logger.info("Checkpoint: mobile searches already finished today. Skipping.")
+                    else:
+                        with self.metrics.span('searches', device='mobile') as searches_span:
+                            # Now perform mobile searches
+                            # Navigate again to reset state before setting mobile UA (not needed in URL mode)
+                            if self.search_mode != 'url':
+                                self.navigate(self.bing_url, ready_xpath=self.search_box_ready_xpath)
+                            searched = self.perform_searches(count=self.mobile_search_count, mobile=True)
+                            searches_span.update(outcome='ok' if searched else 'failed', performed=self.search_plans['mobile']['performed'])
+                        if searched and self.search_phase_finished('mobile'):
+                            self.checkpoint.mark_phase('mobile_searches')
 
                     # Reset user agent to default desktop after mobile searches (optional but clean)
                     try:
                          self.driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ""})
                          self.driver.maximize_window()
                          logger.info("Reset user agent to default desktop and maximized window.")
-                         time.sleep(2) # Wait after resetting UA and size
                     except Exception as ua_reset_err:
                          logger.warning(f"Failed to reset user agent/window size: {ua_reset_err}")
                          pass
@@ -1566,7 +3299,15 @@ class MicrosoftRewardsBot:
                 # Complete daily set
                 daily_set_success = False
                 try:
-                    daily_set_success = self.complete_daily_set()
+                    if self.checkpoint.phase_done('daily_set'):
+                        logger.info("Checkpoint: daily set already finished today. Skipping.")
+                        daily_set_success = True
+                    else:
+                        with self.metrics.span('daily_set') as phase_span:
+                            daily_set_success = self.complete_daily_set()
+                            phase_span['outcome'] = 'ok' if daily_set_success else 'failed'
+                        if daily_set_success and self.card_section_finished('daily_set'):
+                            self.checkpoint.mark_phase('daily_set')
                 except Exception as e:
                     logger.error(f"Exception caught during daily set workflow: {str(e)}. Continuing to other activities.")
                     daily_set_success = False
@@ -1575,7 +3316,15 @@ class MicrosoftRewardsBot:
                 # Complete other activities
                 other_activities_success = False
                 try:
-                    other_activities_success = self.complete_other_activities()
+                    if self.checkpoint.phase_done('other_activities'):
+                        logger.info("Checkpoint: other activities already finished today. Skipping.")
+                        other_activities_success = True
+                    else:
+                        with self.metrics.span('other_activities') as phase_span:
+                            other_activities_success = self.complete_other_activities()
+                            phase_span['outcome'] = 'ok' if other_activities_success else 'failed'
+                        if other_activities_success and self.card_section_finished('more_activities'):
+                            self.checkpoint.mark_phase('other_activities')
                 except Exception as e:
                     logger.error(f"Exception caught during other activities workflow: {str(e)}. Finishing workflow.")
                     other_activities_success = False
@@ -1590,7 +3339,8 @@ class MicrosoftRewardsBot:
 
 
                 # Check final points balance
-                final_points = self.check_points_balance() # This function now handles banner dismissal
+                with self.metrics.span('check_points_balance', when='final'):
+                    final_points = self.check_points_balance(reload=True) # This function now handles banner dismissal
 
                 logger.info(f"Workflow completed. Points: {initial_points} -> {final_points}")
                 success = daily_set_success and other_activities_success # Overall success if both activities completed successfully
@@ -1613,15 +3363,38 @@ class MicrosoftRewardsBot:
 
         finally:
             # This block runs whether there was an exception or not
-            # Ensure the driver is quit cleanly regardless of success/failure
-            self.quit_driver()
+            # Persist what we learned about selectors so the next run tries the working ones first
+            self.selector_registry.save()
+            self.checkpoint.save()
+            self.command_counter.log_summary()
+            virtual_time = self.clock.report()
+            if virtual_time:
+                logger.info(f"Simulated duration: {virtual_time['simulated_seconds']:.1f}s "
+                            f"(by phase: {virtual_time['by_phase']})")
+            self.metrics.write(self.metrics_path, outcome='ok' if success else 'failed', nosearch=nosearch,
+                               commands=self.command_counter.summary(), virtual_time=virtual_time)
+            if self.blocked_url_patterns:
+                stats = self.resource_stats
+                logger.info(f"Resource blocking totals: {stats['pages']} pages, "
+                            f"{sum(stats['blocked'].values())} requests blocked {stats['blocked']}, "
+                            f"{stats['transferred_bytes'] / (1024 * 1024):.1f} MB transferred.")
+            # Ensure the driver is quit cleanly regardless of success/failure, unless it is kept alive for the next run
+            if self.keep_alive:
+                self.park_driver()
+            else:
+                self.quit_driver()
             logger.info("-" * 40)
-            logger.info("Workflow process finished. Browser window is closed.")
+            logger.info(f"Workflow process finished. Browser window is {'kept open' if self.keep_alive and self.driver else 'closed'}.")
             logger.info("-" * 40)
 
 
+# Bot instance (and browser) kept between scheduled runs in keep-alive mode
+_kept_alive_bot = None
+
+
 # Function to run the bot on schedule
-def run_rewards_bot(nosearch=False):
+def run_rewards_bot(nosearch=False, **bot_options):
+    global _kept_alive_bot
     logger.info("Starting scheduled run of Microsoft Rewards Bot.")
 
     # Create user data directory for Edge browser persistent profile
@@ -1632,9 +3405,17 @@ def run_rewards_bot(nosearch=False):
 
     # Create a NEW bot instance for each scheduled run
     # This ensures a fresh WebDriver instance is created each time, using the persistent profile.
-    bot = MicrosoftRewardsBot(
-        user_data_dir=edge_profile_dir
-    )
+    # In keep-alive mode the previous instance and its browser are reused instead.
+    if bot_options.get('keep_alive') and _kept_alive_bot is not None:
+        bot = _kept_alive_bot
+        bot.prepare_new_run()
+    else:
+        bot = MicrosoftRewardsBot(
+            user_data_dir=edge_profile_dir,
+            **bot_options # Optional tuning passed through from the command line
+        )
+        if bot_options.get('keep_alive'):
+            _kept_alive_bot = bot
 
     # Run the workflow
     success = bot.run_complete_workflow(nosearch=nosearch)
@@ -1649,19 +3430,23 @@ def run_rewards_bot(nosearch=False):
     logger.info("-" * 40)
 
     # The bot object and its associated WebDriver instance are quit
-    # in the finally block of run_complete_workflow.
+    # in the finally block of run_complete_workflow (or parked there in keep-alive mode).
     # The browser process should be closed, but the profile data is saved
     # in user_data_dir for the next run.
 
 
 # Schedule the bot to run daily
-def setup_schedule(schedule_time_str="10:00", nosearch=False):
+def setup_schedule(schedule_time_str="10:00", nosearch=False, **bot_options):
     """Sets up the daily schedule for the bot."""
     try:
         # Validate the time format first
         datetime.strptime(schedule_time_str, '%H:%M').time() # Just check if parsing works
+    except ValueError:
+        logger.error(f"Invalid time format '{schedule_time_str}'. Please use HH:MM format (e.g., '10:00'). Scheduling aborted.")
+        return # Do not enter the while loop if time format is invalid
 
-        schedule.every().day.at(schedule_time_str).do(run_rewards_bot, nosearch=nosearch)
+    try:
+        schedule.every().day.at(schedule_time_str).do(run_rewards_bot, nosearch=nosearch, **bot_options)
 
         logger.info(f"Scheduler set up. Bot will run daily at {schedule_time_str} {'(without searches)' if nosearch else ''}")
         logger.info("Press Ctrl+C to exit the scheduler.")
@@ -1669,7 +3454,7 @@ def setup_schedule(schedule_time_str="10:00", nosearch=False):
         # Run once immediately when the script starts, using the provided arguments
         logger.info("Running workflow immediately on script start...")
         # Pass the parsed arguments to the initial run
-        run_rewards_bot(nosearch=args.nosearch) # Use args.nosearch from main
+        run_rewards_bot(nosearch=args.nosearch, **bot_options) # Use args.nosearch from main
 
         logger.info("Initial run completed. Entering scheduling loop.")
 
@@ -1677,13 +3462,14 @@ def setup_schedule(schedule_time_str="10:00", nosearch=False):
         while True:
             schedule.run_pending(); time.sleep(60) # Check the schedule every minute
 
-    except ValueError:
-        logger.error(f"Invalid time format '{schedule_time_str}'. Please use HH:MM format (e.g., '10:00'). Scheduling aborted.")
-        # Do not enter the while loop if time format is invalid
     except KeyboardInterrupt:
         logger.info("Script terminated by user.")
     except Exception as e:
         logger.critical(f"Unhandled error in scheduling loop: {str(e)}")
+    finally:
+        # Close a browser kept alive between runs
+        if _kept_alive_bot is not None:
+            _kept_alive_bot.quit_driver()
 
 
 if __name__ == "__main__":
@@ -1693,8 +3479,69 @@ if __name__ == "__main__":
                         help='Skip the Bing search tasks (both desktop and mobile).')
     parser.add_argument('--time', type=str, default='10:00',
                         help='Specify the daily schedule time in HH:MM format. Default is 10:00.')
+    parser.add_argument('--parallel-activities', type=int, default=1,
+                        help='Run up to N daily set / other activity tabs at the same time. Default is 1 (one after another).')
+    parser.add_argument('--search-mode', choices=['box', 'url'], default='box',
+                        help="How searches are submitted: 'box' types into the Bing search box, 'url' opens the results URL directly. Default is box.")
+    parser.add_argument('--interleave-searches', action='store_true',
+                        help='Run desktop and mobile searches at the same time in two tabs (one mobile-emulated) '
+                             'instead of one after the other. Searches open the results URL directly.')
+    parser.add_argument('--terms-file', type=str, default=None,
+                        help='Search term file: one term per line or comma-separated, optionally gzipped. '
+                             'Default is the built-in English term list. (The bundled 1000_search_items.txt holds '
+                             'Indonesian terms.)')
+    parser.add_argument('--query-history-days', type=int, default=7,
+                        help='Do not reuse a search term searched within this many days. 0 disables the history. Default is 7.')
+    parser.add_argument('--generate-queries', action='store_true',
+                        help='Search for new queries generated by an n-gram model of the search terms instead of the terms themselves.')
+    parser.add_argument('--ngram-order', type=int, default=1,
+                        help='With --generate-queries, how many previous words pick the next one. Higher orders read more '
+                             'naturally but reproduce the search terms more often, leaving fewer new queries. Default is 1.')
+    parser.add_argument('--keep-alive', action='store_true',
+                        help='Keep the browser open between scheduled runs and reuse it while it stays healthy.')
+    parser.add_argument('--max-session-age', type=float, default=72,
+                        help='In --keep-alive mode, restart the browser once it is older than this many hours. Runs are '
+                             'scheduled daily, so values of 24 or less restart it on every run. Default is 72.')
+    parser.add_argument('--max-browser-memory', type=int, default=None,
+                        help='In --keep-alive mode, restart the browser once all its processes together use more than '
+                             'this many MB. Reading it walks the process list, which takes seconds on Windows. Default is no limit.')
+    parser.add_argument('--block-resources', type=str, default='',
+                        help=f"Comma-separated resource categories not to download: {','.join(RESOURCE_BLOCK_PATTERNS)}. Default is none.")
+    parser.add_argument('--block-url', action='append', default=[],
+                        help='Extra URL pattern to block (wildcards allowed, e.g. "*://ads.example.com/*"). Repeatable.')
+    parser.add_argument('--unblock-url', action='append', default=[],
+                        help='Blocklist pattern to drop, exactly as listed for its category or given to --block-url '
+                             '(e.g. "*/th?id=*"). Not an allow list: URLs matching other patterns stay blocked. Repeatable.')
+    parser.add_argument('--page-load', choices=['normal', 'eager', 'none'], default='normal',
+                        help="Selenium page-load strategy. 'eager'/'none' return before images and other subresources finish "
+                             "and wait only for the element each step needs. Default is normal.")
+    parser.add_argument('--offline', action='store_true',
+                        help='Never contact the network to resolve msedgedriver; use the cached driver or one on PATH.')
     args = parser.parse_args()
+    args.block_resources = [c.strip() for c in args.block_resources.split(',') if c.strip()]
+    try:
+        # Reject a bad blocklist here rather than in the first scheduled run
+        build_url_blocklist(args.block_resources, args.block_url, args.unblock_url)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.ngram_order < 1:
+        parser.error(f"--ngram-order must be at least 1, got {args.ngram_order}.")
 
     # --- Setup and Run ---
     # Pass the parsed arguments to the schedule setup function
-    setup_schedule(schedule_time_str=args.time, nosearch=args.nosearch)
+    setup_schedule(schedule_time_str=args.time, nosearch=args.nosearch,
+                   max_parallel_activities=args.parallel_activities,
+                   search_mode=args.search_mode,
+                   interleave_searches=args.interleave_searches,
+                   search_terms_file=args.terms_file,
+                   query_history_days=args.query_history_days,
+                   generate_queries=args.generate_queries,
+                   ngram_order=args.ngram_order,
+                   offline_driver=args.offline,
+                   keep_alive=args.keep_alive,
+                   max_session_age_hours=args.max_session_age,
+                   max_browser_memory_mb=args.max_browser_memory,
+                   block_resources=args.block_resources,
+                   blocked_url_patterns=args.block_url,
+                   unblocked_url_patterns=args.unblock_url,
+                   page_load_strategy=args.page_load)